@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the swreact_results codec (swreactxblock/codec.py) on realistic '[session, log]' results.
+
+Usage, from the repository root:
+
+    python scripts/bench_results_codec.py [--steps 25 100 300] [--level 6] [--repeat 200]
+
+For each log length it reports the plain and stored sizes, the compression ratio and the encode/decode times.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swreactxblock.codec import decode_results, encode_results  # noqa: E402 pylint: disable=C0413
+
+EXPRESSIONS = [
+    "3x+5=20",
+    "3x=15",
+    "x=5",
+    "2(x-4)+7=3x-1",
+    "2x-8+7=3x-1",
+    "2x-1=3x-1",
+    "-x=0",
+    "x=0",
+    "\\frac{x}{4}+2=6",
+    "\\frac{x}{4}=4",
+    "x=16",
+]
+ACTIONS = ["step", "hint", "error", "showme", "check"]
+
+
+def make_results(steps, seed=0):
+    """Return a results string shaped like the ones the React app posts, with a log of the given length."""
+    rng = random.Random(seed)
+    session = {
+        "appKey": "SBIRPhase2",
+        "policyId": "$A9$",
+        "problemId": "Q_EQN_001",
+        "studentId": "learner42",
+        "sessionCode": "%032x" % rng.getrandbits(128),
+        "stimulus": "Solve for x: 3x+5=20",
+        "status": "in-progress",
+        "hintsUsed": 0,
+        "errorsMade": 0,
+        "showMeUsed": 0,
+        "stepsTaken": steps,
+    }
+    log = []
+    for i in range(steps):
+        action = rng.choice(ACTIONS)
+        log.append(
+            {
+                "timestamp": 1700000000000 + i * rng.randint(2000, 30000),
+                "action": action,
+                "step": i,
+                "input": rng.choice(EXPRESSIONS),
+                "status": "correct" if action == "step" else "info",
+                "message": "" if action == "step" else "Try isolating the variable on one side of the equation.",
+                "elapsedMs": rng.randint(100, 20000),
+            }
+        )
+    return json.dumps([session, log], separators=(",", ":"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 50, 100, 300, 1000])
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'steps':>6} {'plain':>9} {'stored':>9} {'ratio':>6} {'encode_us':>10} {'decode_us':>10}")
+    for steps in args.steps:
+        results = make_results(steps)
+        stored = encode_results(results, compress=True, level=args.level)
+        assert decode_results(stored) == results
+        encode_us = timeit.timeit(lambda: encode_results(results, True, args.level), number=args.repeat)
+        decode_us = timeit.timeit(lambda: decode_results(stored), number=args.repeat)
+        print(
+            f"{steps:>6} {len(results):>9} {len(stored):>9} {len(stored) / len(results):>6.3f} "
+            f"{encode_us / args.repeat * 1e6:>10.1f} {decode_us / args.repeat * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the bytes student_view embeds to resume a previous attempt, in each resume mode (see swreactxblock/payload.py).
+
+Usage, from the repository root:
+
+    python scripts/bench_resume_payload.py [--steps 10 50 100 300 1000] [--repeat 200]
+
+For each log length it reports the size of the resume attributes of window.swReact as student_view inlines them: the
+pre-payload.py template (session, log and the combined results each embedded with &quot; escaping), and the legacy,
+inline and fetch modes of resume_fields(), serialized with script_safe_dumps(). It also reports the time to build and
+serialize each, and the bytes inline and fetch save against the pre-payload.py template.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_results_codec import make_results  # noqa: E402 pylint: disable=C0413
+
+from swreactxblock.const import (  # noqa: E402 pylint: disable=C0413
+    RESUME_MODE_FETCH,
+    RESUME_MODE_INLINE,
+    RESUME_MODE_LEGACY,
+)
+from swreactxblock.payload import resume_fields, script_safe_dumps  # noqa: E402 pylint: disable=C0413
+
+# What RESUME_MODE_FETCH embeds instead of the attempt: build_payload() adds these, see payload.py.
+FETCH_FIELDS = {"resumable": True, "resumeUrl": "/courses/course-v1:Org+Course+Run/xblock/block-v1:x/handler/get_resume_data"}
+
+
+def template_resume(results):
+    """Return the resume attributes as the string template student_view used before payload.py built them."""
+    session, log = json.loads(results)
+    return (
+        '    oldSession: "'
+        + json.dumps(session).replace('"', "&quot;")
+        + '",'
+        + '    oldLog: "'
+        + json.dumps(log).replace('"', "&quot;")
+        + '",'
+        + '    oldSessionLogCombo: "'
+        + results.replace('"', "&quot;")
+        + '",'
+    )
+
+
+def mode_resume(results, mode):
+    """Return the resume attributes for mode, serialized as student_view inlines them."""
+    if mode == RESUME_MODE_FETCH:
+        return script_safe_dumps(dict(resume_fields("", mode), **FETCH_FIELDS))
+    return script_safe_dumps(resume_fields(results, mode))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 50, 100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    builders = [("template", template_resume)] + [
+        (mode, lambda results, mode=mode: mode_resume(results, mode))
+        for mode in (RESUME_MODE_LEGACY, RESUME_MODE_INLINE, RESUME_MODE_FETCH)
+    ]
+    print(
+        f"{'steps':>6} {'results':>9} "
+        + " ".join(f"{name + '_bytes':>14} {name + '_us':>11}" for name, _ in builders)
+        + f" {'inline_saved':>12} {'fetch_saved':>11}"
+    )
+    for steps in args.steps:
+        results = make_results(steps)
+        sizes, columns = {}, []
+        for name, build in builders:
+            sizes[name] = len(build(results).encode("utf8"))
+            build_us = timeit.timeit(lambda build=build: build(results), number=args.repeat) / args.repeat * 1e6
+            columns.append(f"{sizes[name]:>14} {build_us:>11.1f}")
+        inline_saved = 1 - sizes[RESUME_MODE_INLINE] / sizes["template"]
+        fetch_saved = 1 - sizes[RESUME_MODE_FETCH] / sizes["template"]
+        print(f"{steps:>6} {len(results):>9} " + " ".join(columns) + f" {inline_saved:>12.1%} {fetch_saved:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
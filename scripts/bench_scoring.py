@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the swreact scoring engine (swreactxblock/scoring.py) on large logs.
+
+Usage, from the repository root:
+
+    python scripts/bench_scoring.py [--steps 100 1000 10000 100000] [--repeat 20]
+
+For each log length it reports the time to score an already parsed log and to parse and score a results string with
+score_results(), along with the log entries scored per second.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_results_codec import make_results  # noqa: E402 pylint: disable=C0413
+from swreactxblock.const import SCORING_MODE_LOG  # noqa: E402 pylint: disable=C0413
+from swreactxblock.options import GRADING_OPTIONS  # noqa: E402 pylint: disable=C0413
+from swreactxblock.scoring import load_log, score_log, score_results  # noqa: E402 pylint: disable=C0413
+
+OPTIONS = {option.name: option.default for option in GRADING_OPTIONS}
+# Score as in SWREACT_SCORING_MODE=log, so the benchmark measures the deductions.
+MODE = SCORING_MODE_LOG
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--steps", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'steps':>7} {'score':>6} {'parsed_ms':>10} {'results_ms':>10} {'entries/s':>11}")
+    for steps in args.steps:
+        results = make_results(steps)
+        log = json.loads(results)[1]
+        breakdown = score_log(log, OPTIONS, MODE)
+        assert score_results(results, OPTIONS, MODE) == breakdown
+        assert load_log(results) == log
+        parsed = timeit.timeit(lambda: score_log(log, OPTIONS, MODE), number=args.repeat) / args.repeat
+        loaded = timeit.timeit(lambda: score_results(results, OPTIONS, MODE), number=args.repeat) / args.repeat
+        print(
+            f"{steps:>7} {breakdown.score:>6.2f} {parsed * 1e3:>10.2f} {loaded * 1e3:>10.2f} {steps / loaded:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Check and benchmark the variant picker (swreactxblock/variants.py).
+
+Usage, from the repository root:
+
+    python scripts/bench_variants.py [--counts 10 100 1000 5000] [--draws 100000] [--repeat 20000]
+
+For each variant count it checks that pick_variant() is uniform over the candidates (a chi-square test over the
+remaining variants of a half-attempted bitmap), and reports the time per pick for a fresh, a half-attempted and an
+almost fully attempted bitmap. For up to 10 variants it also times the retry loop pick_variant() used before, for
+comparison.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swreactxblock.variants import all_variants, candidates, pick_variant  # noqa: E402 pylint: disable=C0413
+
+# The 0.999 quantile of the chi-square distribution is below df + 4.5 * sqrt(2 * df) for the df we test.
+CHI_SQUARE_SIGMAS = 4.5
+
+
+def legacy_pick_variant(attempted, count, previous=-1, rng=random):
+    """The retry loop pick_variant() used before variants.py, without the logging: at most 10 variants."""
+
+    def bit_count_ones(var):
+        return sum((var >> b) & 1 for b in range(32))
+
+    if bit_count_ones(attempted) >= count:
+        attempted = 0
+    for _ in range(100):
+        q_index = min(rng.randint(0, count * 100 - 1) // 100, 9)
+        if q_index == previous and bit_count_ones(attempted) < count - 1:
+            return q_index
+        if not attempted >> q_index & 1:
+            return q_index
+    return 0
+
+
+def check_uniform(count, draws, rng):
+    """Assert that picks from a half-attempted bitmap of count variants are uniform over the candidates."""
+    attempted = rng.getrandbits(count) & all_variants(count)
+    previous = rng.randrange(count)
+    allowed = candidates(attempted, count, previous)
+    seen = Counter(pick_variant(attempted, count, previous, rng) for _ in range(draws))
+    assert all(allowed >> q_index & 1 for q_index in seen), "picked a variant that isn't a candidate"
+    df = allowed.bit_count() - 1
+    if df == 0:
+        return 0.0
+    expected = draws / allowed.bit_count()
+    chi_square = sum((seen[q_index] - expected) ** 2 / expected for q_index in range(count) if allowed >> q_index & 1)
+    limit = df + CHI_SQUARE_SIGMAS * (2 * df) ** 0.5
+    assert chi_square < limit, f"chi-square {chi_square:.1f} >= {limit:.1f} with {df} degrees of freedom"
+    return chi_square / df
+
+
+def time_pick(picker, attempted, count, repeat, rng):
+    return timeit.timeit(lambda: picker(attempted, count, 0, rng), number=repeat) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 2, 10, 100, 1000, 5000])
+    parser.add_argument("--draws", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(
+        f"{'count':>6} {'chi2/df':>8} {'fresh_us':>9} {'half_us':>8} {'last_us':>8} "
+        f"{'legacy_fresh_us':>16} {'legacy_last_us':>15}"
+    )
+    for count in args.counts:
+        ratio = check_uniform(count, min(args.draws, 200 * count + 1000), rng)
+        half = rng.getrandbits(count) & all_variants(count)
+        last = all_variants(count) & ~(1 << (count - 1))
+        fresh_us = time_pick(pick_variant, 0, count, args.repeat, rng)
+        half_us = time_pick(pick_variant, half, count, args.repeat, rng)
+        last_us = time_pick(pick_variant, last, count, args.repeat, rng)
+        if count <= 10:
+            legacy_fresh_us = time_pick(legacy_pick_variant, 0, count, args.repeat, rng)
+            legacy_last_us = time_pick(legacy_pick_variant, last, count, args.repeat, rng)
+            legacy = f"{legacy_fresh_us:>16.2f} {legacy_last_us:>15.2f}"
+        else:
+            legacy = f"{'-':>16} {'-':>15}"
+        print(f"{count:>6} {ratio:>8.2f} {fresh_us:>9.2f} {half_us:>8.2f} {last_us:>8.2f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
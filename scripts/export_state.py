@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Export the swreactxblock learner state of a course to CSV or Parquet, in constant memory (see swreactxblock/export.py).
+
+From the LMS (with DJANGO_SETTINGS_MODULE set, e.g. lms.envs.production):
+
+    python scripts/export_state.py --course course-v1:Org+Course+Run --output state.csv [--results] [--counts]
+
+From a SQLite copy of the courseware_studentmodule table, optionally for one course:
+
+    python scripts/export_state.py --sqlite lms.sqlite3 [--course-id course-v1:Org+Course+Run] --output state.parquet
+
+The format follows the output file's extension (.csv or .parquet) unless --format is given. --results adds the
+decompressed '[session, log]' results and the log length; --counts adds the steps, hints, errors and showme counts used
+for scoring. Parquet output needs pyarrow.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swreactxblock.export import (  # noqa: E402 pylint: disable=C0413
+    BATCH_SIZE,
+    export_columns,
+    export_records,
+    field_defaults,
+    write_csv,
+    write_parquet,
+)
+from swreactxblock.swreactxblock import SWREACTXBlock  # noqa: E402 pylint: disable=C0413
+
+ROW_QUERY = "SELECT id, student_id, module_state_key, state FROM courseware_studentmodule WHERE module_type = ?"
+
+
+def course_rows(course_key):
+    """Yield (id, student_id, module_state_key, state) for the swreactxblock StudentModule rows of course_key."""
+    # pylint: disable=C0415,E0401
+    import django
+
+    django.setup()
+    from lms.djangoapps.courseware.models import StudentModule
+    from opaque_keys.edx.keys import CourseKey
+
+    rows = StudentModule.objects.filter(course_id=CourseKey.from_string(course_key), module_type="swreactxblock")
+    yield from rows.values_list("id", "student_id", "module_state_key", "state").iterator(chunk_size=BATCH_SIZE)
+
+
+def sqlite_rows(path, course_id=None):
+    """Yield (id, student_id, module_state_key, state) for the swreactxblock rows of a SQLite courseware_studentmodule
+    table, for course_id only if given."""
+    connection = sqlite3.connect(path)
+    try:
+        query, params = ROW_QUERY, ["swreactxblock"]
+        if course_id:
+            query, params = query + " AND course_id = ?", params + [course_id]
+        cursor = connection.execute(query + " ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--course", help="course key, e.g. course-v1:Org+Course+Run")
+    source.add_argument("--sqlite", help="SQLite database with a courseware_studentmodule table")
+    parser.add_argument("--course-id", help="only export this course from --sqlite")
+    parser.add_argument("--output", required=True, help="the file to write")
+    parser.add_argument("--format", choices=("csv", "parquet"), help="default: from the --output extension")
+    parser.add_argument("--results", action="store_true", help="add the results and log length columns")
+    parser.add_argument("--counts", action="store_true", help="add the event count columns")
+    args = parser.parse_args()
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+
+    rows = course_rows(args.course) if args.course else sqlite_rows(args.sqlite, args.course_id)
+    columns = export_columns(args.results, args.counts)
+    records = export_records(rows, field_defaults(SWREACTXBlock), args.results, args.counts)
+    if output_format == "parquet":
+        written = write_parquet(records, args.output, columns)
+    else:
+        with open(args.output, "w", newline="", encoding="utf8") as f:
+            written = write_csv(records, f, columns)
+    print(f"wrote {written} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Rescore the completed swreactxblock attempts of a course or a block under the current grading options.
+
+From the LMS (with DJANGO_SETTINGS_MODULE set, e.g. lms.envs.production):
+
+    python scripts/rescore.py --course course-v1:Org+Course+Run [--write]
+    python scripts/rescore.py --block block-v1:Org+Course+Run+type@swreactxblock+block@abc [--write]
+
+Without --write this is a dry run: it prints the scores that would change, old -> new, and the throughput. With
+--write the changed scores are stored with the block's set_score() and published to the gradebook. Only --write
+depends on a private edx-platform helper, see learner_block().
+
+Offline, from an export with one {"key": ..., "state": StudentModule.state} JSON object per line, under the options of
+a block whose question fields are left at their defaults in a course with no stepwise_* advanced settings, updated with
+those in an --options JSON file:
+
+    python scripts/rescore.py --jsonl states.jsonl [--options options.json]
+
+Attempts are scored as save_grade() scores them, under SWREACT_SCORING_MODE (see swreactxblock/scoring.py). In the
+default "completion" mode every completed attempt gets full credit, so set SWREACT_SCORING_MODE=log to apply the
+deductions.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swreactxblock.const import SCORING_MODE, SCORING_MODE_COMPLETION  # noqa: E402 pylint: disable=C0413
+from swreactxblock.options import default_options  # noqa: E402 pylint: disable=C0413
+from swreactxblock.rescore import CHUNK_SIZE, RescoreReport, rescore_rows  # noqa: E402 pylint: disable=C0413
+from swreactxblock.swreactxblock import SWREACTXBlock  # noqa: E402 pylint: disable=C0413
+
+
+MODE_NOTE = (
+    f"Scores follow SWREACT_SCORING_MODE, here {SCORING_MODE!r}. In the default {SCORING_MODE_COMPLETION!r} mode every "
+    "completed attempt gets full credit, so rescoring changes nothing unless SWREACT_SCORING_MODE=log is set."
+)
+
+
+def learner_block_loader():
+    """Return learner_block(course_key, user, descriptor, course), which binds descriptor to user's state.
+
+    edx-platform has no public API for loading a block for another learner outside of a request, so we use
+    _get_module_instance_for_task(), the private helper its own instructor rescoring task uses. It may change between
+    edx-platform releases without notice, so this is the only place that imports it, and it is imported before any
+    score is written so that --write fails up front if it has moved.
+    """
+    # pylint: disable=C0415,E0401
+    try:
+        from lms.djangoapps.instructor_task.tasks_helper.module_state import _get_module_instance_for_task
+    except ImportError as e:
+        raise SystemExit(f"--write needs edx-platform's _get_module_instance_for_task, which can't be imported: {e}")
+
+    def learner_block(course_key, user, descriptor, course):
+        return _get_module_instance_for_task(course_key, user, descriptor, grade_bucket_type="rescore", course=course)
+
+    return learner_block
+
+
+def lms_blocks(course_key=None, block_key=None, write=False):
+    """Yield (options, rows, write) for each swreactxblock of course_key, or for block_key alone.
+
+    rows yields ((student id, usage key), state) for the block's StudentModule rows; write stores a new score, and is
+    None unless write is True.
+    """
+    # pylint: disable=C0415,E0401
+    import django
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from lms.djangoapps.courseware.courses import get_course_by_id
+    from lms.djangoapps.courseware.models import StudentModule
+    from opaque_keys.edx.keys import CourseKey, UsageKey
+    from xblock.scorable import Score
+    from xmodule.modulestore.django import modulestore
+
+    from swreactxblock.options import get_options
+
+    if block_key:
+        block_key = UsageKey.from_string(block_key)
+        course_key = block_key.course_key
+    else:
+        course_key = CourseKey.from_string(course_key)
+    rows = StudentModule.objects.filter(course_id=course_key, module_type="swreactxblock")
+    if block_key:
+        rows = rows.filter(module_state_key=block_key)
+    rows = rows.order_by("module_state_key").values_list("student_id", "module_state_key", "state")
+    course = get_course_by_id(course_key)
+    users = get_user_model().objects
+    learner_block = learner_block_loader() if write else None
+
+    for usage_key, block_rows in itertools.groupby(rows.iterator(chunk_size=CHUNK_SIZE), key=lambda row: row[1]):
+        descriptor = modulestore().get_item(usage_key)
+        options = get_options(descriptor, course_key, lambda _course_id: course)
+
+        def write_score(key, score, descriptor=descriptor):
+            block = learner_block(course_key, users.get(id=key[0]), descriptor, course)
+            block.set_score(Score(score, float(block.max_score())))
+            block.publish_grade()
+            block.save()
+
+        learner_rows = (((student_id, str(key)), state) for student_id, key, state in block_rows)
+        yield options, learner_rows, write_score if write else None
+
+
+def jsonl_blocks(path, options):
+    """Yield (options, rows, None) for the rows of path, all under options."""
+
+    def rows():
+        with open(path, encoding="utf8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row["key"], row["state"]
+
+    yield options, rows(), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], epilog=MODE_NOTE)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--course", help="course key, e.g. course-v1:Org+Course+Run")
+    source.add_argument("--block", help="usage key of one swreactxblock")
+    source.add_argument("--jsonl", help="file with one {key, state} JSON object per line")
+    parser.add_argument("--options", help="JSON file of resolved grading options for --jsonl")
+    parser.add_argument("--write", action="store_true", help="store the changed scores (default: dry run)")
+    args = parser.parse_args()
+    if args.write and args.jsonl:
+        parser.error("--write needs --course or --block")
+
+    if args.jsonl:
+        # Resolved as SWREACTXBlock.resolved_options() would, for a block with the default question fields.
+        options = default_options(SWREACTXBlock)
+        if args.options:
+            with open(args.options, encoding="utf8") as f:
+                options.update(json.load(f))
+        blocks = jsonl_blocks(args.jsonl, options)
+    else:
+        blocks = lms_blocks(args.course, args.block, args.write)
+
+    if SCORING_MODE == SCORING_MODE_COMPLETION:
+        print(MODE_NOTE, file=sys.stderr)
+    report = RescoreReport()
+    for options, rows, write in blocks:
+        changed = len(report.changed)
+        rescore_rows(rows, options, write, report=report)
+        for line in report.diff()[changed:]:
+            print(line)
+    print(("" if args.write else "dry run: ") + report.summary())
+
+
+if __name__ == "__main__":
+    main()
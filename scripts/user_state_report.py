@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Estimate the bytes saved by dropping the legacy swreactxblock user_state fields (see swreactxblock/schema.py).
+
+From the LMS (with DJANGO_SETTINGS_MODULE set, e.g. lms.envs.production), for the swreactxblock StudentModule rows of
+a course:
+
+    python scripts/user_state_report.py --course course-v1:Org+Course+Run [--purge]
+
+--purge also rewrites those rows without the legacy fields. Take a backup first. A row is only rewritten if its state
+is still the one we read, so a learner's write made in between is never overwritten. Rows that changed are listed at
+the end and left alone; run the script again to purge them.
+
+Offline, from an export with one StudentModule.state JSON object per line:
+
+    python scripts/user_state_report.py --jsonl states.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swreactxblock.schema import StateSavings  # noqa: E402 pylint: disable=C0413
+
+BATCH_SIZE = 500
+
+
+def course_rows(course_key):
+    """Yield (StudentModule, id, state) for the swreactxblock rows of course_key."""
+    # pylint: disable=C0415,E0401
+    import django
+
+    django.setup()
+    from lms.djangoapps.courseware.models import StudentModule
+    from opaque_keys.edx.keys import CourseKey
+
+    rows = StudentModule.objects.filter(course_id=CourseKey.from_string(course_key), module_type="swreactxblock")
+    for row_id, state in rows.values_list("id", "state").iterator(chunk_size=BATCH_SIZE):
+        yield StudentModule, row_id, state
+
+
+def jsonl_rows(path):
+    """Yield (None, line number, state) for each line of path."""
+    with open(path, encoding="utf8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                yield None, number, line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--course", help="course key, e.g. course-v1:Org+Course+Run")
+    source.add_argument("--jsonl", help="file with one StudentModule.state JSON object per line")
+    parser.add_argument("--purge", action="store_true", help="rewrite the course's rows without the legacy fields")
+    args = parser.parse_args()
+    if args.purge and not args.course:
+        parser.error("--purge needs --course")
+
+    savings = StateSavings()
+    changed_rows = []
+    rows = course_rows(args.course) if args.course else jsonl_rows(args.jsonl)
+    for model, row_id, original_state in rows:
+        try:
+            state = json.loads(original_state or "{}")
+        except ValueError as e:
+            print(f"skipping row {row_id}: {e}", file=sys.stderr)
+            continue
+        before = savings.bytes_saved
+        compact = savings.add(state)
+        if args.purge and savings.bytes_saved != before:
+            # Only if the row still holds the state we read, so we don't undo a write made since.
+            if not model.objects.filter(id=row_id, state=original_state).update(state=json.dumps(compact)):
+                changed_rows.append(row_id)
+    print(savings.summary())
+    if changed_rows:
+        print(
+            f"rows not purged because they changed since they were read: {len(changed_rows)} "
+            f"(ids {', '.join(str(row_id) for row_id in changed_rows)}); run --purge again to purge them"
+        )
+
+
+if __name__ == "__main__":
+    main()
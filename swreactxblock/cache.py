@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Small in-process caches used by the swreactxblock.
+
+TTLCache lives in the memory of a single LMS worker process. It is bounded in size (least recently used entries are
+evicted first) and entries expire after a time-to-live, so a stale value can never outlive the TTL even if an
+invalidation signal is missed. LocalCache wraps a TTLCache in the subset of Django's cache API we use, so code can work
+with Django's shared cache when it is configured and fall back to a local one otherwise (see shared_cache()).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if it is missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = item
+            if expires < now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries if the cache is full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_if(self, predicate):
+        """Remove every entry whose key satisfies predicate(key). Returns the number of entries removed."""
+        with self._lock:
+            doomed = [key for key in self._data if predicate(key)]
+            for key in doomed:
+                del self._data[key]
+        return len(doomed)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class LocalCache:
+    """A stand-in for the subset of Django's cache API we use, backed by an in-process TTLCache."""
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key, default=None):
+        return self._cache.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self._cache.set(key, value)
+
+    def delete(self, key):
+        self._cache.discard(key)
+
+
+def shared_cache(local_cache):
+    """Return Django's default cache if Django is configured, otherwise local_cache.
+
+    Django's cache is shared by every LMS worker; local_cache only lives in this process.
+    """
+    # pylint: disable=C0415,W0718
+    try:
+        from django.conf import settings
+        from django.core.cache import cache
+
+        if settings.configured:
+            return cache
+    except Exception:
+        pass
+    return local_cache
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescing of the per-step save_swreact_partial_results writes.
+
+The React app calls save_swreact_partial_results after every step. Written straight through, each call updates the
+learner's StudentModule, republishes an unchanged grade and re-emits completion 0.0. When coalescing is enabled (see
+PARTIAL_COALESCE_* in const.py), PartialResultsCoalescer holds the newest partial result in the cache instead, and only
+tells the handler to write it once the time window or step count since the first held step is used up.
+
+There is no timer: an expired window is noticed on the learner's next step. A held result that is never followed by
+another step is written by the next student_view or get_resume_data call (see SWREACTXBlock.flush_partial_results()),
+and is dropped when final results arrive, since those supersede it.
+
+We use Django's cache when it is configured, so every LMS worker sees the same held result. Otherwise (e.g. in the
+workbench) held results only live in this process.
+"""
+import hashlib
+import threading
+import time
+
+from .cache import LocalCache, shared_cache
+from .const import (
+    PARTIAL_COALESCE_CACHE_MAXSIZE,
+    PARTIAL_COALESCE_PENDING_TTL,
+    PARTIAL_COALESCE_STEPS,
+    PARTIAL_COALESCE_WINDOW,
+)
+from .log import get_logger
+
+logger = get_logger("coalesce")
+
+CACHE_KEY_PREFIX = "swreactxblock.partial."
+
+
+def pending_key(user_id, usage_id):
+    """Return the cache key for the held partial result of user_id on usage_id.
+
+    We hash the pair so the key is short and safe for memcached whatever the usage id contains.
+    """
+    digest = hashlib.blake2b(f"{user_id}\n{usage_id}".encode("utf8"), digest_size=16).hexdigest()
+    return CACHE_KEY_PREFIX + digest
+
+
+class PartialResultsCoalescer:
+    """Holds the newest partial result per learner and block until a window or step count is used up.
+
+    A held entry is a dict with the newest results string ("results"), its sequence number ("seq", see sequence.py),
+    and the time and number of steps held so far ("since", "steps").
+
+    window is in seconds and steps is a number of save_swreact_partial_results calls; 0 disables either limit.
+    writes_avoided counts the partial results this process held instead of writing.
+    """
+
+    def __init__(self, window=0.0, steps=0, pending_ttl=86400, maxsize=10000):
+        self.window = window
+        self.steps = steps
+        self.pending_ttl = pending_ttl
+        self._local_cache = LocalCache(maxsize, pending_ttl)
+        self._lock = threading.Lock()
+        self.writes_avoided = 0
+
+    @property
+    def enabled(self):
+        return self.window > 0 or self.steps > 0
+
+    def peek(self, key):
+        """Return the held entry for key without removing it, or None if nothing is held."""
+        if not self.enabled:
+            return None
+        return shared_cache(self._local_cache).get(key)
+
+    def offer(self, key, results, seq=None):
+        """Offer the newest partial results string for key, with its sequence number seq, if any.
+
+        Returns None if we are holding the update, or the entry (see the class docstring) the caller should write now.
+        """
+        if not self.enabled:
+            return {"results": results, "seq": seq}
+        backend = shared_cache(self._local_cache)
+        now = time.time()
+        pending = backend.get(key) or {"seq": None, "since": now, "steps": 0}
+        pending["results"] = results
+        if seq is not None:
+            pending["seq"] = seq
+        pending["steps"] += 1
+        if (self.window > 0 and now - pending["since"] >= self.window) or (
+            self.steps > 0 and pending["steps"] >= self.steps
+        ):
+            backend.delete(key)
+            logger.debug(
+                "swreactxblock coalesce offer() flushing %s after %d steps, %.1fs",
+                key,
+                pending["steps"],
+                now - pending["since"],
+            )
+            return pending
+        backend.set(key, pending, self.pending_ttl)
+        with self._lock:
+            self.writes_avoided += 1
+        return None
+
+    def pop(self, key):
+        """Remove and return the held entry for key, or None if nothing is held."""
+        if not self.enabled:
+            return None
+        backend = shared_cache(self._local_cache)
+        pending = backend.get(key)
+        if pending is not None:
+            backend.delete(key)
+        return pending
+
+    def discard(self, key):
+        """Drop the held entry for key, e.g. because final results superseded it."""
+        if self.enabled:
+            shared_cache(self._local_cache).delete(key)
+
+
+partial_results_coalescer = PartialResultsCoalescer(
+    window=PARTIAL_COALESCE_WINDOW,
+    steps=PARTIAL_COALESCE_STEPS,
+    pending_ttl=PARTIAL_COALESCE_PENDING_TTL,
+    maxsize=PARTIAL_COALESCE_CACHE_MAXSIZE,
+)
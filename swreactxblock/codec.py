@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Transparent compression of the stored swreact_results string.
+
+The '[session, log]' JSON the React app sends us is very repetitive (the same keys and expression strings over and
+over), and it is stored in the learner's StudentModule row. We store it zlib-compressed and base64-encoded behind a
+version header, e.g. "z1:eJy...". Plain JSON never starts with the header, so decode_results() reads both compressed
+results and the plain JSON results stored before we compressed them. Those are rewritten compressed the next time they
+are saved.
+
+results_codec_stats keeps running totals for this process so we can report the compression ratio.
+"""
+import base64
+import threading
+import zlib
+
+from .const import RESULTS_COMPRESSION, RESULTS_COMPRESSION_LEVEL, RESULTS_COMPRESSION_MIN_SIZE
+from .log import get_logger
+
+logger = get_logger("codec")
+
+ZLIB_HEADER = "z1:"
+
+
+class CodecStats:
+    """Running totals of the plain and stored sizes of the results encoded by this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.encoded = 0
+        self.plain_bytes = 0
+        self.stored_bytes = 0
+
+    def record(self, plain_bytes, stored_bytes):
+        with self._lock:
+            self.encoded += 1
+            self.plain_bytes += plain_bytes
+            self.stored_bytes += stored_bytes
+
+    @property
+    def ratio(self):
+        """Stored size over plain size so far, e.g. 0.1 for results stored in a tenth of their plain size."""
+        return self.stored_bytes / self.plain_bytes if self.plain_bytes else 1.0
+
+
+results_codec_stats = CodecStats()
+
+
+def encode_results(results, compress=RESULTS_COMPRESSION, level=RESULTS_COMPRESSION_LEVEL):
+    """Return the string to store for a '[session, log]' results string."""
+    plain = results.encode("utf8")
+    if not compress or len(results) < RESULTS_COMPRESSION_MIN_SIZE:
+        stored = results
+    else:
+        stored = ZLIB_HEADER + base64.b64encode(zlib.compress(plain, level)).decode("ascii")
+    results_codec_stats.record(len(plain), len(stored))
+    return stored
+
+
+def decode_results(stored):
+    """Return the '[session, log]' results string for a stored string, compressed or not."""
+    if not stored.startswith(ZLIB_HEADER):
+        return stored
+    # pylint: disable=W0718
+    try:
+        return zlib.decompress(base64.b64decode(stored[len(ZLIB_HEADER):])).decode("utf8")
+    except Exception as e:
+        logger.error("swreactxblock decode_results() could not decode stored results: %s", e)
+        return ""
@@ -2,6 +2,8 @@
 """
 This file contains the constants used in the project.
 """
+import os
+
 DEBUG_MODE = True
 DEFAULT_XBLOCK_CLIENT = "swreactxblock"
 HTTP_TIMEOUT = 30
@@ -12,3 +14,69 @@ ENVIRONMENT_STAGING = "staging"
 ENVIRONMENT_PROD = "prod"
 VALID_ENVIRONMENTS = [ENVIRONMENT_DEV, ENVIRONMENT_STAGING, ENVIRONMENT_PROD]
 DEFAULT_ENVIRONMENT = ENVIRONMENT_PROD
+
+# In-process cache of parsed question variant lists (see question.py), keyed by their content.
+VARIANTS_CACHE_MAXSIZE = int(os.environ.get("SWREACT_VARIANTS_CACHE_MAXSIZE", "1024"))
+VARIANTS_CACHE_TTL = float(os.environ.get("SWREACT_VARIANTS_CACHE_TTL", "3600"))
+
+# Cache of the stepwise_* advanced settings extracted from each course descriptor.
+COURSE_SETTINGS_CACHE_MAXSIZE = int(os.environ.get("SWREACT_COURSE_SETTINGS_CACHE_MAXSIZE", "256"))
+COURSE_SETTINGS_CACHE_TTL = float(os.environ.get("SWREACT_COURSE_SETTINGS_CACHE_TTL", "300"))
+
+# Load the static HTML/CSS/JS resources into memory when the xblock module is imported rather than on first use.
+PRELOAD_RESOURCES = os.environ.get("SWREACT_PRELOAD_RESOURCES", "false").lower() == "true"
+
+# How student_view passes a previous attempt's session and log to the React app:
+#   "inline" embeds the session and the log once each,
+#   "legacy" additionally embeds the combined [session, log] results string as oldSessionLogCombo,
+#   "fetch" only flags that resumable state exists; the app fetches it from the get_resume_data handler on demand.
+RESUME_MODE_INLINE = "inline"
+RESUME_MODE_LEGACY = "legacy"
+RESUME_MODE_FETCH = "fetch"
+VALID_RESUME_MODES = [RESUME_MODE_INLINE, RESUME_MODE_LEGACY, RESUME_MODE_FETCH]
+RESUME_MODE = os.environ.get("SWREACT_RESUME_MODE", RESUME_MODE_INLINE)
+
+# Coalescing of save_swreact_partial_results writes. While coalescing, a partial result is held in the (shared) cache
+# instead of being written to the learner's StudentModule, and only the newest one is kept. The held result is
+# written once PARTIAL_COALESCE_WINDOW seconds have passed since the first held step, or once PARTIAL_COALESCE_STEPS
+# steps have been held, whichever comes first. 0 disables that limit; with both at 0 (the default) every partial
+# result is written immediately. PARTIAL_COALESCE_PENDING_TTL bounds how long a held result is kept in the cache.
+PARTIAL_COALESCE_WINDOW = float(os.environ.get("SWREACT_PARTIAL_COALESCE_WINDOW", "0"))
+PARTIAL_COALESCE_STEPS = int(os.environ.get("SWREACT_PARTIAL_COALESCE_STEPS", "0"))
+PARTIAL_COALESCE_PENDING_TTL = int(os.environ.get("SWREACT_PARTIAL_COALESCE_PENDING_TTL", "86400"))
+PARTIAL_COALESCE_CACHE_MAXSIZE = int(os.environ.get("SWREACT_PARTIAL_COALESCE_CACHE_MAXSIZE", "10000"))
+
+# Compression of the stored swreact_results (see codec.py). Results shorter than
+# RESULTS_COMPRESSION_MIN_SIZE characters are stored as plain JSON, since compressing them gains little.
+RESULTS_COMPRESSION = os.environ.get("SWREACT_RESULTS_COMPRESSION", "true").lower() == "true"
+RESULTS_COMPRESSION_LEVEL = int(os.environ.get("SWREACT_RESULTS_COMPRESSION_LEVEL", "6"))
+RESULTS_COMPRESSION_MIN_SIZE = int(os.environ.get("SWREACT_RESULTS_COMPRESSION_MIN_SIZE", "256"))
+
+# How long the student javascript waits after a step before posting it, keeping only the newest state meanwhile.
+STEP_FLUSH_MS = int(os.environ.get("SWREACT_STEP_FLUSH_MS", "2000"))
+
+# Whether the student javascript may gzip the results it posts (see request_body.py), and the largest results body we
+# accept, in bytes, both as sent and after decompression.
+REQUEST_COMPRESSION = os.environ.get("SWREACT_REQUEST_COMPRESSION", "true").lower() == "true"
+MAX_REQUEST_BODY_SIZE = int(os.environ.get("SWREACT_MAX_REQUEST_BODY_SIZE", str(16 * 1024 * 1024)))
+
+# How save_grade scores a completed attempt (see scoring.py):
+#   "completion" gives every completed attempt full credit, as earlier versions did,
+#   "log" applies the grade_* deductions to the hints, errors, "show me"s and steps counted from the attempt's log.
+#   Attempts whose log holds no event the scoring recognises get full credit in either mode.
+#   The log format scoring.py recognises hasn't been checked against the React app yet, see scoring.py before using "log".
+SCORING_MODE_COMPLETION = "completion"
+SCORING_MODE_LOG = "log"
+VALID_SCORING_MODES = [SCORING_MODE_COMPLETION, SCORING_MODE_LOG]
+SCORING_MODE = os.environ.get("SWREACT_SCORING_MODE", SCORING_MODE_COMPLETION)
+
+# How question variants are assigned (see variants.py):
+#   "random" draws the variant retry gives a learner at random,
+#   "hashed" derives it from a hash of (user id, block usage id, attempt number), so the assignment can be recomputed
+#   later, e.g. for a regrade dispute.
+#   Either way, a variant that isn't saved yet is drawn from the hash, so a learner is shown the same variant on every
+#   page load, and it sticks once the first results of their attempt save it.
+VARIANT_ASSIGNMENT_RANDOM = "random"
+VARIANT_ASSIGNMENT_HASHED = "hashed"
+VALID_VARIANT_ASSIGNMENTS = [VARIANT_ASSIGNMENT_RANDOM, VARIANT_ASSIGNMENT_HASHED]
+VARIANT_ASSIGNMENT = os.environ.get("SWREACT_VARIANT_ASSIGNMENT", VARIANT_ASSIGNMENT_RANDOM)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Cached access to the handful of course advanced settings the swreactxblock needs.
+
+get_course_by_id() loads the whole course descriptor from the modulestore, but we only read the stepwise_* advanced
+settings and max_attempts from it. We extract just those values and cache them by course_id, using Django's cache
+framework when it is configured and a local in-process TTL cache otherwise (e.g. in the XBlock SDK workbench). Cached
+entries are dropped when the course is republished: from the shared cache, so for every process, or from the local
+cache of the process that receives the course_published signal only, so other processes see the change once their
+entries expire after SWREACT_COURSE_SETTINGS_CACHE_TTL seconds.
+"""
+from types import SimpleNamespace
+
+from .cache import LocalCache, shared_cache
+from .const import COURSE_SETTINGS_CACHE_MAXSIZE, COURSE_SETTINGS_CACHE_TTL
+from .log import get_logger
+from .options import GRADING_OPTIONS
+from .signals import on_course_published
+
+logger = get_logger("course_settings")
+
+# The course attributes we extract. Attributes the course does not define are left out, so readers should use
+# getattr(settings, name, default).
+COURSE_SETTINGS = tuple(option.course_attr for option in GRADING_OPTIONS) + ("max_attempts",)
+
+CACHE_KEY_PREFIX = "swreactxblock.course_settings."
+
+
+_local_cache = LocalCache(COURSE_SETTINGS_CACHE_MAXSIZE, COURSE_SETTINGS_CACHE_TTL)
+
+
+def extract_course_settings(course):
+    """Return a SimpleNamespace holding only the COURSE_SETTINGS attributes that course defines."""
+    values = {}
+    for name in COURSE_SETTINGS:
+        value = getattr(course, name, None)
+        if value is not None:
+            values[name] = value
+    return SimpleNamespace(**values)
+
+
+def get_course_settings(course_id, load_course):
+    """Return the extracted settings for course_id. load_course(course_id) is only called on a cache miss."""
+    key = CACHE_KEY_PREFIX + str(course_id)
+    backend = shared_cache(_local_cache)
+    settings = backend.get(key)
+    if settings is None:
+        settings = extract_course_settings(load_course(course_id))
+        backend.set(key, settings, COURSE_SETTINGS_CACHE_TTL)
+        logger.debug("swreactxblock get_course_settings() loaded %s for %s", settings, course_id)
+    return settings
+
+
+@on_course_published
+def invalidate_course_settings(course_id):
+    """Drop the cached settings for course_id."""
+    shared_cache(_local_cache).delete(CACHE_KEY_PREFIX + str(course_id))
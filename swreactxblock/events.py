@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Change detection for the grade and completion events the swreactxblock publishes.
+
+Every grade event makes the LMS recalculate the learner's persistent grades, and the React app saves after every
+step, so republishing an unchanged grade or completion is real load for nothing. The block remembers, per learner,
+the last grade and completion it published (published_grade and published_completion) and skips an event that would
+publish the same values again. suppressed_events counts the events we skipped in this process, by event type.
+"""
+import threading
+from collections import Counter
+
+
+class EventCounter:
+    """A thread-safe count of events by event type."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def add(self, event_type):
+        with self._lock:
+            self._counts[event_type] += 1
+
+    def __getitem__(self, event_type):
+        return self._counts[event_type]
+
+    @property
+    def total(self):
+        return sum(self._counts.values())
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+suppressed_events = EventCounter()
+
+
+def grade_values(value, max_value):
+    """Return the [value, max_value] pair we remember for a published grade."""
+    return [float(value), float(max_value)]
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming export of swreactxblock learner state, for analysts.
+
+Each StudentModule row of a swreactxblock holds the learner's user_state fields as a JSON object, and the results in it
+are a JSON string of their own, possibly compressed (see codec.py). export_records() turns an iterable of (id,
+student_id, module_state_key, state) rows into flat records, one at a time: the user_state fields listed in
+EXPORT_FIELDS, and optionally the decompressed results and the event counts scoring uses. A field a row doesn't store gets the block's field default, except that the variant_index
+of a row written by earlier versions comes from its copy of the question (see schema.compact_state()). Results are only
+decoded when they are asked for. write_csv() and write_parquet() write the records in batches of BATCH_SIZE as they
+arrive, so an export holds one batch in memory however large the course is.
+
+Parquet output needs pyarrow, which is optional. See scripts/export_state.py for reading the rows from the LMS or from
+a SQLite copy of its courseware_studentmodule table.
+"""
+import csv
+import json
+from itertools import islice
+
+from .log import get_logger
+from .rescore import stored_results
+from .schema import compact_state
+from .scoring import EventCounts, count_events, load_log
+
+logger = get_logger("export")
+
+BATCH_SIZE = 1000
+
+# The StudentModule columns each record starts with.
+ROW_COLUMNS = ("id", "student_id", "module_state_key")
+
+# The user_state fields of the block we export, as columns.
+EXPORT_FIELDS = (
+    "grade",
+    "raw_earned",
+    "count_attempts",
+    "is_answered",
+    "variants_attempted",
+    "variant_index",
+    "last_seq",
+)
+
+RESULTS_COLUMNS = ("results", "log_length")
+COUNT_COLUMNS = EventCounts._fields
+
+# The Parquet type of each column, by name. variants_attempted is a bitmap that can be wider than 64 bits, so we
+# export it as a decimal string.
+PARQUET_TYPES = {
+    "id": "int64",
+    "student_id": "int64",
+    "module_state_key": "string",
+    "grade": "float64",
+    "raw_earned": "float64",
+    "count_attempts": "int64",
+    "is_answered": "bool",
+    "variants_attempted": "string",
+    "variant_index": "int64",
+    "last_seq": "int64",
+    "results": "string",
+    "log_length": "int64",
+    "steps": "int64",
+    "hints": "int64",
+    "errors": "int64",
+    "showme": "int64",
+}
+
+
+def export_columns(results=False, counts=False):
+    """Return the columns of the records export_records() yields with these options, in order."""
+    return ROW_COLUMNS + EXPORT_FIELDS + (RESULTS_COLUMNS if results else ()) + (COUNT_COLUMNS if counts else ())
+
+
+def field_defaults(block_class):
+    """Return the default value of each of EXPORT_FIELDS, from block_class's field definitions."""
+    return {name: block_class.fields[name].default for name in EXPORT_FIELDS}
+
+
+def export_records(rows, defaults, results=False, counts=False):
+    """Yield a record dict for each (id, student_id, module_state_key, state) row, see export_columns().
+
+    state is the row's JSON state string (or an already parsed dict). Rows whose state can't be parsed are skipped.
+    """
+    for row_id, student_id, module_state_key, state in rows:
+        if not isinstance(state, dict):
+            try:
+                state = json.loads(state or "{}")
+            except ValueError as e:
+                logger.warning("swreactxblock export skipping row %s: %s", row_id, e)
+                continue
+        # Rows written by earlier versions may only have the variant in their copy of the question.
+        state = compact_state(state)
+        record = {"id": row_id, "student_id": student_id, "module_state_key": str(module_state_key)}
+        for name in EXPORT_FIELDS:
+            record[name] = state.get(name, defaults[name])
+        record["variants_attempted"] = str(record["variants_attempted"])
+        if results or counts:
+            record.update(_results_columns(row_id, stored_results(state), results, counts))
+        yield record
+
+
+def _results_columns(row_id, stored, results, counts):
+    columns = {}
+    event_counts = EventCounts(None, None, None, None)
+    log_length = None
+    if stored:
+        # pylint: disable=W0718
+        try:
+            log = load_log(stored)
+            event_counts = count_events(log)
+            log_length = len(log)
+        except Exception as e:
+            logger.warning("swreactxblock export could not read the results of row %s: %s", row_id, e)
+    if results:
+        columns["results"] = stored
+        columns["log_length"] = log_length
+    if counts:
+        columns.update(event_counts._asdict())
+    return columns
+
+
+def batches(records, size=BATCH_SIZE):
+    """Yield lists of up to size records."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_csv(records, f, columns, batch_size=BATCH_SIZE):
+    """Write records to the text file f as CSV with a header row. Returns the number of records written."""
+    writer = csv.DictWriter(f, fieldnames=columns)
+    writer.writeheader()
+    written = 0
+    for batch in batches(records, batch_size):
+        writer.writerows(batch)
+        written += len(batch)
+    return written
+
+
+def write_parquet(records, path, columns, batch_size=BATCH_SIZE):
+    """Write records to a Parquet file at path, one row group per batch. Returns the number of records written."""
+    # pylint: disable=C0415
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.type_for_alias(PARQUET_TYPES[name])) for name in columns])
+    written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches(records, batch_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            written += len(batch)
+    return written
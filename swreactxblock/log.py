@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Logging helpers for the swreactxblock runtime code.
+
+Each subsystem of the xblock logs through its own logger, "swreactxblock.<subsystem>", so levels can be tuned
+independently. Levels come from the environment:
+
+    SWREACT_LOG_LEVEL=WARNING                      default level for every subsystem
+    SWREACT_LOG_LEVELS=view=DEBUG,grading=INFO     per-subsystem overrides
+
+or from the Django LOGGING setting, which configures the same logger names. Always pass arguments %-style, e.g.
+logger.debug("save_grade() data=%s", truncate(data)), so nothing is formatted unless the record is actually emitted.
+"""
+import itertools
+import logging
+import os
+
+LOG_MAX_CHARS = int(os.environ.get("SWREACT_LOG_MAX_CHARS", "500"))
+# Partial results arrive after every step, so we only log one out of this many of them at INFO.
+LOG_SAMPLE_PARTIAL_RESULTS = int(os.environ.get("SWREACT_LOG_SAMPLE_PARTIAL_RESULTS", "100"))
+
+
+def _configured_levels():
+    levels = {}
+    for item in os.environ.get("SWREACT_LOG_LEVELS", "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_DEFAULT_LEVEL = os.environ.get("SWREACT_LOG_LEVEL", "").upper()
+_LEVELS = _configured_levels()
+
+
+def get_logger(subsystem):
+    """Return the logger for subsystem, applying any level configured in the environment."""
+    logger = logging.getLogger(f"swreactxblock.{subsystem}")
+    level = _LEVELS.get(subsystem, _DEFAULT_LEVEL)
+    if level:
+        logger.setLevel(level)
+    return logger
+
+
+class truncate:  # pylint: disable=C0103
+    """Lazily formats obj for logging, cutting the text off after limit characters.
+
+    The str() of obj is only computed if the log record is emitted.
+    """
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj, limit=LOG_MAX_CHARS):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self):
+        text = str(self.obj)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}...[{len(text) - self.limit} more chars]"
+
+    __repr__ = __str__
+
+
+class LogSampler:
+    """Lets one out of every `every` high-volume events through. every <= 1 lets every event through."""
+
+    def __init__(self, every):
+        self.every = every
+        self._counter = itertools.count()
+
+    def __call__(self):
+        if self.every <= 1:
+            return True
+        return next(self._counter) % self.every == 0
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative resolution of the swreactxblock grading options.
+
+Every grading option can be set per question (a q_* content field on the xblock), course-wide (a stepwise_* advanced
+setting on the course), or fall back to a built-in default. We prefer the per-question setting to the course setting,
+and the course setting to the default. A per-question value equal to the option's 'unset' marker (-1, or "" for the
+app key) means "use the course setting".
+
+Resolving is a handful of lookups, so we resolve on every request rather than caching the result. The course settings
+come from the course settings cache (see course_settings.py), which is shared between processes when Django's cache is
+configured, so a course republished in Studio drops them for every LMS worker at once.
+"""
+from collections import namedtuple
+
+from .log import get_logger
+
+logger = get_logger("options")
+
+DEFAULT_APP_KEY = "SBIRPhase2"
+
+# name: the key in the resolved options dict.
+# question_field: the per-question xblock field.
+# course_attr: the course-wide advanced setting.
+# default: used when neither the question nor the course sets the option.
+# unset: the value that means "not set" for both the question field and the course setting.
+GradingOption = namedtuple(
+    "GradingOption", ["name", "question_field", "course_attr", "default", "unset"]
+)
+
+# NOTE: Don't assume 3 points per problem in swreactxblock, so the showme deduction defaults to 0.25 rather than 3.0,
+# and don't assume a min steps deduction (0.0 rather than 0.25).
+# max_attempts has no built-in default: it falls back to the course-wide max_attempts used for CAPA problems.
+GRADING_OPTIONS = (
+    GradingOption("weight", "q_weight", "stepwise_weight", 1.0, -1),
+    GradingOption("max_attempts", "q_max_attempts", "stepwise_max_attempts", None, -1),
+    GradingOption("option_hint", "q_option_hint", "stepwise_option_hint", True, -1),
+    GradingOption("option_showme", "q_option_showme", "stepwise_option_showme", True, -1),
+    GradingOption("grade_showme_ded", "q_grade_showme_ded", "stepwise_grade_showme_ded", 0.25, -1),
+    GradingOption("grade_hints_count", "q_grade_hints_count", "stepwise_grade_hints_count", 2, -1),
+    GradingOption("grade_hints_ded", "q_grade_hints_ded", "stepwise_grade_hints_ded", 1.0, -1),
+    GradingOption("grade_errors_count", "q_grade_errors_count", "stepwise_grade_errors_count", 2, -1),
+    GradingOption("grade_errors_ded", "q_grade_errors_ded", "stepwise_grade_errors_ded", 1.0, -1),
+    GradingOption("grade_min_steps_count", "q_grade_min_steps_count", "stepwise_grade_min_steps_count", 3, -1),
+    GradingOption("grade_min_steps_ded", "q_grade_min_steps_ded", "stepwise_grade_min_steps_ded", 0.0, -1),
+    GradingOption("grade_app_key", "q_grade_app_key", "stepwise_grade_app_key", DEFAULT_APP_KEY, ""),
+)
+
+
+def _value(obj, attr, unset):
+    """Return obj.attr, or unset if it is missing or None (e.g. an old course or an old imported xblock)."""
+    value = getattr(obj, attr, unset)
+    return unset if value is None else value
+
+
+def question_values(block):
+    """Return the tuple of per-question option values for block, in GRADING_OPTIONS order."""
+    return tuple(_value(block, option.question_field, option.unset) for option in GRADING_OPTIONS)
+
+
+def resolve_options(values, course):
+    """Resolve the per-question values (as returned by question_values()) against course. Returns a dict."""
+    resolved = {}
+    for option, value in zip(GRADING_OPTIONS, values):
+        if value == option.unset:
+            value = _value(course, option.course_attr, option.unset)
+        if value == option.unset:
+            value = option.default
+            if value is None:
+                value = _value(course, option.name, -1)
+        resolved[option.name] = value
+    return resolved
+
+
+def get_options(block, course_id, load_course):
+    """Return the resolved grading options for block in course_id, with the course from load_course(course_id)."""
+    resolved = resolve_options(question_values(block), load_course(course_id))
+    logger.debug("swreactxblock get_options() resolved %s for %s", resolved, course_id)
+    return resolved
+
+
+def default_options(block_class, course=None):
+    """Return the options resolved for a block of block_class whose per-question fields are unchanged from their
+    defaults, in course, or in a course with no stepwise_* advanced settings if course is None."""
+    values = tuple(block_class.fields[option.question_field].default for option in GRADING_OPTIONS)
+    return resolve_options(values, object() if course is None else course)
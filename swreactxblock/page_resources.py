@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Page-level resources shared by every swreactxblock student_view on a page.
+
+This module only gathers the resources every student_view adds into one place, so they can't drift apart between
+blocks. It doesn't make pages any smaller: when the runtime merges the fragments of several swreactxblocks,
+web_fragments' Fragment already keeps only the first copy of each identical (kind, data, mimetype, placement) resource.
+Only the per-block window.swReact data (see payload.py) differs from block to block.
+"""
+from . import resources
+
+# Static HTML added to the page <head>.
+HEAD_RESOURCES = (
+    '<meta charset="UTF-8"/>',
+    '<link rel="apple-touch-icon" sizes="180x180" href="/apple-touch-icon.png" />',
+    '<link rel="icon" type="image/png" sizes="32x32" href="/favicon-32x32.png" />',
+    '<link rel="icon" type="image/png" sizes="16x16" href="/favicon-16x16.png" />',
+    '<meta name="viewport" content="width=device-width,initial-scale=1.0"/>',
+    '<link rel="preconnect" href="https://fonts.googleapis.com" />',
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin />',
+    '<link href="https://fonts.googleapis.com/css2?family=Capriola&family=Inter:ital,opsz,wght@0,14..32,100..900;1,14..32,100..900&family=Irish+Grover&display=swap" rel="stylesheet" />',
+    "<title>Querium StepWise React</title>",
+)
+
+STUDENT_CSS = ("static/css/swreactxstudent.css",)
+
+# swreactxstudent.js defines the SWREACTXStudent entry point; final_callback.js defines swreact_problems[].
+STUDENT_JS = (
+    "static/js/src/swreactxstudent.js",
+    "static/js/src/final_callback.js",
+)
+
+STUDENT_JS_URLS = (
+    # Our own snippet of javascript code so we can add debugging code on the fly without re-building the xblock
+    "//swm-openedx-us-dev-storage.s3.us-east-2.amazonaws.com/static/js/swpwrxblock.js",
+    # Bugfender library for console log capture
+    "//js.bugfender.com/bugfender-v2.js",
+)
+
+
+def add_student_page_resources(frag, block):
+    """Add the resources every swreactxblock student_view on a page shares to frag."""
+    for html in HEAD_RESOURCES:
+        frag.add_resource(html, "text/html", "head")
+    for path in STUDENT_CSS:
+        frag.add_css(resources.resource_string(path))
+    for path in STUDENT_JS:
+        frag.add_javascript(resources.resource_string(path))
+    for url in STUDENT_JS_URLS:
+        frag.add_javascript_url(url)
+    # The onComplete/onStep callbacks the window.swReact payload refers to are in a static, browser-cacheable file.
+    frag.add_javascript_url(
+        resources.versioned_url(block.runtime.local_resource_url(block, resources.HANDLERS_JS_PATH))
+    )
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Builder for the window.swReact bootstrap payload that student_view passes to the React app.
+
+We assemble the payload as a plain dict and serialize it once with json.dumps. The result is made safe for inlining
+inside a <script> element in a single str.translate() pass: '<', '>' and '&' are written as \\u escapes so that neither
+'</script>' nor '<!--' can appear in the output, and U+2028/U+2029 are escaped because older Javascript engines treat
+them as line terminators inside string literals. JSON string escaping takes care of quotes, so stimulus, definition
+and hint text no longer need any ad-hoc &apos;/&quot; replacement.
+"""
+import json
+
+from .const import (
+    REQUEST_COMPRESSION,
+    RESUME_MODE,
+    RESUME_MODE_FETCH,
+    RESUME_MODE_LEGACY,
+    STEP_FLUSH_MS,
+    VALID_RESUME_MODES,
+)
+from .log import get_logger
+
+logger = get_logger("payload")
+
+if RESUME_MODE not in VALID_RESUME_MODES:
+    raise ValueError(
+        f"Invalid value received for SWREACT_RESUME_MODE: {RESUME_MODE}. Expected one of {VALID_RESUME_MODES}."
+    )
+
+SWAPI_URL = "https://swapi2.onrender.com"
+GLTF_URL = "https://s3.amazonaws.com/stepwise-editorial.querium.com/swpwr/dist/models/"
+POLICY_ID = "$A9$"
+
+# Invalid schema choices should be a CSV list of one or more of these: "TOTAL", "DIFFERENCE", "CHANGEINCREASE",
+# "CHANGEDECREASE", "EQUALGROUPS", and "COMPARE". Invalid schema choices can also be the official names, which we
+# pass through unchanged. NB: The order of the .replace() calls might matter if one of these schema names is a
+# substring of another name.
+SCHEMA_NAMES = {
+    "TOTAL": "additiveTotalSchema",
+    "DIFFERENCE": "additiveDifferenceSchema",
+    "CHANGEINCREASE": "additiveChangeSchema",
+    "CHANGEDECREASE": "subtractiveChangeSchema",
+    "EQUALGROUPS": "multiplicativeEqualGroupsSchema",
+    "COMPARE": "multiplicativeCompareSchema",
+}
+
+_SCRIPT_SAFE = str.maketrans(
+    {
+        "<": "\\u003c",
+        ">": "\\u003e",
+        "&": "\\u0026",
+        "\u2028": "\\u2028",
+        "\u2029": "\\u2029",
+    }
+)
+
+
+def script_safe_dumps(obj):
+    """Serialize obj to compact JSON that can be inlined in a <script> element."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).translate(_SCRIPT_SAFE)
+
+
+def disabled_schemas(invalid_schemas):
+    """Convert the upper-case schema names in invalid_schemas to the 'official' names the React app expects."""
+    for schema_key, schema_value in SCHEMA_NAMES.items():
+        invalid_schemas = invalid_schemas.replace(schema_key, schema_value)
+    return invalid_schemas
+
+
+def problem_hints(hints_string):
+    """Decode the optional problem-specific hints JSON, returning [] if it can't be decoded."""
+    # pylint: disable=W0718
+    try:
+        return json.loads(hints_string or "[]")
+    except Exception as e:
+        logger.warning("swreactxblock problem_hints() could not decode wpHints string: %s", e)
+        return []
+
+
+def resume_fields(results, mode=RESUME_MODE):
+    """Return the oldSession/oldLog payload attributes for a persisted '[session, log]' results string.
+
+    In RESUME_MODE_LEGACY the whole results string is also passed as oldSessionLogCombo, which ships the previous
+    attempt to the browser twice.
+    """
+    if not results:
+        # If no previous attempt data, set these to empty values
+        return {"oldSession": "{}", "oldLog": "[]"}
+    # pylint: disable=W0718
+    try:
+        session, log = json.loads(results)
+    except Exception as e:
+        logger.error("swreactxblock resume_fields() could not load json from results: %s", e)
+        return {"oldSession": "{}", "oldLog": "[]"}
+    fields = {
+        "oldSession": json.dumps(session, separators=(",", ":")),
+        "oldLog": json.dumps(log, separators=(",", ":")),
+    }
+    if mode == RESUME_MODE_LEGACY:
+        fields["oldSessionLogCombo"] = results
+    return fields
+
+
+def build_payload(block, results="", resume_mode=RESUME_MODE, question=None):
+    """Return the window.swReact payload dict for block, resuming from the persisted results string if any.
+
+    question is the question structure of the variant to show (see question.py), by default the block's own content.
+    """
+    if question is None:
+        question = block.question_for(0)
+    if resume_mode == RESUME_MODE_FETCH:
+        # Don't embed the previous attempt. The app fetches it from resumeUrl if it needs it.
+        payload = {
+            "oldSession": "{}",
+            "oldLog": "[]",
+            "resumable": bool(results),
+            "resumeUrl": block.runtime.handler_url(block, "get_resume_data"),
+        }
+    else:
+        payload = resume_fields(results, resume_mode)
+    # Each block's onStep and onComplete post to its own handlers (see public/js/swreact_handlers.js).
+    payload["partialResultsUrl"] = block.runtime.handler_url(block, "save_swreact_partial_results")
+    payload["finalResultsUrl"] = block.runtime.handler_url(block, "save_swreact_final_results")
+    # The student javascript numbers its submissions from here (see sequence.py).
+    payload["lastSeq"] = block.last_seq
+    # The student javascript batches step posts over this interval (see public/js/swreact_handlers.js).
+    payload["stepFlushMs"] = STEP_FLUSH_MS
+    # ... and may gzip them (see request_body.py).
+    payload["compressRequests"] = REQUEST_COMPRESSION
+    payload["options"] = {
+        "swapiUrl": SWAPI_URL,
+        "gltfUrl": GLTF_URL,
+        "rank": block.q_swreact_rank,
+        "disabledSchemas": disabled_schemas(block.q_swreact_invalid_schemas),
+    }
+    username, fullname = block.user_names()
+    payload["student"] = {
+        "studentId": username,
+        "fullName": fullname,
+        "familiarName": "NONE",
+    }
+    payload["problem"] = {
+        "appKey": block.resolved_options()["grade_app_key"],
+        "policyId": POLICY_ID,
+        "problemId": block.q_id,
+        "variantIndex": question["q_index"],
+        "title": "SAMPLE",
+        "stimulus": str(question["q_stimulus"]),
+        "topic": "gradeBasicAlgebra",
+        "definition": str(question["q_definition"]),
+        "wpHintsString": str(question["q_swreact_problem_hints"]),
+        "wpHints": problem_hints(question["q_swreact_problem_hints"]),
+        "mathHints": [str(question["q_hint1"]), str(question["q_hint2"]), str(question["q_hint3"])],
+    }
+    return payload
+
+
+def bootstrap_script(payload, block_id):
+    """Return the Javascript that registers payload for block_id and makes it window.swReact.
+
+    Every swreactxblock on a page registers its payload in window.swReactBlocks under its usage id, so a page with
+    several blocks keeps each block's data. window.swReact is the payload of the most recently rendered block, as it
+    always has been. The onComplete and onStep callbacks are code, not data, so they live in the static
+    public/js/swreact_handlers.js. Its window.swReactHandlersFor(block_id) returns handlers that post to this block's
+    own handler URLs. If that file hasn't loaded yet, it attaches the handlers itself when it does.
+    """
+    key = script_safe_dumps(block_id)
+    return (
+        "window.swReactBlocks = window.swReactBlocks || {};"
+        f"window.swReact = window.swReactBlocks[{key}] = {script_safe_dumps(payload)};"
+        f"if (window.swReactHandlersFor) {{ window.swReact.handlers = window.swReactHandlersFor({key}); }}"
+    )
@@ -0,0 +1,326 @@
+/* Result callbacks for the SWREACT React app.
+ *
+ * The React app calls window.swReact.handlers.onStep after each step and
+ * window.swReact.handlers.onComplete when the problem is complete, passing its
+ * session and log. Every swreactxblock on a page registers its own payload in
+ * window.swReactBlocks under its usage id (see payload.py), and gets its own
+ * handlers from window.swReactHandlersFor(usageId). They POST to the handler
+ * URLs in that block's payload (partialResultsUrl and finalResultsUrl), so a
+ * page with several blocks saves each block's results to that block.
+ *
+ * Steps are queued per block rather than posted one by one. We keep only the
+ * newest session and log, and post them the block's stepFlushMs after the
+ * first queued step, one POST at a time. When the page is hidden or unloaded
+ * we send whatever is queued with navigator.sendBeacon, which the browser
+ * delivers even after the page is gone. Failed POSTs (network errors, 429 and
+ * 5xx) are retried with exponential backoff. Final results are posted at once
+ * and supersede any queued step. The reply to them holds the score breakdown,
+ * which we hand to the app in a "swreact:score" event.
+ *
+ * Where the browser supports CompressionStream and the block's compressRequests
+ * is set, POST bodies of SWREACT_COMPRESS_MIN_SIZE characters or more are gzipped
+ * and sent with "Content-Encoding: gzip" (see request_body.py). If the server
+ * refuses one, we resend it as plain JSON and stop compressing. Beacons are always
+ * plain JSON, since compressing is asynchronous and the page is going away.
+ *
+ * Every submission carries a sequence number, counted per block from the
+ * block's lastSeq, so the server can ignore retried, repeated or overtaken
+ * submissions. It replies "stale" with its last accepted number if we fall
+ * behind it (e.g. the problem is open in another tab).
+ *
+ * This file is static and is served with long cache lifetimes, so it is shared
+ * by every swreact problem in a course. The per-problem payload built by
+ * student_view holds data only.
+ */
+
+const SWREACT_STEP_FLUSH_MS = 2000;
+const SWREACT_RETRY_MS = 1000;
+const SWREACT_MAX_RETRY_MS = 30000;
+const SWREACT_MAX_RETRIES = 6;
+
+// Bodies shorter than this are posted uncompressed, since gzip gains little on them.
+const SWREACT_COMPRESS_MIN_SIZE = 1024;
+
+// Cleared if the server refuses a compressed body, so we post plain JSON from then on.
+var swreactCompress = typeof CompressionStream !== "undefined";
+
+function swreactGzip(json) {
+  const stream = new Blob([json])
+    .stream()
+    .pipeThrough(new CompressionStream("gzip"));
+  return new Response(stream).arrayBuffer();
+}
+
+function swreactAjax(queue, name, url, data, encoding, onSuccess, onError) {
+  $.ajax({
+    type: "POST",
+    url: url,
+    data: data,
+    processData: false,
+    contentType: "application/json",
+    headers: encoding ? { "Content-Encoding": encoding } : {},
+    success: function (data) {
+      console.info(name + " POST success", data);
+      if (data && data.result === "stale") {
+        swreactSeenSeq(queue, data.seq);
+      }
+      if (onSuccess) {
+        onSuccess(data);
+      }
+    },
+    error: function (jqXHR, textStatus, errorThrown) {
+      console.info(
+        name + " POST error textStatus=",
+        textStatus,
+        " errorThrown=",
+        errorThrown,
+      );
+      if (onError) {
+        onError(jqXHR.status);
+      }
+    },
+  });
+}
+
+function swreactPost(queue, name, url, body, onSuccess, onError) {
+  const json = JSON.stringify(body);
+  const failed = function (status) {
+    if (onError) {
+      // Only network errors, throttling and server errors are worth retrying.
+      onError(status === 0 || status === 429 || status >= 500);
+    }
+  };
+  const compress =
+    swreactCompress &&
+    queue.block.compressRequests &&
+    json.length >= SWREACT_COMPRESS_MIN_SIZE;
+  if (!compress) {
+    swreactAjax(queue, name, url, json, null, onSuccess, failed);
+    return;
+  }
+  swreactGzip(json).then(
+    function (gzipped) {
+      swreactAjax(
+        queue,
+        name,
+        url,
+        gzipped,
+        "gzip",
+        onSuccess,
+        function (status) {
+          if (status === 400 || status === 415) {
+            // Something between us and the server doesn't pass gzip bodies through, so stop compressing.
+            console.warn(
+              name + " compressed POST refused, posting plain JSON",
+            );
+            swreactCompress = false;
+            swreactAjax(queue, name, url, json, null, onSuccess, failed);
+            return;
+          }
+          failed(status);
+        },
+      );
+    },
+    function (err) {
+      console.info(name + " could not compress, posting plain JSON", err);
+      swreactAjax(queue, name, url, json, null, onSuccess, failed);
+    },
+  );
+}
+
+function swreactBackoffMs(retries) {
+  const delay = Math.min(
+    SWREACT_MAX_RETRY_MS,
+    SWREACT_RETRY_MS * Math.pow(2, retries),
+  );
+  return delay * (0.5 + Math.random() / 2);
+}
+
+function swreactNextSeq(queue) {
+  queue.seq = Math.max(queue.seq, queue.block.lastSeq || 0) + 1;
+  return queue.seq;
+}
+
+function swreactSeenSeq(queue, seq) {
+  queue.seq = Math.max(queue.seq, seq || 0);
+}
+
+// The step queue of each block, keyed by its usage id. It holds the block's
+// payload, the last sequence number we used for it, and its queued step.
+var swreactQueues = {};
+
+function swreactQueue(blockId) {
+  if (!swreactQueues[blockId]) {
+    const block =
+      (window.swReactBlocks && window.swReactBlocks[blockId]) || {};
+    swreactQueues[blockId] = {
+      key: blockId,
+      block: block,
+      partialUrl: block.partialResultsUrl,
+      finalUrl: block.finalResultsUrl,
+      flushMs: block.stepFlushMs || SWREACT_STEP_FLUSH_MS,
+      seq: 0,
+      pending: null,
+      timer: null,
+      inFlight: false,
+      retries: 0,
+    };
+  }
+  return swreactQueues[blockId];
+}
+
+function swreactSchedule(queue, delay) {
+  if (!queue.timer) {
+    queue.timer = setTimeout(function () {
+      swreactFlush(queue);
+    }, delay);
+  }
+}
+
+function swreactQueueStep(queue, session, log) {
+  queue.pending = { session: session, log: log };
+  swreactSchedule(queue, queue.flushMs);
+}
+
+function swreactFlush(queue) {
+  clearTimeout(queue.timer);
+  queue.timer = null;
+  if (!queue.pending || queue.inFlight) {
+    return;
+  }
+  const step = queue.pending;
+  queue.pending = null;
+  queue.inFlight = true;
+  swreactPostStep(queue, step.session, step.log, function (ok, retry) {
+    queue.inFlight = false;
+    if (ok) {
+      queue.retries = 0;
+    } else if (retry && queue.retries < SWREACT_MAX_RETRIES) {
+      // Retry with the newest state, which may have been queued meanwhile.
+      queue.pending = queue.pending || step;
+      swreactSchedule(queue, swreactBackoffMs(queue.retries++));
+      return;
+    } else {
+      console.warn("onStep giving up on a step after retries=", queue.retries);
+      queue.retries = 0;
+    }
+    if (queue.pending) {
+      swreactSchedule(queue, queue.flushMs);
+    }
+  });
+}
+
+function swreactPostStep(queue, session, log, done) {
+  swreactPost(
+    queue,
+    "onStep",
+    queue.partialUrl,
+    { seq: swreactNextSeq(queue), results: [session, log] },
+    function () {
+      done(true);
+    },
+    function (retry) {
+      done(false, retry);
+    },
+  );
+}
+
+// Send every queued step with sendBeacon, for when the page is going away.
+function swreactFlushBeacon() {
+  for (const queue of Object.values(swreactQueues)) {
+    if (!queue.pending) {
+      continue;
+    }
+    clearTimeout(queue.timer);
+    queue.timer = null;
+    const body = JSON.stringify({
+      seq: swreactNextSeq(queue),
+      results: [queue.pending.session, queue.pending.log],
+    });
+    const sent =
+      navigator.sendBeacon &&
+      navigator.sendBeacon(
+        queue.partialUrl,
+        new Blob([body], { type: "application/json" }),
+      );
+    if (sent) {
+      queue.pending = null;
+    } else {
+      swreactFlush(queue);
+    }
+  }
+}
+
+document.addEventListener("visibilitychange", function () {
+  if (document.visibilityState === "hidden") {
+    swreactFlushBeacon();
+  }
+});
+window.addEventListener("pagehide", swreactFlushBeacon);
+
+// Show the learner the score the server stored. The app listens for the
+// "swreact:score" event, whose detail also names the block; it no longer
+// scores the attempt itself.
+function swreactShowScore(queue, data) {
+  if (!(data && data.score)) {
+    return;
+  }
+  queue.block.score = data.score;
+  document.dispatchEvent(
+    new CustomEvent("swreact:score", {
+      detail: Object.assign({ blockId: queue.key }, data.score),
+    }),
+  );
+}
+
+function swreactPostFinal(queue, body, retries) {
+  swreactPost(
+    queue,
+    "onComplete",
+    queue.finalUrl,
+    body,
+    function (data) {
+      swreactShowScore(queue, data);
+    },
+    function (retry) {
+      if (retry && retries < SWREACT_MAX_RETRIES) {
+        // Retry with the same sequence number, so the server ignores a repeat.
+        setTimeout(function () {
+          swreactPostFinal(queue, body, retries + 1);
+        }, swreactBackoffMs(retries));
+      }
+    },
+  );
+}
+
+// Return the onComplete and onStep handlers of the block with usage id blockId.
+window.swReactHandlersFor = function (blockId) {
+  return {
+    onComplete: (session, log) => {
+      const queue = swreactQueue(blockId);
+      // The final results supersede any step still waiting to be posted.
+      queue.pending = null;
+      clearTimeout(queue.timer);
+      queue.timer = null;
+      swreactPostFinal(
+        queue,
+        { seq: swreactNextSeq(queue), results: [session, log] },
+        0,
+      );
+      $(".problem-complete").show();
+      $(".unit-navigation").show();
+    },
+    onStep: (session, log) => {
+      swreactQueueStep(swreactQueue(blockId), session, log);
+    },
+  };
+};
+
+// student_view attaches each block's handlers when it registers the block's
+// payload. Also attach them here for blocks registered before this file loaded.
+for (const blockId of Object.keys(window.swReactBlocks || {})) {
+  if (!window.swReactBlocks[blockId].handlers) {
+    window.swReactBlocks[blockId].handlers =
+      window.swReactHandlersFor(blockId);
+  }
+}
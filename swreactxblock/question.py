@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+The question structure get_data and retry send to the student javascript.
+
+The question is built at response time from the block's content fields and resolved grading options, for the
+learner's variant. We only persist the variant index and the content version it was picked for (variant_index and
+content_version on the block), not a copy of the question: that would duplicate the author's content into every
+learner's StudentModule row. Blocks saved by earlier versions have such a copy in the user_state question field, which
+the block drops the next time it writes the learner's state.
+
+A block holds any number of variants of its question. Variant 0 is the block's own content fields. Variants 1..N are
+the entries of the q_variants content field, a JSON array of objects, each setting some of the keys in VARIANT_KEYS,
+e.g. [{"stimulus": "...", "definition": "..."}, ...]; keys a variant doesn't set are variant 0's. Authors edit the
+whole list at once in Studio. The list is parsed once per process for each distinct q_variants value (so once per
+content version) into a tuple of {content field: value} dicts, indexed by variant number - 1. The student view, get_data
+and retry all serve the learner's variant from build_question().
+"""
+import hashlib
+import json
+
+from .cache import TTLCache
+from .const import VARIANTS_CACHE_MAXSIZE, VARIANTS_CACHE_TTL
+from .log import get_logger
+
+logger = get_logger("question")
+
+# The content fields the question is built from, in the order they appear in the question structure.
+QUESTION_CONTENT_FIELDS = (
+    "q_id",
+    "q_label",
+    "q_stimulus",
+    "q_definition",
+    "q_type",
+    "q_display_math",
+    "q_hint1",
+    "q_hint2",
+    "q_hint3",
+    "q_swreact_problem",
+    "q_swreact_rank",
+    "q_swreact_invalid_schemas",
+    "q_swreact_problem_hints",
+)
+
+# The content fields a variant can set, by their key in a q_variants entry.
+VARIANT_KEYS = {
+    "stimulus": "q_stimulus",
+    "definition": "q_definition",
+    "display_math": "q_display_math",
+    "hint1": "q_hint1",
+    "hint2": "q_hint2",
+    "hint3": "q_hint3",
+    "swreact_problem": "q_swreact_problem",
+    "swreact_problem_hints": "q_swreact_problem_hints",
+}
+
+# The content field holding the variants after variant 0.
+VARIANTS_FIELD = "q_variants"
+
+# The question keys for the resolved grading options (see options.py), by option name.
+QUESTION_OPTION_KEYS = (
+    ("q_weight", "weight"),
+    ("q_max_attempts", "max_attempts"),
+    ("q_option_hint", "option_hint"),
+    ("q_option_showme", "option_showme"),
+    ("q_grade_showme_ded", "grade_showme_ded"),
+    ("q_grade_hints_count", "grade_hints_count"),
+    ("q_grade_hints_ded", "grade_hints_ded"),
+    ("q_grade_errors_count", "grade_errors_count"),
+    ("q_grade_errors_ded", "grade_errors_ded"),
+    ("q_grade_min_steps_count", "grade_min_steps_count"),
+    ("q_grade_min_steps_ded", "grade_min_steps_ded"),
+    ("q_grade_app_key", "grade_app_key"),
+)
+
+
+_parsed_variants = TTLCache(maxsize=VARIANTS_CACHE_MAXSIZE, ttl=VARIANTS_CACHE_TTL)
+
+
+def content_version(block):
+    """Return a short digest of block's question content. It changes whenever an author edits the question."""
+    content = [getattr(block, name) for name in QUESTION_CONTENT_FIELDS + (VARIANTS_FIELD,)]
+    return hashlib.blake2b(json.dumps(content).encode("utf8"), digest_size=8).hexdigest()
+
+
+def parse_variants(raw):
+    """Parse a q_variants JSON string into a tuple of {content field: value} dicts, one per variant after variant 0.
+
+    Problem hints may be given as JSON rather than as a JSON string. Raises ValueError for a malformed list.
+    """
+    if not raw or not raw.strip():
+        return ()
+    entries = json.loads(raw)
+    if not isinstance(entries, list):
+        raise ValueError("variants must be a JSON array of objects")
+    variants = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError("variant {} must be an object".format(number))
+        unknown = sorted(set(entry) - set(VARIANT_KEYS))
+        if unknown:
+            raise ValueError(
+                "variant {} has unknown keys {}, expected some of {}".format(
+                    number, ", ".join(unknown), ", ".join(VARIANT_KEYS)
+                )
+            )
+        variant = {}
+        for key, value in entry.items():
+            if key == "swreact_problem_hints" and isinstance(value, (list, dict)):
+                value = json.dumps(value)
+            if not isinstance(value, str):
+                raise ValueError("variant {} {} must be a string".format(number, key))
+            variant[VARIANT_KEYS[key]] = value
+        variants.append(variant)
+    return tuple(variants)
+
+
+def dump_variants(variants):
+    """Return the compact q_variants JSON string for parsed variants, the inverse of parse_variants()."""
+    if not variants:
+        return ""
+    fields = {field: key for key, field in VARIANT_KEYS.items()}
+    entries = [{fields[field]: value for field, value in variant.items()} for variant in variants]
+    return json.dumps(entries, separators=(",", ":"))
+
+
+def variant_table(block):
+    """Return the parsed variants of block after variant 0 (see parse_variants()), from the cache if we can."""
+    raw = getattr(block, VARIANTS_FIELD, "") or ""
+    key = hashlib.blake2b(raw.encode("utf8"), digest_size=16).digest()
+    table = _parsed_variants.get(key)
+    if table is None:
+        try:
+            table = parse_variants(raw)
+        except ValueError as e:
+            logger.error("swreactxblock variant_table() ignoring malformed variants of %s: %s", block.q_id, e)
+            table = ()
+        _parsed_variants.set(key, table)
+    return table
+
+
+def build_question(block, q_index, options, username, variants=None):
+    """Return the question structure for variant q_index of block, for the user with the given username.
+
+    variants is block's variant_table(), if the caller already has it.
+    """
+    question = {"q_id": block.q_id, "q_user": username, "q_index": q_index}
+    for name in QUESTION_CONTENT_FIELDS[1:]:
+        question[name] = getattr(block, name)
+    if q_index >= 1:
+        variants = variant_table(block) if variants is None else variants
+        if q_index <= len(variants):
+            question.update(variants[q_index - 1])
+    for key, name in QUESTION_OPTION_KEYS:
+        question[key] = options[name]
+    return question
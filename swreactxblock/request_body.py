@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Reading the results the student javascript posts, gzip-compressed or not.
+
+On browsers with CompressionStream, the student javascript gzips the JSON body of its results POSTs and marks them with
+a "Content-Encoding: gzip" header. Other browsers, and navigator.sendBeacon on page hide, send plain JSON. Neither
+Django nor the XBlock runtime decodes request bodies, so json_body_handler() does, in place of XBlock.json_handler.
+
+We decompress the body a chunk at a time and stop as soon as it would exceed MAX_REQUEST_BODY_SIZE bytes, so a small
+compressed body can't expand into an unbounded amount of memory.
+
+request_body_stats keeps running totals for this process of the decoded and sent sizes of the bodies we read.
+"""
+import functools
+import json
+import zlib
+
+from webob import Response
+from xblock.core import XBlock
+from xblock.exceptions import JsonHandlerError
+
+from .codec import CodecStats
+from .const import MAX_REQUEST_BODY_SIZE
+from .log import get_logger
+
+logger = get_logger("request_body")
+
+GZIP = "gzip"
+IDENTITY = "identity"
+
+_CHUNK_SIZE = 64 * 1024
+
+request_body_stats = CodecStats()
+
+
+class RequestBodyError(ValueError):
+    """A request body we can't read. status is the HTTP status to respond with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _too_large(max_size):
+    return RequestBodyError(413, "Request body is larger than {} bytes".format(max_size))
+
+
+def read_body(request, max_size=MAX_REQUEST_BODY_SIZE):
+    """Return the decoded body of request as bytes.
+
+    Raises RequestBodyError for an unsupported Content-Encoding (415), a body larger than max_size bytes as sent or
+    decoded (413), or a corrupt gzip body (400).
+    """
+    encoding = (request.headers.get("Content-Encoding") or IDENTITY).strip().lower()
+    if encoding not in (GZIP, IDENTITY):
+        raise RequestBodyError(415, "Unsupported Content-Encoding {}".format(encoding))
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == GZIP else None
+    body = bytearray()
+    sent = 0
+    try:
+        while True:
+            chunk = request.body_file.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            sent += len(chunk)
+            if sent > max_size:
+                raise _too_large(max_size)
+            if decoder is None:
+                body += chunk
+                continue
+            # Ask for at most one byte more than we may still accept, so we notice an oversized body without
+            # decompressing the rest of it.
+            body += decoder.decompress(chunk, max_size - len(body) + 1)
+            if len(body) > max_size or decoder.unconsumed_tail:
+                raise _too_large(max_size)
+        if decoder is not None:
+            if not decoder.eof:
+                raise RequestBodyError(400, "Truncated gzip request body")
+            if decoder.unused_data:
+                raise RequestBodyError(400, "Unexpected data after the gzip request body")
+    except zlib.error as e:
+        raise RequestBodyError(400, "Invalid gzip request body: {}".format(e)) from e
+    request_body_stats.record(len(body), sent)
+    return bytes(body)
+
+
+def read_json(request, max_size=MAX_REQUEST_BODY_SIZE):
+    """Return the JSON-decoded body of request. Raises RequestBodyError, see read_body()."""
+    body = read_body(request, max_size)
+    try:
+        return json.loads(body.decode("utf-8"))
+    except ValueError as e:
+        raise RequestBodyError(400, "Invalid JSON") from e
+
+
+def json_body_handler(func):
+    """Like XBlock.json_handler, but the request body may be gzip-compressed (see read_json())."""
+
+    @XBlock.handler
+    @functools.wraps(func)
+    def wrapper(self, request, suffix=""):
+        if request.method != "POST":
+            return JsonHandlerError(405, "Method must be POST").get_response(allow=["POST"])
+        try:
+            data = read_json(request)
+        except RequestBodyError as e:
+            logger.warning("swreactxblock %s() rejected request body: %s", func.__name__, e)
+            return JsonHandlerError(e.status, str(e)).get_response()
+        try:
+            response = func(self, data, suffix)
+        except JsonHandlerError as err:
+            return err.get_response()
+        if isinstance(response, Response):
+            return response
+        return Response(json.dumps(response), content_type="application/json", charset="utf8")
+
+    return wrapper
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk rescoring of the stored attempts of a swreactxblock.
+
+When a course changes its deduction policy (the stepwise_grade_* advanced settings) or a question changes its own, the
+scores already stored for completed attempts are stale. rescore_rows() recomputes them from the stored results, in
+chunks of learners: it counts each attempt's events (see scoring.py) into NumPy arrays, applies every deduction to the
+whole chunk at once, and passes only the scores that changed to a write callback, which stores them with the block's
+set_score(). Without a write callback it is a dry run, and the RescoreReport lists the changes it would make.
+
+Attempts are rescored the way save_grade() scores them, under SWREACT_SCORING_MODE: in the default "completion" mode
+every completed attempt gets full credit, so only the scores of log mode can differ from the stored ones.
+
+NumPy is optional: without it we score the chunk one attempt at a time, with the same result.
+
+See scripts/rescore.py for rescoring a course or a block from the LMS.
+"""
+import json
+import time
+
+from .codec import decode_results
+from .log import get_logger
+from .const import SCORING_MODE, SCORING_MODE_COMPLETION
+from .scoring import DEDUCTIONS, MAX_SCORE, EventCounts, count_events, has_events, load_log, score_counts
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = get_logger("rescore")
+
+CHUNK_SIZE = 1000
+
+# Scores closer than this to the stored score are left alone.
+TOLERANCE = 1e-9
+
+
+class RescoreReport:
+    """The outcome of a (dry) rescoring run: counts of the rows seen, and the (key, old, new) scores that changed."""
+
+    def __init__(self):
+        self.rows = 0
+        self.answered = 0
+        self.unreadable = 0
+        self.changed = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def diff(self):
+        """Return the changed scores as lines of text."""
+        return ["{} {:.4f} -> {:.4f}".format(key, old, new) for key, old, new in self.changed]
+
+    def summary(self):
+        return "{} rows, {} answered, {} unreadable, {} changed, {:.2f}s ({:.0f} rows/s)".format(
+            self.rows,
+            self.answered,
+            self.unreadable,
+            len(self.changed),
+            self.seconds,
+            self.rows_per_second,
+        )
+
+
+def stored_results(state):
+    """Return the '[session, log]' results string stored in a swreactxblock user state dict."""
+    return decode_results(state.get("swreact_results") or "")
+
+
+def score_chunk(counts, options, mode=SCORING_MODE):
+    """Return the scores of the completed attempts whose EventCounts are the columns of counts, as a list."""
+    if mode == SCORING_MODE_COMPLETION:
+        return [MAX_SCORE] * len(counts[0])
+    if np is None:
+        return [score_counts(EventCounts(*row), options).score for row in zip(*counts)]
+    counts = EventCounts(*(np.asarray(column) for column in counts))
+    deducted = np.zeros(len(counts.steps))
+    for _name, applies, option in DEDUCTIONS:
+        deducted += np.where(applies(counts, options), float(options[option]), 0.0)
+    # Attempts with no recognised events get full credit, as in score_counts().
+    deducted = np.where(has_events(counts), deducted, 0.0)
+    return np.clip(MAX_SCORE - deducted, 0.0, MAX_SCORE).tolist()
+
+
+def _rescore_chunk(chunk, options, mode, write, report):
+    keys, old_scores, columns = [], [], ([], [], [], [])
+    for key, state in chunk:
+        report.rows += 1
+        if not state.get("is_answered"):
+            continue
+        report.answered += 1
+        # pylint: disable=W0718
+        try:
+            counts = count_events(load_log(stored_results(state)))
+        except Exception as e:
+            report.unreadable += 1
+            logger.warning("swreactxblock rescore could not read the results of %s: %s", key, e)
+            continue
+        keys.append(key)
+        old_scores.append(float(state.get("raw_earned") or 0.0))
+        for column, count in zip(columns, counts):
+            column.append(count)
+    if not keys:
+        return
+    for key, old, new in zip(keys, old_scores, score_chunk(EventCounts(*columns), options, mode)):
+        if abs(new - old) > TOLERANCE:
+            report.changed.append((key, old, new))
+            if write is not None:
+                write(key, new)
+
+
+def rescore_rows(rows, options, write=None, chunk_size=CHUNK_SIZE, report=None, mode=SCORING_MODE):
+    """Rescore the attempts in rows, an iterable of (key, user state dict), under one block's resolved options.
+
+    write(key, score) is called for each attempt whose score changed; pass None for a dry run. Attempts that aren't
+    complete keep their score. Returns the RescoreReport, which accumulates across calls if one is passed in.
+    """
+    report = report or RescoreReport()
+    started = time.monotonic()
+    chunk = []
+    for key, state in rows:
+        if isinstance(state, str):
+            state = json.loads(state or "{}")
+        chunk.append((key, state))
+        if len(chunk) >= chunk_size:
+            _rescore_chunk(chunk, options, mode, write, report)
+            chunk = []
+    _rescore_chunk(chunk, options, mode, write, report)
+    report.seconds += time.monotonic() - started
+    return report
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Memoized access to the swreactxblock static resources.
+
+The HTML templates, CSS and Javascript under static/ never change while the LMS is running, so each one is read from
+the package and decoded once per process, and kept for the life of the process. A reinstalled package is picked up
+when the LMS restarts, as it must anyway to load the new code.
+"""
+import functools
+import json
+
+# Python stuff
+import pkg_resources
+
+# our stuff
+from .__about__ import __version__
+from .log import get_logger
+
+logger = get_logger("resources")
+
+SWREACT_VERSION_PATH = "public/dist/assets/swreact_version.json"
+
+# The resources used by the student, studio and author views, in the order we preload them.
+STATIC_RESOURCES = (
+    "static/html/swreactxstudent.html",
+    "static/css/swreactxstudent.css",
+    "static/js/src/swreactxstudent.js",
+    "static/js/src/final_callback.js",
+    "static/html/swreactxstudio.html",
+    "static/css/swreactxstudio.css",
+    "static/js/src/swreactxstudio.js",
+    "static/html/swreactxauthor.html",
+    "static/css/swreactxauthor.css",
+    "static/js/src/swreactxauthor.js",
+)
+
+
+# Static files served by URL from the xblock's public/ directory rather than inlined in each fragment.
+HANDLERS_JS_PATH = "public/js/swreact_handlers.js"
+
+
+@functools.lru_cache(maxsize=1)
+def installed_version():
+    """Return a string identifying the installed xblock and swreact versions, e.g. '18.1.2-v1.9.216'."""
+    # pylint: disable=W0718
+    try:
+        swreact_version = json.loads(
+            pkg_resources.resource_string(__name__, SWREACT_VERSION_PATH).decode("utf8")
+        )["version"]
+    except Exception:
+        swreact_version = "unknown"
+    return f"{__version__}-{swreact_version}"
+
+
+@functools.lru_cache(maxsize=None)
+def resource_string(path):
+    """Return the decoded contents of the package resource at path, loading it from disk only once."""
+    data = pkg_resources.resource_string(__name__, path)
+    return data.decode("utf8")
+
+
+def preload(paths=STATIC_RESOURCES):
+    """Load paths into the cache ahead of the first request. Missing resources are logged and skipped."""
+    # pylint: disable=W0718
+    for path in paths:
+        try:
+            resource_string(path)
+        except Exception as e:
+            logger.warning("swreactxblock preload() could not load %s: %s", path, e)
+
+
+def versioned_url(url):
+    """Append the installed version to a static resource URL so browsers can cache it until the next install."""
+    return f"{url}{'&' if '?' in url else '?'}v={installed_version()}"
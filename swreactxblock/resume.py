@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for serving a previous attempt's session and log on demand.
+
+In the "fetch" resume mode, student_view no longer embeds the persisted '[session, log]' results in the page. It only
+tells the React app that resumable state exists and where to fetch it (window.swReact.resumeUrl). The app then calls
+the get_resume_data handler, optionally asking for a range of log entries, so learners who never resume, or who only
+need the latest session, don't download the whole log on every page view.
+"""
+import hashlib
+import json
+
+from .log import get_logger
+
+logger = get_logger("resume")
+
+
+def results_etag(results):
+    """Return an ETag for a persisted results string. It changes whenever the results change."""
+    return hashlib.blake2b(results.encode("utf8"), digest_size=16).hexdigest()
+
+
+def parse_range(params):
+    """Return (offset, limit) from the offset/limit query parameters. limit is None for "all remaining entries".
+
+    Raises ValueError for values that aren't integers.
+    """
+    offset = max(int(params.get("offset") or 0), 0)
+    limit = params.get("limit")
+    limit = None if limit in (None, "") else max(int(limit), 0)
+    return offset, limit
+
+
+def resume_page(results, offset=0, limit=None):
+    """Return the session and log[offset:offset+limit] of a persisted results string, as a dict.
+
+    limit=0 returns the session alone. total is the full length of the log, so the client can page through it.
+    """
+    session, log = {}, []
+    if results:
+        # pylint: disable=W0718
+        try:
+            session, log = json.loads(results)
+        except Exception as e:
+            logger.error("swreactxblock resume_page() could not load json from results: %s", e)
+    end = len(log) if limit is None else offset + limit
+    return {
+        "resumable": bool(results),
+        "session": session,
+        "log": log[offset:end],
+        "offset": offset,
+        "total": len(log),
+    }
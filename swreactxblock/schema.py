@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+The compact per-student (Scope.user_state) schema of the swreactxblock.
+
+Earlier versions stored several values for every student that are derived from the question content, the course settings
+or the user service: the resolved grading options (my_*), weight, raw_possible, variants_count, the user's username and
+full name, an unused correct flag, and a full copy of the question. These are now computed when needed, so the block no
+longer declares those fields (see LEGACY_USER_STATE_FIELDS).
+
+Old StudentModule rows still hold those keys. Reading them is harmless: the XBlock runtime ignores stored keys that the
+block doesn't declare. But the LMS merges updates into the stored state, so the keys are never dropped by the block
+itself. compact_state() strips them from a stored state dict, and StateSavings totals how many bytes that saves. See
+scripts/user_state_report.py for a report across a course, which can also rewrite the rows.
+"""
+import json
+from collections import Counter
+
+# user_state keys that earlier versions stored but that are now derived.
+LEGACY_USER_STATE_FIELDS = (
+    "my_weight",
+    "my_max_attempts",
+    "my_option_showme",
+    "my_option_hint",
+    "my_grade_showme_ded",
+    "my_grade_hints_count",
+    "my_grade_hints_ded",
+    "my_grade_errors_count",
+    "my_grade_errors_ded",
+    "my_grade_min_steps_count",
+    "my_grade_min_steps_ded",
+    "my_grade_app_key",
+    "weight",
+    "raw_possible",
+    "variants_count",
+    "xb_user_username",
+    "xb_user_fullname",
+    "correct",
+)
+
+
+def state_size(state):
+    """Return the size in bytes of a state dict as the LMS stores it (StudentModule.state)."""
+    return len(json.dumps(state).encode("utf8"))
+
+
+def compact_state(state):
+    """Return a copy of a stored user_state dict without the legacy keys.
+
+    A legacy question copy (see question.py) is dropped too, keeping its q_index as the variant_index.
+    """
+    compact = {key: value for key, value in state.items() if key not in LEGACY_USER_STATE_FIELDS}
+    question = compact.pop("question", None)
+    if question and compact.get("variant_index", -1) == -1 and "q_index" in question:
+        compact["variant_index"] = question["q_index"]
+    return compact
+
+
+class StateSavings:
+    """Running totals of the bytes compact_state() saves over a number of stored states."""
+
+    def __init__(self):
+        self.rows = 0
+        self.compacted_rows = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.bytes_by_field = Counter()
+
+    def add(self, state):
+        """Add a stored state dict to the totals and return its compacted form."""
+        compact = compact_state(state)
+        before, after = state_size(state), state_size(compact)
+        self.rows += 1
+        self.bytes_before += before
+        self.bytes_after += after
+        if after != before:
+            self.compacted_rows += 1
+            for key in set(state) - set(compact):
+                self.bytes_by_field[key] += state_size({key: state[key]}) - 2
+        return compact
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_before - self.bytes_after
+
+    def summary(self):
+        """Return a human readable summary of the totals."""
+        lines = [
+            f"rows: {self.rows} ({self.compacted_rows} with legacy fields)",
+            f"bytes before: {self.bytes_before}",
+            f"bytes after: {self.bytes_after}",
+            f"bytes saved: {self.bytes_saved} ({self.bytes_saved / max(self.bytes_before, 1):.1%})",
+        ]
+        lines.extend(f"  {key}: {size}" for key, size in self.bytes_by_field.most_common())
+        return "\n".join(lines)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Deduction-based scoring of a completed swreact attempt.
+
+A completed attempt starts from full marks (1.0, see max_score()) and loses a fixed deduction for each of:
+
+- using "show me" at all (grade_showme_ded),
+- asking for more than grade_hints_count hints (grade_hints_ded),
+- making more than grade_errors_count errors (grade_errors_ded),
+- entering fewer than grade_min_steps_count valid steps (grade_min_steps_ded),
+
+and never drops below 0. The counts come from the attempt's log, in one pass over its entries. A stored '[session,
+log]' string is parsed with json.loads (see load_log()): that is faster than streaming its entries with a parser of our
+own (see scripts/bench_scoring.py), and the results we store are bounded by SWREACT_MAX_REQUEST_BODY_SIZE anyway.
+
+The log format of the React app isn't documented in this repository, so we only count the entries we recognise: those
+whose "action" (or "type") is one of the HINT_ACTIONS, SHOWME_ACTIONS, ERROR_ACTIONS or STEP_ACTIONS, and nothing
+else. A log in which we recognise no event at all (including an empty log) gets full credit rather than, say, the
+min_steps deduction for having no steps. Until the counts have been checked against logs from the React app, grades
+don't depend on them unless SWREACT_SCORING_MODE is "log": in the default "completion" mode every completed attempt
+gets full credit, as it always has, and the counts are only reported (see score_log()). Don't turn log mode on before
+a log captured from the React app has been added under tests/fixtures/captured/ and the counts checked against it (see
+tests/test_scoring.py).
+
+The deduction options are resolved per question and per course (see options.py). The breakdown is returned to the
+student javascript, so the score shown to the learner is the one we stored.
+"""
+import json
+from collections import namedtuple
+
+from .const import SCORING_MODE, SCORING_MODE_COMPLETION, VALID_SCORING_MODES
+from .log import get_logger
+
+logger = get_logger("scoring")
+
+if SCORING_MODE not in VALID_SCORING_MODES:
+    raise ValueError(
+        f"Invalid value received for SWREACT_SCORING_MODE: {SCORING_MODE}. Expected one of {VALID_SCORING_MODES}."
+    )
+
+MAX_SCORE = 1.0
+
+# The log entry's "action" for each kind of event. A step or check whose status is an error status counts as an error
+# rather than a step.
+HINT_ACTIONS = frozenset(("hint",))
+SHOWME_ACTIONS = frozenset(("showme", "showMe", "show-me"))
+ERROR_ACTIONS = frozenset(("error",))
+STEP_ACTIONS = frozenset(("step", "check"))
+ERROR_STATUSES = frozenset(("error", "invalid", "incorrect", "wrong"))
+
+EventCounts = namedtuple("EventCounts", ["steps", "hints", "errors", "showme"])
+
+ScoreBreakdown = namedtuple("ScoreBreakdown", EventCounts._fields + ("score", "deductions"))
+
+# name: the key of the deduction in the score breakdown.
+# applies(counts, options): whether the deduction applies to an attempt's EventCounts under the resolved options. The
+#   tests also work element-wise on EventCounts of NumPy arrays, for scoring many attempts at once (see rescore.py).
+# option: the resolved option holding the deduction.
+DEDUCTIONS = (
+    ("showme", lambda counts, options: counts.showme > 0, "grade_showme_ded"),
+    ("hints", lambda counts, options: counts.hints > options["grade_hints_count"], "grade_hints_ded"),
+    ("errors", lambda counts, options: counts.errors > options["grade_errors_count"], "grade_errors_ded"),
+    ("min_steps", lambda counts, options: counts.steps < options["grade_min_steps_count"], "grade_min_steps_ded"),
+)
+
+
+def count_events(log):
+    """Return the EventCounts for an iterable of log entries, in one pass. Entries we don't recognise aren't counted."""
+    steps = hints = errors = showme = 0
+    for entry in log:
+        if not isinstance(entry, dict):
+            continue
+        action = entry.get("action", entry.get("type"))
+        if action in HINT_ACTIONS:
+            hints += 1
+        elif action in SHOWME_ACTIONS:
+            showme += 1
+        elif action in ERROR_ACTIONS:
+            errors += 1
+        elif action in STEP_ACTIONS:
+            if entry.get("status") in ERROR_STATUSES:
+                errors += 1
+            else:
+                steps += 1
+    return EventCounts(steps, hints, errors, showme)
+
+
+def has_events(counts):
+    """Return True if any event of the log was recognised, i.e. counted in the EventCounts counts."""
+    return sum(counts) > 0
+
+
+def full_credit(counts):
+    """Return the ScoreBreakdown of a completed attempt with the given EventCounts and no deductions."""
+    return ScoreBreakdown(*counts, MAX_SCORE, {})
+
+
+def score_counts(counts, options):
+    """Return the ScoreBreakdown of a completed attempt with the given EventCounts, under the resolved options.
+
+    An attempt with no recognised events gets full credit.
+    """
+    if not has_events(counts):
+        return full_credit(counts)
+    deductions = {}
+    for name, applies, option in DEDUCTIONS:
+        if applies(counts, options) and options[option]:
+            deductions[name] = float(options[option])
+    score = min(max(MAX_SCORE - sum(deductions.values()), 0.0), MAX_SCORE)
+    return ScoreBreakdown(*counts, score, deductions)
+
+
+def score_log(log, options, mode=SCORING_MODE):
+    """Return the ScoreBreakdown of a completed attempt from an iterable of its log entries.
+
+    In SCORING_MODE_COMPLETION the attempt gets full credit, and the breakdown only reports its counts.
+    """
+    counts = count_events(log)
+    if mode == SCORING_MODE_COMPLETION:
+        return full_credit(counts)
+    if not has_events(counts):
+        logger.warning("swreactxblock score_log() recognised no events in the log, giving full credit")
+    return score_counts(counts, options)
+
+
+def results_log(results):
+    """Return the log of a full results structure as posted by the client, or [] if it has none."""
+    if isinstance(results, list) and len(results) > 1 and isinstance(results[1], list):
+        return results[1]
+    return []
+
+
+def load_log(results):
+    """Return the log of a '[session, log]' results string as a list.
+
+    Raises ValueError if results isn't a JSON array holding a session and a log array.
+    """
+    loaded = json.loads(results)
+    if not (isinstance(loaded, list) and len(loaded) == 2 and isinstance(loaded[1], list)):
+        raise ValueError("results are not a [session, log] array")
+    return loaded[1]
+
+
+def score_results(results, options, mode=SCORING_MODE):
+    """Return the ScoreBreakdown of a completed attempt from its '[session, log]' results string, or None if the
+    results can't be read."""
+    # pylint: disable=W0718
+    try:
+        return score_log(load_log(results), options, mode)
+    except Exception as e:
+        logger.error("swreactxblock score_results() could not read the log from results: %s", e)
+        return None
+
+
+def breakdown_dict(breakdown):
+    """Return a ScoreBreakdown as a JSON-ready dict for the student javascript."""
+    return {
+        "score": breakdown.score,
+        "maxScore": MAX_SCORE,
+        "steps": breakdown.steps,
+        "hints": breakdown.hints,
+        "errors": breakdown.errors,
+        "showme": breakdown.showme,
+        "deductions": breakdown.deductions,
+    }
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Sequence numbers for result submissions.
+
+The React app's callbacks can be retried, double-fired or delivered out of order (e.g. a partial result that arrives
+after the final one, or a retried POST over a flaky mobile connection). So each submission carries a sequence number:
+the student javascript seeds a per-block counter from window.swReact.lastSeq and increments it for every submission.
+The block stores the highest sequence number it has accepted (last_seq), and rejects a submission whose number is not
+higher, before it serializes or stores anything and without publishing grades.
+
+Submissions carry their sequence number in a wrapper, {"seq": 7, "results": [session, log]}. Submissions from older
+clients have no sequence number and are always accepted.
+"""
+
+
+def split_submission(data):
+    """Return (seq, results) for a posted full results submission. seq is None if the client didn't send one.
+
+    Raises ValueError for a sequence number that isn't a positive integer.
+    """
+    if isinstance(data, dict) and "results" in data:
+        return check_seq(data.get("seq")), data["results"]
+    return None, data
+
+
+def check_seq(seq):
+    """Return seq if it is None or a positive integer, otherwise raise ValueError."""
+    if seq is not None and (not isinstance(seq, int) or isinstance(seq, bool) or seq <= 0):
+        raise ValueError("seq must be a positive integer")
+    return seq
+
+
+def is_stale(seq, last_seq):
+    """Return True if a submission numbered seq is a duplicate of, or older than, submission last_seq."""
+    return seq is not None and seq <= last_seq
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Course publish signal wiring for the swreactxblock in-process caches.
+
+When an author republishes a course in Studio, the modulestore sends SignalHandler.course_published. Any swreactxblock
+cache that holds course-derived data registers a callback here with @on_course_published so it can drop its entries
+for that course. Outside of the LMS/CMS (e.g. during pip install or in the XBlock SDK workbench) the modulestore is
+not importable and the callbacks are simply never fired by the platform, although invalidate_course() can still be
+called directly.
+"""
+from .log import get_logger
+
+logger = get_logger("signals")
+
+# pylint: disable=W0718,C0103
+try:
+    from xmodule.modulestore.django import SignalHandler
+except Exception as e:
+    description = str(e)
+    print(
+        f"swreactxblock.signals.py - xmodule.modulestore.django import SignalHandler: {description}"
+    )
+    SignalHandler = None
+
+_course_published_callbacks = []
+
+
+def on_course_published(func):
+    """Decorator that registers func(course_id: str) to be called whenever a course is published."""
+    _course_published_callbacks.append(func)
+    return func
+
+
+def invalidate_course(course_id):
+    """Run every registered course publish callback for course_id."""
+    course_id = str(course_id)
+    for callback in _course_published_callbacks:
+        try:
+            callback(course_id)
+        except Exception as e:
+            logger.error(
+                "swreactxblock invalidate_course() callback %s failed for %s: %s",
+                getattr(callback, "__name__", callback),
+                course_id,
+                e,
+            )
+
+
+def _handle_course_published(sender, course_key, **kwargs):
+    invalidate_course(course_key)
+
+
+if SignalHandler is not None:
+    SignalHandler.course_published.connect(
+        _handle_course_published, dispatch_uid="swreactxblock.signals.course_published"
+    )
@@ -37,6 +37,7 @@ function SWREACTXStudio(runtime, element, question) {
       swreact_rank: $("#swreact_rank", element).val(),
       swreact_invalid_schemas: $("#swreact_invalid_schemas", element).val(),
       swreact_problem_hints: $("#swreact_problem_hints", element).val(),
+      variants: $("#variants", element).val(),
     };
 
     runtime.notify("save", { state: "start" });
@@ -45,9 +46,18 @@ function SWREACTXStudio(runtime, element, question) {
       url: handlerUrl,
       data: JSON.stringify(data),
       success: null,
-    }).done(function (response) {
-      runtime.notify("save", { state: "end" });
-    });
+    })
+      .done(function (response) {
+        runtime.notify("save", { state: "end" });
+      })
+      .fail(function (jqXHR) {
+        // save_question rejects variants that aren't a valid JSON list, see question.py
+        var message = jqXHR.responseJSON && jqXHR.responseJSON.error;
+        runtime.notify("error", {
+          title: "Unable to save",
+          message: message || jqXHR.statusText,
+        });
+      });
   });
 
   $(".cancel-button", element).click(function (eventObject) {
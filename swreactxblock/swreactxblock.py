@@ -2,12 +2,13 @@
 # pylint: disable=E0401
 """StepWise React xblock
 
-Note that legacy (non-React) stepwise xblock questions can contain up to 10 variants. This xblock code remembers which variants the student has
+A question can have any number of variants. This xblock code remembers which variants the student has
 attempted and if the student requests a new variant, we will try to assign one that has not yet been attempted. Once the
 student has attempted all available variants, if they request another variant, we will clear the list of attempted
 variants and start assigning variants over again.
 
-FIXME: For the REACT xblock we have currently only implemented one variant per xblock, but some of the variant-related code remains. Caveat Utilitor.
+Variant 0 of a React xblock question is its own q_* content fields; further variants are listed in the q_variants
+content field, which authors edit as one JSON array in Studio (see question.py).
 
 When the student completes work on the StepWise problem (aka 'victory'), we use a callback from the StepWise UI client code
 to record the student's score on that attempt.  We also receive a separate callback after the student completes each operation
@@ -27,16 +28,25 @@ to record the student's score on that attempt.
 
 The Javascript code in this xblock displays the score and steps on the student's most recent attempt (only).
 
-Note that the xblock Python code's logic for computing the score is somewhat duplicated in the xblock's Javascript code
-since the Javascript is responsible for updating the information displayed to the student on their results, and the
-Python code does not currently provide this detailed scoring data down to the Javascript code. It may be possible for
-the results of the scoring callback POST to return the scoring details to the Javascript code for display, but this is
-not currently done. Thus, if you need to update the scoring logic here in Python, you need to check the Javascript
-source in js/src/swreactxstudent.js to make sure you don't also have to change the score display logic there.
+The score is computed here only (see scoring.py): full credit for a completed attempt, or with SWREACT_SCORING_MODE=log,
+the resolved hint, error, showme and min steps deductions applied to the events of the attempt's log.
+save_swreact_final_results returns the score breakdown, and the Javascript code displays it rather than recomputing it.
 
-To support resuming work on a partially-completed swpwr problem, we check to see whether there are previous results persisted
-in self.swpwr_results when we initialize the window.swpwr structure to pass to the swpwr React app.  If so, we
-unpack that swpwr_results attribute and pass oldSession and oldLog back to the React app as two additional attributes in window.swpwr.
+To support resuming work on a partially-completed swreact problem, we check to see whether there are previous results persisted
+in self.swreact_results when we initialize the window.swReact structure to pass to the swreact React app.  If so, we
+unpack that swreact_results attribute and pass oldSession and oldLog back to the React app as two additional attributes in window.swReact.
+With SWREACT_RESUME_MODE=fetch we instead only set window.swReact.resumable and window.swReact.resumeUrl, and the React app
+fetches the session and (a range of) the log from the get_resume_data handler when it needs them.
+
+A learner's variant is saved (in variant_index) with the first results of their attempt, or by retry and
+start_attempt. Until then, it is drawn from a hash of the user, the block and the attempt number (see variants.py), so
+student_view and get_data agree and a learner sees the same variant on every page load. With
+SWREACT_VARIANT_ASSIGNMENT=hashed, retry draws the next variant the same way too.
+
+student_view doesn't write any fields, since the runtime saves the block after every view, unless it finds results
+saved without their variant. The resolved grading options, the user's names and the question variant are computed per
+request, and fields are only written by the handlers that change them (start_attempt, retry and the results
+callbacks).
 
 The swreact_problem_hints field is optional, and looks like this:
 swreact.problem.wpHints = [
@@ -74,6 +84,13 @@ The flow of saving results is:
     save_swpwr_partial_results(data) does the same as save_swpwr_final_results(),
         except it sets self.is_answered=False and self.emit_completion(0.0)
         also, we want to ignore partial results callbacks if we've previously seen final results.
+        When coalescing is enabled (SWREACT_PARTIAL_COALESCE_* settings, see coalesce.py), partial results are held
+        in the cache and only the newest one is written, once per time window or step count.
+
+    Submissions carry a sequence number (see sequence.py). We ignore partial results that aren't newer than the last
+        accepted submission, and final results that repeat one we have already accepted.
+
+    The results handlers accept gzip-compressed request bodies as well as plain JSON (see request_body.py).
 
 NOTE: the url_name field in this xblock records a UUID for this xblock instance. This url_name field was added so this
 xblock looks like every other standard type of xblock to the OpenEdX runtime (e.g chapter, sequential, vertical, problem).
@@ -88,21 +105,35 @@ author invent a unique url_name value for their question.
 """
 
 import json
-import random
 import uuid
-from logging import getLogger
-
-# Python stuff
-import pkg_resources
 
 # Open edX stuff
 from web_fragments.fragment import Fragment
+from webob import Response
 from xblock.core import XBlock
-from xblock.fields import Boolean, Dict, Float, Integer, Scope, String
+from xblock.exceptions import JsonHandlerError
+from xblock.fields import Boolean, Dict, Float, Integer, List, Scope, String
 from xblock.scorable import ScorableXBlockMixin, Score
 from xblock.utils.studio_editable import StudioEditableXBlockMixin
 from xblock.completable import CompletableXBlockMixin
 
+# our stuff
+from . import resources, variants
+from .coalesce import partial_results_coalescer, pending_key
+from .codec import decode_results, encode_results, results_codec_stats
+from .const import PRELOAD_RESOURCES, VARIANT_ASSIGNMENT, VARIANT_ASSIGNMENT_HASHED
+from .course_settings import get_course_settings
+from .events import grade_values, suppressed_events
+from .log import LOG_SAMPLE_PARTIAL_RESULTS, LogSampler, get_logger, truncate
+from .options import get_options
+from .page_resources import add_student_page_resources
+from .payload import bootstrap_script, build_payload
+from .question import build_question, content_version, dump_variants, parse_variants, variant_table
+from .request_body import json_body_handler
+from .resume import parse_range, results_etag, resume_page
+from .scoring import breakdown_dict, results_log, score_log, score_results
+from .sequence import is_stale, split_submission
+
 # pylint: disable=W0718,C0103
 try:
     from lms.djangoapps.courseware.courses import get_course_by_id
@@ -118,11 +149,15 @@ except Exception as e:
 
 UNSET = object()
 
-logger = getLogger(__name__)
+# Log levels can be set per subsystem, see log.py
+view_logger = get_logger("view")
+grading_logger = get_logger("grading")
+variant_logger = get_logger("variant")
+partial_results_sampler = LogSampler(LOG_SAMPLE_PARTIAL_RESULTS)
+
+if PRELOAD_RESOURCES:
+    resources.preload()
 
-# DEBUG=settings.ROVER_DEBUG
-# DEBUG=False
-DEBUG = True
 DEFAULT_RANK = "cadet"  # What we'll use for a rank if not modified by the user/default
 
 PASSPREVSESSION = True	# Do pass oldSession and oldLog values
@@ -142,14 +177,13 @@ attempt.
 
 @XBlock.wants("user")
 class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableXBlockMixin, XBlock):
-    """This xblock provides up to 10 variants of a question for delivery using the StepWise UI."""
+    """This xblock provides a question and any number of its variants (see question.py) for delivery using the StepWise
+    UI."""
 
     has_author_view = True  # tells the xblock to not ignore the AuthorView
     has_score = True  # tells the xblock to not ignore the grade event
     show_in_read_only_mode = True  # tells the xblock to let the instructor view the student's work (lms/djangoapps/courseware/masquerade.py)
 
-    MAX_VARIANTS = 1  # This code handles 1 variant
-
     # Fields are defined on the class.  You can access them in your code as
     # self.<fieldname>.
 
@@ -283,106 +317,67 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         default="[]",
         scope=Scope.content,
     )
+    # The question's variants after variant 0, as a JSON array of objects. See question.py.
+    q_variants = String(
+        display_name="Question variants (JSON)",
+        help="SWREACT optional further variants of this question (JSON array)",
+        default="",
+        scope=Scope.content,
+    )
     # STUDENT'S QUESTION PERFORMANCE FIELDS
+    # Stored compressed, see codec.py. Use current_results() to read it.
     swreact_results = String(
         help="SWREACT The student's SWREACT Solution structure",
         default="",
         scope=Scope.user_state,
     )
-
-    xb_user_username = String(
-        help="SWREACT The user's username", default="", scope=Scope.user_state
-    )
-    xb_user_fullname = String(
-        help="SWREACT The user's fullname", default="", scope=Scope.user_state
-    )
-    grade = Float(help="SWREACT The student's grade", default=-1, scope=Scope.user_state)
-    # solution = Dict(help="SWREACT The student's last stepwise solution", default={}, scope=Scope.user_state)
-    question = Dict(
-        help="SWREACT The student's current stepwise question",
-        default={},
-        scope=Scope.user_state,
-    )
-    # count_attempts keeps track of the number of attempts of this question by this student so we can
-    # compare to course.max_attempts which is inherited as an per-question setting or a course-wide setting.
-    count_attempts = Integer(
-        help="SWREACT Counted number of questions attempts",
+    # The highest submission sequence number we have accepted. See sequence.py.
+    last_seq = Integer(
+        help="SWREACT The sequence number of the student's last accepted results submission",
         default=0,
         scope=Scope.user_state,
     )
-    raw_possible = Float(
-        help="SWREACT Number of possible points", default=1, scope=Scope.user_state
-    )
-    # NOTE: Don't assume 3 points per problem in swreactxblock
-    # raw_possible = Float(help="SWREACT Number of possible points", default=3,scope=Scope.user_state)
-    # The following 'weight' is examined by the standard scoring code, so needs to be set once we determine which weight value to use
-    # (per-Q or per-course). Also used in rescoring by override_score_module_state.
-    weight = Float(
-        help="SWREACT Defines the number of points the problem is worth.",
-        default=1,
-        scope=Scope.user_state,
-    )
 
-    my_weight = Integer(
-        help="SWREACT Remember weight course setting vs question setting",
-        default=-1,
-        scope=Scope.user_state,
-    )
-    my_max_attempts = Integer(
-        help="SWREACT Remember max_attempts course setting vs question setting",
-        default=-1,
-        scope=Scope.user_state,
-    )
-    my_option_showme = Integer(
-        help="SWREACT Remember option_showme course setting vs question setting",
-        default=-1,
-        scope=Scope.user_state,
-    )
-    my_option_hint = Integer(
-        help="SWREACT Remember option_hint course setting vs question setting",
-        default=-1,
-        scope=Scope.user_state,
-    )
-    my_grade_showme_ded = Integer(
-        help="SWREACT Remember grade_showme_ded course setting vs question setting",
-        default=-1,
-        scope=Scope.user_state,
-    )
-    my_grade_hints_count = Integer(
-        help="SWREACT Remember grade_hints_count course setting vs question setting",
-        default=-1,
-        scope=Scope.user_state,
-    )
-    my_grade_hints_ded = Integer(
-        help="SWREACT Remember grade_hints_ded course setting vs question setting",
-        default=-1,
+    grade = Float(help="SWREACT The student's grade", default=-1, scope=Scope.user_state)
+    # The last grade ([value, max_value]) and completion we published, so we don't publish them again. See events.py.
+    published_grade = List(
+        help="SWREACT The last grade value and max_value published for the student",
+        default=[],
         scope=Scope.user_state,
     )
-    my_grade_errors_count = Integer(
-        help="SWREACT Remember grade_errors_count course setting vs question setting",
-        default=-1,
+    published_completion = Float(
+        help="SWREACT The last completion value published for the student",
+        default=None,
         scope=Scope.user_state,
     )
-    my_grade_errors_ded = Integer(
-        help="SWREACT Remember grade_errors_ded course setting vs question setting",
-        default=-1,
+    # solution = Dict(help="SWREACT The student's last stepwise solution", default={}, scope=Scope.user_state)
+    # Legacy: earlier versions stored a full copy of the question here. We now store variant_index and
+    # content_version instead, and drop this copy the next time we write the student's state (see question.py).
+    question = Dict(
+        help="SWREACT The student's current stepwise question",
+        default={},
         scope=Scope.user_state,
     )
-    my_grade_min_steps_count = Integer(
-        help="SWREACT Remember grade_min_steps_count course setting vs question setting",
+    variant_index = Integer(
+        help="SWREACT Index (q_index) of the student's current variant, -1 if none has been picked",
         default=-1,
         scope=Scope.user_state,
     )
-    my_grade_min_steps_ded = Integer(
-        help="SWREACT Remember grade_min_steps_ded course setting vs question setting",
-        default=-1,
+    content_version = String(
+        help="SWREACT Version of the question content the student's current variant was picked for",
+        default="",
         scope=Scope.user_state,
     )
-    my_grade_app_key = String(
-        help="SWREACT Remember app_key course setting vs question setting",
-        default="SBIRPhase2",
+    # count_attempts keeps track of the number of attempts of this question by this student so we can
+    # compare to course.max_attempts which is inherited as an per-question setting or a course-wide setting.
+    count_attempts = Integer(
+        help="SWREACT Counted number of questions attempts",
+        default=0,
         scope=Scope.user_state,
     )
+    # NOTE: We don't store values derived from the question content, the course settings or the user service for
+    # every student (the resolved my_* options, weight, raw_possible, variants_count, xb_user_username,
+    # xb_user_fullname). They are computed per request. See schema.py for the fields earlier versions stored.
 
     # variant_attempted: Remembers the set of variant q_index values the student has already attempted.
     # We can't add a Set to Scope.user_state, or we get get runtime errors whenever we update this field:
@@ -390,14 +385,11 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
     #      TypeError: Object of type set is not JSON serializable
     # See e.g. this:  https://stackoverflow.com/questions/8230315/how-to-json-serialize-sets
     # So we'll leave the variants in an Integer field and fiddle the bits ourselves :-(
-    # We define our own bitwise utility functions below: bit_count_ones() bit_is_set() bit_is_set()
+    # Python ints are unbounded, so the bitmap holds any number of variants. See variants.py for the bitmap operations.
 
     variants_attempted = Integer(
         help="SWREACT Bitmap of attempted variants", default=0, scope=Scope.user_state
     )
-    variants_count = Integer(
-        help="SWREACT Count of available variants", default=0, scope=Scope.user_state
-    )
     previous_variant = Integer(
         help="SWREACT Index (q_index) of the last variant used",
         default=-1,
@@ -412,12 +404,6 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         help='Will be set to "True" if successfully answered',
     )
 
-    correct = Boolean(
-        default=False,
-        scope=Scope.user_state,
-        help='Will be set to "True" if correctly answered',
-    )
-
     raw_earned = Float(
         help="SWREACT Keeps maximum score achieved by student as a raw value between 0 and 1.",
         scope=Scope.user_state,
@@ -426,9 +412,116 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
     )
 
     def resource_string(self, path):
-        """Handy helper for getting resources from our kit."""
-        data = pkg_resources.resource_string(__name__, path)
-        return data.decode("utf8")
+        """Handy helper for getting resources from our kit.
+
+        Resources are loaded once per process, see resources.py.
+        """
+        return resources.resource_string(path)
+
+    def resolved_options(self):
+        """Return the resolved grading options for this block, computed once per request.
+
+        We prefer the per-question setting to the course setting, and if neither exists we use the course default.
+        See options.py for the table of options. The course's advanced settings come from the course settings cache
+        (see course_settings.py), so the course is only loaded from the modulestore when that misses.
+        """
+        options = getattr(self, "_request_options", None)
+        if options is None:
+            options = get_options(
+                self,
+                self.runtime.course_id,
+                lambda course_id: get_course_settings(course_id, get_course_by_id),
+            )
+            view_logger.debug("SWREACTXBlock resolved_options() options=%s", truncate(options))
+            self._request_options = options
+        return options
+
+    def user_names(self):
+        """Return the current user's (username, full name), computed once per request."""
+        names = getattr(self, "_user_names", None)
+        if names is None:
+            xb_user = self.runtime.service(self, "user").get_current_user()
+            username = xb_user.opt_attrs.get("edx-platform.username")
+            if not username:
+                view_logger.error("SWREACTXBlock user_names() username was %r", username)
+                username = "FIXME"
+            fullname = xb_user.full_name
+            if not fullname:
+                view_logger.error("SWREACTXBlock user_names() full name was %r", fullname)
+                fullname = "FIXME FIXME"
+            names = self._user_names = (username, fullname)
+        return names
+
+    # weight is examined by the standard scoring code, e.g. by override_score_module_state when rescoring. It is the
+    # per-question or per-course weight, so we resolve it rather than store it for every student. The platform may
+    # also read it outside of a student request, so fall back to the default weight if we can't resolve it.
+    @property
+    def weight(self):
+        """The number of points the problem is worth."""
+        # pylint: disable=W0718
+        try:
+            return self.resolved_options()["weight"]
+        except Exception as e:
+            grading_logger.warning("SWREACTXBlock weight could not be resolved, using 1.0: %s", e)
+            return 1.0
+
+    def variant_table(self):
+        """Return the parsed variants after variant 0 (see question.py), looked up once per request."""
+        table = getattr(self, "_request_variants", None)
+        if table is None:
+            table = variant_table(self)
+            self._request_variants = table
+        return table
+
+    def available_variants_count(self):
+        """Return the number of question variants: the block's own content, plus those in q_variants."""
+        return 1 + len(self.variant_table())
+
+    def question_for(self, q_index):
+        """Return the question structure for variant q_index, built from the current content and options."""
+        return build_question(self, q_index, self.resolved_options(), self.user_names()[0], self.variant_table())
+
+    def current_variant(self):
+        """Return the index of the student's current variant, drawing one if they have none.
+
+        A variant saved by retry(), start_attempt() or the student's first results sticks. Blocks saved by earlier
+        versions only have the variant in their legacy question copy. A variant that isn't saved yet is drawn from
+        the hashed generator whatever the assignment mode, so every request draws the same one until it is saved.
+        """
+        q_index = self.variant_index
+        if q_index == -1 and self.question:
+            q_index = self.question.get("q_index", -1)
+        if 0 <= q_index < self.available_variants_count():
+            if self.content_version and self.content_version != content_version(self):
+                variant_logger.debug(
+                    "SWREACTXBlock current_variant() content changed since variant %s was picked", q_index
+                )
+            return q_index
+        q_index = self.draw_variant(VARIANT_ASSIGNMENT_HASHED)
+        if self.swreact_results:
+            # Results saved without their variant: save the one we resume them with.
+            variant_logger.warning("SWREACTXBlock current_variant() saving variant %s for unsaved results", q_index)
+            self.set_variant(q_index)
+        return q_index
+
+    def current_question(self):
+        """Return the question for the student's current variant, see current_variant()."""
+        return self.question_for(self.current_variant())
+
+    def set_variant(self, q_index):
+        """Record q_index as the student's current variant, for the current question content."""
+        self.variant_index = q_index
+        self.content_version = content_version(self)
+        self.drop_legacy_question()
+
+    def drop_legacy_question(self):
+        """Drop the full question copy stored by earlier versions, keeping its variant index."""
+        if self.question:
+            if self.variant_index == -1:
+                self.variant_index = self.question.get("q_index", -1)
+            variant_logger.debug("SWREACTXBlock drop_legacy_question() dropping legacy question copy")
+            # Assign rather than del: del writes to the field data store immediately, outside of the save.
+            self.question = {}
 
     # STUDENT_VIEW
     def student_view(self, context=None):
@@ -437,1130 +530,107 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         We set up the question parameters (referring to course-wide settings), then launch the javascript StepWise
         client.
         """
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() entered. context={context}".format(
-                    context=context
-                )
-            )
-
-        if DEBUG:
-            logger.info("SWREACTXBlock student_view() self={a}".format(a=self))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.runtime={a}".format(a=self.runtime)
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.runtime.course_id={a}".format(
-                    a=self.runtime.course_id
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.variants_attempted={v}".format(
-                    v=self.variants_attempted
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.previous_variant={v}".format(
-                    v=self.previous_variant
-                )
-            )
-
-        course = get_course_by_id(self.runtime.course_id)
-        if DEBUG:
-            logger.info("SWREACTXBlock student_view() course={c}".format(c=course))
-
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() max_attempts={a} q_max_attempts={b}".format(
-                    a=self.max_attempts, b=self.q_max_attempts
-                )
-            )
+        view_logger.debug("SWREACTXBlock student_view() entered. context=%s", truncate(context))
 
-        # NOTE: Can't set a self.q_* field here if an older imported swreactxblock doesn't define this field, since it defaults to None
-        # (read only?) so we'll use instance vars my_* to remember whether to use the course-wide setting or the per-question setting.
-        # Similarly, some old courses may not define the stepwise advanced
-        # settings we want, so we create local variables for them.
-
-        # For per-xblock settings
-        temp_weight = -1
-        temp_max_attempts = -1
-        temp_option_hint = -1
-        temp_option_showme = -1
-        temp_grade_hints_count = -1
-        temp_grade_hints_ded = -1
-        temp_grade_errors_count = -1
-        temp_grade_errors_ded = -1
-        temp_grade_min_steps_count = -1
-        temp_grade_min_steps_ded = -1
-        temp_grade_app_key = ""
-
-        # For course-wide settings
-        temp_course_stepwise_weight = -1
-        temp_course_stepwise_max_attempts = -1
-        temp_course_stepwise_option_hint = -1
-        temp_course_stepwise_option_showme = -1
-        temp_course_stepwise_grade_showme_ded = -1
-        temp_course_stepwise_grade_hints_count = -1
-        temp_course_stepwise_grade_hints_ded = -1
-        temp_course_stepwise_grade_errors_count = -1
-        temp_course_stepwise_grade_errors_ded = -1
-        temp_course_stepwise_grade_min_steps_count = -1
-        temp_course_stepwise_grade_min_steps_ded = -1
-        temp_course_stepwise_grade_app_key = ""
-
-        # Defaults For course-wide settings if they aren't defined for this course
-        def_course_stepwise_weight = 1.0
-        def_course_stepwise_option_hint = True
-        def_course_stepwise_option_showme = True
-        def_course_stepwise_grade_showme_ded = 0.25
-        # NOTE: Don't assume 3 points per problem in swreactxblock
-        # def_course_stepwise_grade_showme_ded = 3.0
-        def_course_stepwise_grade_hints_count = 2
-        def_course_stepwise_grade_hints_ded = 1.0
-        def_course_stepwise_grade_errors_count = 2
-        def_course_stepwise_grade_errors_ded = 1.0
-        def_course_stepwise_grade_min_steps_count = 3
-        def_course_stepwise_grade_min_steps_ded = 0.0
-        # NOTE: Don't assume a min steps deduction in swreactxblock
-        # def_course_stepwise_grade_min_steps_ded = 0.25
-        def_course_stepwise_grade_app_key = "SBIRPhase2"
-
-        # after application of course-wide settings
-        self.my_weight = -1
-        self.my_max_attempts = -1
-        self.my_option_showme = -1
-        self.my_option_hint = -1
-        self.my_grade_showme_ded = -1
-        self.my_grade_hints_count = -1
-        self.my_grade_hints_ded = -1
-        self.my_grade_errors_count = -1
-        self.my_grade_errors_ded = -1
-        self.my_grade_min_steps_count = -1
-        self.my_grade_min_steps_ded = -1
-        self.my_grade_app_key = ""
-
-        # Fetch the xblock-specific settings if they exist, otherwise create a default
+        view_logger.debug("SWREACTXBlock student_view() self=%s", truncate(self))
+        view_logger.debug("SWREACTXBlock student_view() self.runtime=%s", self.runtime)
+        view_logger.debug("SWREACTXBlock student_view() self.runtime.course_id=%s", self.runtime.course_id)
+        view_logger.debug("SWREACTXBlock student_view() self.variants_attempted=%s", self.variants_attempted)
+        view_logger.debug("SWREACTXBlock student_view() self.previous_variant=%s", self.previous_variant)
 
-        try:
-            temp_weight = self.q_weight
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_weight was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_weight = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_weight: {t}".format(t=temp_weight)
-            )
-
-        try:
-            temp_max_attempts = self.q_max_attempts
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_max_attempts was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_max_attempts = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_max_attempts: {t}".format(
-                    t=temp_max_attempts
-                )
-            )
-
-        try:
-            temp_option_hint = self.q_option_hint
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.option_hint was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_option_hint = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_option_hint: {t}".format(
-                    t=temp_option_hint
-                )
-            )
-
-        try:
-            temp_option_showme = self.q_option_showme
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.option_showme was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_option_showme = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_option_showme: {t}".format(
-                    t=temp_option_showme
-                )
-            )
-
-        try:
-            temp_grade_showme_ded = self.q_grade_showme_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_showme_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_showme_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_showme_ded: {t}".format(
-                    t=temp_grade_showme_ded
-                )
-            )
-
-        try:
-            temp_grade_hints_count = self.q_grade_hints_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_hints_count was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_hints_count = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_hints_count: {t}".format(
-                    t=temp_grade_hints_count
-                )
-            )
-
-        try:
-            temp_grade_hints_ded = self.q_grade_hints_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_hints_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_hints_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_hints_ded: {t}".format(
-                    t=temp_grade_hints_ded
-                )
-            )
-
-        try:
-            temp_grade_errors_count = self.q_grade_errors_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_errors_count was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_errors_count = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_errors_count: {t}".format(
-                    t=temp_grade_errors_count
-                )
-            )
-
-        try:
-            temp_grade_errors_ded = self.q_grade_errors_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_errors_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_errors_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_errors_ded: {t}".format(
-                    t=temp_grade_errors_ded
-                )
-            )
-
-        try:
-            temp_grade_min_steps_count = self.q_grade_min_steps_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_min_steps_count was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_min_steps_count = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_min_steps_count: {t}".format(
-                    t=temp_grade_min_steps_count
-                )
-            )
-
-        try:
-            temp_grade_min_steps_ded = self.q_grade_min_steps_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_min_steps_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_min_steps_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_min_steps_ded: {t}".format(
-                    t=temp_grade_min_steps_ded
-                )
-            )
-
-        try:
-            temp_grade_app_key = self.q_grade_app_key
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_grade_app_key was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_grade_app_key = ""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_grade_app_key: {t}".format(
-                    t=temp_grade_app_key
-                )
-            )
-
-        # Fetch the course-wide settings if they exist, otherwise create a default
-
-        try:
-            temp_course_stepwise_weight = course.stepwise_weight
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_weight was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_weight: {s}".format(
-                    s=temp_course_stepwise_weight
-                )
-            )
-
-        try:
-            temp_course_stepwise_max_attempts = course.stepwise_max_attempts
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_max_attempts was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_max_attempts: {s}".format(
-                    s=temp_course_stepwise_max_attempts
-                )
-            )
-
-        try:
-            temp_course_stepwise_option_showme = course.stepwise_option_showme
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_option_showme was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_option_showme = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_option_showme: {s}".format(
-                    s=temp_course_stepwise_option_showme
-                )
-            )
-
-        try:
-            temp_course_stepwise_option_hint = course.stepwise_option_hint
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_option_hint was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_option_hint = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_option_hint: {s}".format(
-                    s=temp_course_stepwise_option_hint
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_hints_count = course.stepwise_grade_hints_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_settings_grade_hints_count was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_hints_count = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_hints_count: {s}".format(
-                    s=temp_course_stepwise_grade_hints_count
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_showme_ded = course.stepwise_grade_showme_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_showme_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_showme_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_showme_ded: {s}".format(
-                    s=temp_course_stepwise_grade_showme_ded
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_hints_ded = course.stepwise_grade_hints_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_hints_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_hints_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_hints_ded: {s}".format(
-                    s=temp_course_stepwise_grade_hints_ded
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_errors_count = course.stepwise_grade_errors_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_errors_count was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_errors_count = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_errors_count: {s}".format(
-                    s=temp_course_stepwise_grade_errors_count
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_errors_ded = course.stepwise_grade_errors_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_errors_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_errors_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_errors_ded: {s}".format(
-                    s=temp_course_stepwise_grade_errors_ded
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_min_steps_count = (
-                course.stepwise_grade_min_steps_count
-            )
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_min_steps_count was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_min_steps_count = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_min_steps_count: {s}".format(
-                    s=temp_course_stepwise_grade_min_steps_count
-                )
-            )
-
-        try:
-            temp_course_stepwise_grade_min_steps_ded = (
-                course.stepwise_grade_min_steps_ded
-            )
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_min_steps_ded was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_min_steps_ded = -1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_min_steps_ded: {s}".format(
-                    s=temp_course_stepwise_grade_min_steps_ded
-                )
-            )
-
-        try:
-            temp_course_stepwise_app_key = course.stepwise_grade_app_key
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() course.stepwise_grade_app_key was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            temp_course_stepwise_grade_app_key = ""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() temp_course_stepwise_grade_app_key: {s}".format(
-                    s=temp_course_stepwise_grade_app_key
-                )
-            )
-
-        # Enforce course-wide grading options here.
-        # We prefer the per-question setting to the course setting.
-        # If neither the question setting nor the course setting exist, use the course default.
-
-        if temp_weight != -1:
-            self.my_weight = temp_weight
-        elif temp_course_stepwise_weight != -1:
-            self.my_weight = temp_course_stepwise_weight
-        else:
-            self.my_weight = def_course_stepwise_weight
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_weight={m}".format(m=self.my_weight)
-            )
-
-        # Set the real object weight here how that we know all of the weight settings (per-Q vs. per-course).
-        # weight is used by the real grading code e.g. for overriding student scores.
-        self.weight = self.my_weight
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.weight={m}".format(m=self.weight)
-            )
-
-        # For max_attempts: If there is a per-question max_attempts setting, use that.
-        # Otherwise, if there is a course-wide stepwise_max_attempts setting, use that.
-        # Otherwise, use the course-wide max_attempts setting that is used for CAPA (non-StepWise) problems.
-
-        if temp_max_attempts is None:
-            temp_max_attempts = -1
-
-        if temp_max_attempts != -1:
-            self.my_max_attempts = temp_max_attempts
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() my_max_attempts={a} temp_max_attempts={m}".format(
-                        a=self.my_max_attempts, m=temp_max_attempts
-                    )
-                )
-        elif temp_course_stepwise_max_attempts != -1:
-            self.my_max_attempts = temp_course_stepwise_max_attempts
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() my_max_attempts={a} temp_course_stepwise_max_attempts={m}".format(
-                        a=self.my_max_attempts, m=temp_course_stepwise_max_attempts
-                    )
-                )
-        else:
-            self.my_max_attempts = course.max_attempts
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() my_max_attempts={a} course.max_attempts={m}".format(
-                        a=self.my_max_attempts, m=course.max_attempts
-                    )
-                )
-
-        if temp_option_hint != -1:
-            self.my_option_hint = temp_option_hint
-        elif temp_course_stepwise_option_hint != -1:
-            self.my_option_hint = temp_course_stepwise_option_hint
-        else:
-            self.my_option_hint = def_course_stepwise_option_hint
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_option_hint={m}".format(
-                    m=self.my_option_hint
-                )
-            )
-
-        if temp_option_showme != -1:
-            self.my_option_showme = temp_option_showme
-        elif temp_course_stepwise_option_showme != -1:
-            self.my_option_showme = temp_course_stepwise_option_showme
-        else:
-            self.my_option_showme = def_course_stepwise_option_showme
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_option_showme={m}".format(
-                    m=self.my_option_showme
-                )
-            )
-
-        if temp_grade_showme_ded != -1:
-            self.my_grade_showme_ded = temp_grade_showme_ded
-        elif temp_course_stepwise_grade_showme_ded != -1:
-            self.my_grade_showme_ded = temp_course_stepwise_grade_showme_ded
-        else:
-            self.my_grade_showme_ded = def_course_stepwise_grade_showme_ded
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_showme_ded={m}".format(
-                    m=self.my_grade_showme_ded
-                )
-            )
-
-        if temp_grade_hints_count != -1:
-            self.my_grade_hints_count = temp_grade_hints_count
-        elif temp_course_stepwise_grade_hints_count != -1:
-            self.my_grade_hints_count = temp_course_stepwise_grade_hints_count
-        else:
-            self.my_grade_hints_count = def_course_stepwise_grade_hints_count
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_hints_count={m}".format(
-                    m=self.my_grade_hints_count
-                )
-            )
-
-        if temp_grade_hints_ded != -1:
-            self.my_grade_hints_ded = temp_grade_hints_ded
-        elif temp_course_stepwise_grade_hints_ded != -1:
-            self.my_grade_hints_ded = temp_course_stepwise_grade_hints_ded
-        else:
-            self.my_grade_hints_ded = def_course_stepwise_grade_hints_ded
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_hints_ded={m}".format(
-                    m=self.my_grade_hints_ded
-                )
-            )
-
-        if temp_grade_errors_count != -1:
-            self.my_grade_errors_count = temp_grade_errors_count
-        elif temp_course_stepwise_grade_errors_count != -1:
-            self.my_grade_errors_count = temp_course_stepwise_grade_errors_count
-        else:
-            self.my_grade_errors_count = def_course_stepwise_grade_errors_count
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_errors_count={m}".format(
-                    m=self.my_grade_errors_count
-                )
-            )
-
-        if temp_grade_errors_ded != -1:
-            self.my_grade_errors_ded = temp_grade_errors_ded
-        elif temp_course_stepwise_grade_errors_ded != -1:
-            self.my_grade_errors_ded = temp_course_stepwise_grade_errors_ded
-        else:
-            self.my_grade_errors_ded = def_course_stepwise_grade_errors_ded
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_errors_ded={m}".format(
-                    m=self.my_grade_errors_ded
-                )
-            )
-
-        if temp_grade_min_steps_count != -1:
-            self.my_grade_min_steps_count = temp_grade_min_steps_count
-        elif temp_course_stepwise_grade_min_steps_count != -1:
-            self.my_grade_min_steps_count = temp_course_stepwise_grade_min_steps_count
-        else:
-            self.my_grade_min_steps_count = def_course_stepwise_grade_min_steps_count
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_min_steps_count={m}".format(
-                    m=self.my_grade_min_steps_count
-                )
-            )
-
-        if temp_grade_min_steps_ded != -1:
-            self.my_grade_min_steps_ded = temp_grade_min_steps_ded
-        elif temp_course_stepwise_grade_min_steps_ded != -1:
-            self.my_grade_min_steps_ded = temp_course_stepwise_grade_min_steps_ded
-        else:
-            self.my_grade_min_steps_ded = def_course_stepwise_grade_min_steps_ded
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_min_steps_ded={m}".format(
-                    m=self.my_grade_min_steps_ded
-                )
-            )
-
-        if temp_grade_app_key != "":
-            self.my_grade_app_key = temp_grade_app_key
-        elif temp_course_stepwise_grade_app_key != "":
-            self.my_grade_app_key = temp_course_stepwise_grade_app_key
-        else:
-            self.my_grade_app_key = def_course_stepwise_grade_app_key
-
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.my_grade_app_key={m}".format(
-                    m=self.my_grade_app_key
-                )
-            )
-
-        # Fetch the new xblock-specific attributes if they exist, otherwise set them to a default
-        try:
-            temp_value = self.q_swreact_invalid_schemas
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_swreact_invalid_schemas was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            self.q_swreact_invalid_schemas = ""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.q_swreact_invalid_schemas: {t}".format(
-                    t=self.q_swreact_invalid_schemas
-                )
-            )
-        try:
-            temp_value = self.q_swreact_rank
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_swreact_rank was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            self.q_swreact_rank = DEFAULT_RANK
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.q_swreact_rank: {t}".format(
-                    t=self.q_swreact_rank
-                )
-            )
-        try:
-            temp_value = self.q_swreact_problem_hints
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() self.q_swreact_problem_hints was not defined in this instance: {e}".format(
-                        e=e
-                    )
-                )
-            self.q_swreact_problem_hints = "[]"
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.q_swreact_problem_hints: {t}".format(
-                    t=self.q_swreact_problem_hints
-                )
-            )
-
-        # Save an identifier for the user and their full name
-
-        user_service = self.runtime.service(self, "user")
-        xb_user = user_service.get_current_user()
-        self.xb_user_username = user_service.get_current_user().opt_attrs.get(
-            "edx-platform.username"
-        )
-        if self.xb_user_username is None:
-            if DEBUG:
-                logger.error("SWREACTXBlock self.xb_user_username was None")
-            self.xb_user_username = "FIXME"
-        if self.xb_user_username == "":
-            if DEBUG:
-                logger.error("SWREACTXBlock self.xb_user_username was empty")
-            self.xb_user_username = "FIXME"
-        self.xb_user_fullname = xb_user.full_name
-        if self.xb_user_fullname is None:
-            if DEBUG:
-                logger.error("SWREACTXBlock self.xb_user_fullname was None")
-            self.xb_user_fullname = "FIXME FIXME"
-        if self.xb_user_fullname == "":
-            if DEBUG:
-                logger.error("SWREACTXBlock self.xb_user_fullname was empty")
-            self.xb_user_fullname = "FIXME FIXME"
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.xb_user_username: {e} self.xb_user_fullname: {f}".format(
-                    e=self.xb_user_username, f=self.xb_user_fullname
-                )
-            )
-
-        # Determine which stepwise variant to use
-
-        self.variants_count = 1
-
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() self.variants_count={c}".format(
-                    c=self.variants_count
-                )
-            )
-        # Pick a variant at random, and make sure that it is one we haven't attempted before.
-
-        random.seed()  # Use the clock to seed the random number generator for picking variants
-        self.question = self.pick_variant()
-
-        # question = self.question		# Don't need local var
-        q_index = self.question["q_index"]
-
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() pick_variant selected q_index={i} question={q}".format(
-                    i=q_index, q=self.question
-                )
-            )
+        # student_view doesn't write any fields: the runtime saves the block after rendering, so every field we set
+        # here would cost a StudentModule write on every page view. The resolved options, the user's names and the
+        # question variant are computed per request instead (see resolved_options(), user_names() and get_data()).
+        username, fullname = self.user_names()
+        view_logger.debug("SWREACTXBlock student_view() username: %s fullname: %s", username, fullname)
 
         # NOTE: The following page now includes the script tag that loads the module for the main React app
         html = self.resource_string("static/html/swreactxstudent.html")
         frag = Fragment(html.format(self=self))
 
-        frag.add_resource('<meta charset="UTF-8"/>', "text/html", "head")
-        frag.add_resource(
-            '<link rel="apple-touch-icon" sizes="180x180" href="/apple-touch-icon.png" />',
-            "text/html",
-            "head",
-        )
-        frag.add_resource(
-            '<link rel="icon" type="image/png" sizes="32x32" href="/favicon-32x32.png" />',
-            "text/html",
-            "head",
-        )
-        frag.add_resource(
-            '<link rel="icon" type="image/png" sizes="16x16" href="/favicon-16x16.png" />',
-            "text/html",
-            "head",
-        )
-        frag.add_resource(
-            '<meta name="viewport" content="width=device-width,initial-scale=1.0"/>',
-            "text/html",
-            "head",
-        )
-        frag.add_resource(
-            '<link rel="preconnect" href="https://fonts.googleapis.com" />',
-            "text/html",
-            "head",
-        )
-        frag.add_resource(
-            '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin />',
-            "text/html",
-            "head",
-        )
-        frag.add_resource(
-            '<link href="https://fonts.googleapis.com/css2?family=Capriola&family=Inter:ital,opsz,wght@0,14..32,100..900;1,14..32,100..900&family=Irish+Grover&display=swap" rel="stylesheet" />',
-            "text/html",
-            "head",
-        )
-        frag.add_resource("<title>Querium StepWise React</title>", "text/html", "head")
-
-        frag.add_css(self.resource_string("static/css/swreactxstudent.css"))
-        frag.add_javascript(self.resource_string("static/js/src/swreactxstudent.js"))
-
-        # Now we can finally add the React app bundle assets
-        frag.add_javascript(
-            self.resource_string("static/js/src/final_callback.js")
-        )  # Final submit callback code and define swreact_problems[]
-
-        # Add our own snippet of javascript code so we can add debugging code on
-        # the fly without re-building the xblock
-        frag.add_javascript_url(
-            "//swm-openedx-us-dev-storage.s3.us-east-2.amazonaws.com/static/js/swpwrxblock.js"
-        )
-        # Add bugfender library for console log capture
-        frag.add_javascript_url("//js.bugfender.com/bugfender-v2.js")
+        # The resources every swreactxblock student view adds are listed in one place, see page_resources.py
+        add_student_page_resources(frag, self)
+        # Initialize the bugfender library for console log capture
         frag.add_resource(
             "<script type=\"module\"> Bugfender.init({ appKey: 'rLBi6ZTSwDd3FEM8EhHlrlQRXpiHvZkt', apiURL: 'https://api.bugfender.com/', baseURL: 'https://dashboard.bugfender.com/', version: '1.9.203'}); Bugfender.setDeviceKey('username', '"
-            + self.xb_user_username
+            + username
             + "'); </script>",
             "text/html",
             "head",
         )
-        # Invalid schema choices should be a CSV list of one or more of these: "TOTAL", "DIFFERENCE", "CHANGEINCREASE", "CHANGEDECREASE", "EQUALGROUPS", and "COMPARE"
-        # Invalid schema choices can also be the official names: "additiveTotalSchema", "additiveDifferenceSchema", "additiveChangeSchema", "subtractiveChangeSchema", "multiplicativeEqualGroupsSchema", and "multiplicativeCompareSchema"
-        # Convert the upper-case names to the 'official' names. NB: The order of
-        # .replace() calls might matter if one of these schema names is a
-        # substring of another name.
-        invalid_schemas_js = self.q_swpwr_invalid_schemas
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() before mapping loop invalid_schemas_js={e}".format(
-                    e=invalid_schemas_js
-                )
-            )
-        mapping = {
-            "TOTAL": "additiveTotalSchema",
-            "DIFFERENCE": "additiveDifferenceSchema",
-            "CHANGEINCREASE": "additiveChangeSchema",
-            "CHANGEDECREASE": "subtractiveChangeSchema",
-            "EQUALGROUPS": "multiplicativeEqualGroupsSchema",
-            "COMPARE": "multiplicativeCompareSchema",
-        }
-        for schema_key, schema_value in mapping.items():
-            invalid_schemas_js = invalid_schemas_js.replace(
-                schema_key, schema_value
-            )
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock student_view() in mapping loop schema_key={k} schema_value={v} invalid_schemas_js={e}".format(
-                        k=schema_key, v=schema_value, e=invalid_schemas_js
-                    )
-                )
-
-        # We use the window.swreact DOM element to communicate the  problem definition to the React app.
-        # We construct that Javascript structure here.
-
-        # FIXME: What is the name of the top-level DOM element we are looking for, e.g. is it swReact?
-
-        swpwr_string = (
-            "window.swReact = {"
-            )
-        # If we have persisted previous results in self.swpwr_results, pass those results back to the swpwr React app
-        # in the 'oldSession' and 'oldLog' attributes.
-        try:
-           swpwr_results = self.swpwr_results
-        except (NameError, AttributeError) as e:
-           if DEBUG:
-              logger.info(
-                 "SWREACTXBlock save_grade() self.swpwr_results was not defined when building swpwr_string: {e}".format(e=e)
-              )
-              swpwr_results = ""
-
-        if (PASSPREVSESSION and (len(swpwr_results) > 0)):
-            # Parse any existing JSON results string to a 2-element Python list of [session and log[]]
-            try:
-               json_array = json.loads(swpwr_results)
-            except Exception as e:
-               logger.error(
-                  "SWREACTXBlock student_view() in setting swpwr_string could not load json from swpwr_results: {e}".format(e=e)
-               )
-            else:
-               session_element = json_array[0]
-               log_element =     json_array[1]
-
-               # Convert the first element back to a JSON string
-               session_element_string = json.dumps(session_element)
-
-               # Convert the second element back to a JSON string
-               log_element_string = json.dumps(log_element)
-
-               if DEBUG:
-                   logger.info(
-                       "SWREACTXBlock student_view() in setting swpwr_string session_element_str={s}".format(
-                           s=session_element_string
-                       )
-                   )
-                   logger.info(
-                       "SWREACTXBlock student_view() in setting swpwr_string log_element_str={l}".format(
-                           l=log_element_string
-                       )
-                   )
-               swpwr_string = ( swpwr_string
-                   + '    oldSession: "'
-                   + session_element_string.replace('"', "&quot;")
-                   + '",'
-                   + '    oldLog: "'
-                   + log_element_string.replace('"', "&quot;")
-                   + '",'
-                   + '    oldSessionLogCombo: "'
-                   + swpwr_results.replace('"', "&quot;")
-                   + '",'
-                   )
-        else:
-            # If no previous attempt data, set these to empty values
-            swpwr_string = ( swpwr_string
-                + '    oldSession: "{}",'
-                + '    oldLog: "[]",'
-                )
-
-        # Once we have dealt with adding oldSession and oldLog to swpwr_string if necessary, we set the rest of the problem attributes:
-        # 'options', 'student', 'problem', and 'handlers'
-        # The 'handlers' attribute are for our callbacks: onComplete and onStep.
-
-        swpwr_string = ( swpwr_string
-            + "    options: {"
-            + '        swapiUrl: "https://swapi2.onrender.com", '
-            + '        gltfUrl: "https://s3.amazonaws.com/stepwise-editorial.querium.com/swpwr/dist/models/", '
-            + '        rank: "'
-            + self.q_swpwr_rank
-            + '", '
-            + '        disabledSchemas: "'
-            + invalid_schemas_js
-            + '"'
-            + "    }, "
-            + "    student: { "
-            + '        studentId: "'
-            + self.xb_user_username
-            + '", '
-            + '        fullName: "'
-            + self.xb_user_fullname
-            + '", '
-            + '        familiarName: "'
-            + "NONE"
-            + '"'
-            + "    },"
-            + "    problem: { "
-            + '        appKey: "'
-            + self.q_grade_app_key
-            + '", '
-            + '        policyId: "'
-            + "$A9$"
-            + '", '
-            + '        problemId: "'
-            + self.q_id
-            + '", '
-            + '        title: "'
-            + "SAMPLE"
-            + '", '
-            + "        stimulus: '"
-            + str(self.q_stimulus).replace("'", "&apos;")
-            + "', "
-            + '        topic: "'
-            + "gradeBasicAlgebra"
-            + '", '
-            + "        definition: '"
-            + str(self.q_definition).replace("'", "&apos;")
-            + "', "
-            + "        wpHintsString: '"
-            + str(self.q_swpwr_problem_hints).replace("'", "&apos;")
-            + "', "
-            + "        mathHints: ["
-            + '                   "'
-            + str(self.q_hint1).replace("'", "&apos;").replace('"', "&quot;")
-            + '",'
-            + '                   "'
-            + str(self.q_hint2).replace("'", "&apos;").replace('"', "&quot;")
-            + '",'
-            + '                   "'
-            + str(self.q_hint3).replace("'", "&apos;").replace('"', "&quot;")
-            + '"'
-            + "                   ]"
-            + "    },"
-            + "    handlers: {"
-            + "        onComplete: (session,log) => {"
-            + '            console.info("onComplete session",session);'
-            + '            console.info("onComplete log",log);'
-            + '            console.info("onComplete handlerUrlSwpwrFinalResults",handlerUrlSwpwrFinalResults);'
-            + "            const solution = [session,log];"
-            + "            var solution_string = JSON.stringify(solution);"
-            + '            console.info("onComplete solution_string",solution_string);'
-            + "            $.ajax({"
-            + '                type: "POST",'
-            + "                url: handlerUrlSwpwrFinalResults,"
-            + "                data: solution_string,"
-            + "                success: function (data,msg) {"
-            + '                    console.info("onComplete solution POST success");'
-            + '                    console.info("onComplete solution POST data",data);'
-            + '                    console.info("onComplete solution POST msg",msg);'
-            + "                },"
-            + "                error: function(XMLHttpRequest, textStatus, errorThrown) {"
-            + '                    console.info("onComplete solution POST error textStatus=",textStatus," errorThrown=",errorThrown);'
-            + "                }"
-            + "            });"
-            + "            $('.problem-complete').show();"
-            + "            $('.unit-navigation').show();"
-            + "        },"
-            + "        onStep: (session,log) => {"
-            + '            console.info("onStep session",session);'
-            + '            console.info("onStep log",log);'
-            + '            console.info("onStep handlerUrlSwpwrPartialResults",handlerUrlSwpwrPartialResults);'
-            + "            const solution = [session,log];"
-            + "            var solution_string = JSON.stringify(solution);"
-            + '            console.info("onStep solution_string",solution_string);'
-            + "            $.ajax({"
-            + '                type: "POST",'
-            + "                url: handlerUrlSwpwrPartialResults,"
-            + "                data: solution_string,"
-            + "                success: function (data,msg) {"
-            + '                    console.info("onStep solution POST success");'
-            + '                    console.info("onStep solution POST data",data);'
-            + '                    console.info("onStep solution POST msg",msg);'
-            + "                },"
-            + "                error: function(XMLHttpRequest, textStatus, errorThrown) {"
-            + '                    console.info("onStep solution POST error textStatus=",textStatus," errorThrown=",errorThrown);'
-            + "                }"
-            + "            });"
-            + "        }"
-            + "    }"
-            + "};"
-            + "try { "
-            + '    console.log( "before JSON.parse wpHintsString ",window.swpwr.problem.wpHintsString);'
-            + "    window.swpwr.problem.wpHints = JSON.parse(window.swpwr.problem.wpHintsString);"
-            + '    console.log( "wpHints data is ",window.swpwr.problem.wpHints );'
-            + "} catch(e) {"
-            + '    console.log( "Could not decode wpHints string",e.message );'
-            + "};"
+        # Write any partial results the coalescer is still holding, so we resume from the learner's latest step.
+        self.flush_partial_results()
+        # We use the window.swReact DOM element to communicate the problem definition to the React app.
+        # We build that structure as a plain dict and serialize it once (see payload.py). If we have persisted
+        # previous results in self.swreact_results, we pass those back to the React app in the 'oldSession' and
+        # 'oldLog' attributes so the student can resume their work.
+        # The problem is the learner's current question variant (see current_question() and question.py).
+        swreact_payload = build_payload(
+            self, self.current_results() if PASSPREVSESSION else "", question=self.current_question()
         )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock student_view() swpwr_string={e}".format(e=swpwr_string)
-            )
-        frag.add_resource(swpwr_string, "application/javascript", "foot")
+        swreact_string = bootstrap_script(swreact_payload, str(self.scope_ids.usage_id))
+        # Record the payload size so we can keep an eye on page weight for large problems and long resumed logs.
+        view_logger.info(
+            "SWREACTXBlock student_view() window.swReact payload bytes=%d",
+            len(swreact_string.encode("utf8")),
+        )
+        frag.add_resource(swreact_string, "application/javascript", "foot")
 
         frag.initialize_js("SWREACTXStudent", {})  # Call the entry point
         return frag
 
     def publish_grade(self):
         """Publish the grade for this block, for rescoring events."""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock publish_grade() pretrimmed self.raw_earned={e} self.weight={w}".format(
-                    e=self.raw_earned, w=self.weight
-                )
-            )
+        grading_logger.debug(
+            "SWREACTXBlock publish_grade() pretrimmed self.raw_earned=%s self.weight=%s",
+            self.raw_earned,
+            self.weight,
+        )
         self.raw_earned = max(self.raw_earned, 0.0)
         self.raw_earned = min(self.raw_earned, self.weight)
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock publish_grade() posttrimmed self.raw_earned={e} self.weight={w}".format(
-                    e=self.raw_earned, w=self.weight
-                )
-            )
+        grading_logger.debug(
+            "SWREACTXBlock publish_grade() posttrimmed self.raw_earned=%s self.weight=%s",
+            self.raw_earned,
+            self.weight,
+        )
+        published = grade_values(self.raw_earned, self.weight)
+        if published == self.published_grade:
+            suppressed_events.add("grade")
+            grading_logger.debug(
+                "SWREACTXBlock publish_grade() grade %s unchanged, not published (%d grade events suppressed)",
+                published,
+                suppressed_events["grade"],
+            )
+            return
         self.runtime.publish(
             self,
             "grade",
-            {"value": self.raw_earned * 1.0, "max_value": self.weight * 1.0},
+            {"value": published[0], "max_value": published[1]},
         )
+        self.published_grade = published
+
+    def _publish_grade(self, score, only_if_higher=None):
+        """Publish a grade for ScorableXBlockMixin (e.g. when rescoring) and remember it, see publish_grade()."""
+        super()._publish_grade(score, only_if_higher)
+        self.published_grade = grade_values(score.raw_earned, score.raw_possible)
+
+    def emit_completion(self, completion_percent):
+        """Emit a completion event, unless completion_percent is the completion we published last."""
+        if completion_percent == self.published_completion:
+            suppressed_events.add("completion")
+            grading_logger.debug(
+                "SWREACTXBlock emit_completion() completion %s unchanged, not published "
+                "(%d completion events suppressed)",
+                completion_percent,
+                suppressed_events["completion"],
+            )
+            return
+        super().emit_completion(completion_percent)
+        self.published_completion = completion_percent
 
     def save(self):
         """Save this block to the database."""
-        if DEBUG:
-            logger.info("SWREACTXBlock save() self{s}".format(s=self))
+        grading_logger.debug("SWREACTXBlock save() self%s", truncate(self))
         # If we don't have a url_name for this xblock defined to make the xblock unique, assign ourselves a unique UUID4 as a hex string.
         # Otherwise course imports can confuse multiple swreactxblocks with url_name == "NONE" (the default)
         # We don't currently allow authors to specify a value for this field in studio since we don't want to burden them with assigning UUIDs.
@@ -1569,432 +639,230 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         try:
             self.url_name
         except NameError as e:
-            logger.info(
-                "SWREACTXBlock save() self.url_name was undefined: {e}".format(e=e)
-            )
+            grading_logger.info("SWREACTXBlock save() self.url_name was undefined: %s", e)
             self.url_name = "NONE"
         if self.url_name in ("", "NONE"):
             self.url_name = str(uuid.uuid4().hex)
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save() defined self.url_name as {s}".format(
-                        s=self.url_name
-                    )
-                )
+            grading_logger.debug("SWREACTXBlock save() defined self.url_name as %s", self.url_name)
         else:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save() there is an existing url_name {s}".format(
-                        s=self.url_name
-                    )
-                )
+            grading_logger.debug("SWREACTXBlock save() there is an existing url_name %s", self.url_name)
         try:
             XBlock.save(self)  # Call parent class save()
         # pylint: disable=W0718
         except Exception as e:
-            logger.info("SWREACTXBlock save() had an error: {e}".format(e=e))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save() back from parent save. self.swreact_results={s}".format(
-                    s=self.swreact_results
-                )
-            )
+            grading_logger.info("SWREACTXBlock save() had an error: %s", e)
+        grading_logger.debug(
+            "SWREACTXBlock save() back from parent save. self.swreact_results=%s",
+            truncate(self.swreact_results),
+        )
 
     @XBlock.json_handler
     def get_data(self, msg, suffix=""):
         """RETURN DATA FOR THIS QUESTION."""
-        if DEBUG:
-            logger.info("SWREACTXBlock get_data() entered. msg={msg}".format(msg=msg))
+        view_logger.debug("SWREACTXBlock get_data() entered. msg=%s", truncate(msg))
 
-        if self.my_max_attempts is None:
-            self.my_max_attempts = -1
+        max_attempts = self.resolved_options()["max_attempts"]
+        if max_attempts is None:
+            max_attempts = -1
+        # We pick the question variant here rather than in student_view, so rendering the page doesn't write it.
+        question = self.current_question()
 
-        # if DEBUG: logger.info("SWREACTXBlock get_data() self.solution={a}".format(a=self.solution))
+        # view_logger.debug("SWREACTXBlock get_data() self.solution=%s", truncate(self.solution))
 
         # NOTE: swreact app does not need to be passed the solution
         #       to our previous attempt at this problem
         data = {
-            "question": self.question,
+            "question": question,
             "grade": self.grade,
             # "solution" : {},
             "count_attempts": self.count_attempts,
-            "variants_count": self.variants_count,
-            "max_attempts": self.my_max_attempts,
+            "variants_count": self.available_variants_count(),
+            "max_attempts": max_attempts,
         }
-        if DEBUG:
-            logger.info("SWREACTXBlock get_data() data={d}".format(d=data))
+        view_logger.debug("SWREACTXBlock get_data() data=%s", truncate(data))
         json_data = json.dumps(data)
         return json_data
 
-    # @XBlock.json_handler
-    def save_grade(self, data, suffix=""):
-        """We're just calling it directly now, not in a callback."""
-        if DEBUG:
-            logger.info("SWREACTXBlock save_grade() entered")
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() self.max_attempts={a}".format(
-                    a=self.max_attempts
-                )
-            )
-
-        # Check for missing grading attributes
-
-        if DEBUG:
-            logger.info("SWREACTXBlock save_grade() initial self={a}".format(a=self))
-        if DEBUG:
-            logger.info("SWREACTXBlock save_grade() initial data={a}".format(a=data))
-
-        try:
-            swreact_results = self.swreact_results
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.swreact_results was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            swreact_results = ""
-
-        try:
-            q_weight = self.q_weight
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_weight was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_weight = 1.0
-
-        try:
-            q_grade_showme_ded = self.q_grade_showme_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_showme_dev was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_showme_ded = -1
-
-        try:
-            q_grade_hints_count = self.q_grade_hints_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_hints_count was not defined: {e}".format(
-                        e=e
-                    ),
-                )
-            q_grade_hints_count = -1
-
-        try:
-            q_grade_hints_ded = self.q_grade_hints_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_hints_ded was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_hints_ded = -1
+    @XBlock.handler
+    def get_resume_data(self, request, suffix=""):
+        """RETURN THE PREVIOUS SESSION AND A RANGE OF THE LOG FOR RESUMING AN ATTEMPT.
 
+        The offset and limit query parameters select the log entries to return. limit=0 returns only the session.
+        Responses carry an ETag, so a client revalidating an unchanged attempt gets 304 Not Modified.
+        """
+        view_logger.debug("SWREACTXBlock get_resume_data() entered. params=%s", dict(request.GET))
         try:
-            q_grade_errors_count = self.q_grade_errors_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_errors_count was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_errors_count = -1
+            offset, limit = parse_range(request.GET)
+        except ValueError as e:
+            return Response(status=400, json_body={"error": str(e)})
+
+        self.flush_partial_results()
+        results = self.current_results()
+        etag = results_etag(results)
+        if etag in request.if_none_match:
+            return Response(status=304, etag=etag, cache_control="private, no-cache")
+
+        page = resume_page(results, offset, limit)
+        return Response(
+            body=json.dumps(page, separators=(",", ":")).encode("utf8"),
+            content_type="application/json",
+            charset="utf8",
+            etag=etag,
+            cache_control="private, no-cache",
+        )
 
-        try:
-            q_grade_errors_ded = self.q_grade_errors_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_errors_ded was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_errors_ded = -1
+    # @XBlock.json_handler
+    def save_grade(self, data, suffix=""):
+        """We're just calling it directly now, not in a callback.
 
-        try:
-            q_grade_min_steps_count = self.q_grade_min_steps_count
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_min_steps_count was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_min_steps_count = -1
+        Returns the ScoreBreakdown of a completed attempt (see scoring.py), or None if the attempt isn't complete.
+        """
+        grading_logger.debug("SWREACTXBlock save_grade() entered")
+        grading_logger.debug("SWREACTXBlock save_grade() self.max_attempts=%s", self.max_attempts)
 
-        try:
-            q_grade_min_steps_ded = self.q_grade_min_steps_ded
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_min_steps_ded was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_min_steps_ded = -1
+        grading_logger.debug("SWREACTXBlock save_grade() initial self=%s", truncate(self))
+        grading_logger.debug("SWREACTXBlock save_grade() initial data=%s", truncate(data))
 
-        try:
-            q_grade_app_key = self.q_grade_app_key
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() self.q_grade_app_key was not defined: {e}".format(
-                        e=e
-                    )
-                )
-            q_grade_app_key = "SBIRPhase2"
-
-        # Apply grading defaults
-
-        if q_weight == -1:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_grade() weight set to 1.0")
-            q_weight = 1.0
-        if q_grade_showme_ded == -1:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_grade() showme default set to 3.0")
-            q_grade_showme_ded = 3.0
-        if q_grade_hints_count == -1:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_grade() hints_count default set to 2")
-            q_grade_hints_count = 2
-        if q_grade_hints_ded == -1:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_grade() hints_ded default set to 1.0")
-            q_grade_hints_ded = 1.0
-        if q_grade_errors_count == -1:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_grade() errors_count default set to 3")
-            q_grade_errors_count = 3
-        if q_grade_errors_ded == -1:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_grade() errors_ded default set to 1.0")
-            q_grade_errors_ded = 1.0
-        if q_grade_min_steps_ded == -1:
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() min_steps_ded default set to 0.25"
-                )
-            q_grade_min_steps_ded = 0.25
-        if q_grade_app_key == "":
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_grade() app_key default set to SBIRPhase2"
-                )
-            q_grade_app_key = "SBIRPhase2"
+        # The deductions are resolved per question and per course, see options.py.
+        options = self.resolved_options()
 
-        # Track whether they've completed it or not and assign 1.0 points if they have completed the problem
+        # Score a completed attempt (see scoring.py): full credit, unless SWREACT_SCORING_MODE is "log" and the log has
+        # events we recognise, in which case the deductions apply. An attempt that isn't complete scores 0.
+        breakdown = None
         if self.is_answered:
-            grade = 1.0
+            breakdown = score_log(results_log(data), options)
+            grade = breakdown.score
+            grading_logger.debug("SWREACTXBlock save_grade() breakdown=%s", breakdown)
         else:
             grade = 0.0
 
         self.raw_earned = grade
 
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() raw_earned={a}".format(a=self.raw_earned)
-            )
+        grading_logger.debug("SWREACTXBlock save_grade() raw_earned=%s", self.raw_earned)
 
-        if DEBUG:
-            logger.info("SWREACTXBlock save_grade() final data={a}".format(a=data))
+        grading_logger.debug("SWREACTXBlock save_grade() final data=%s", truncate(data))
         self.grade = grade
-        if DEBUG:
-            logger.info("SWREACTXBlock save_grade() grade={a}".format(a=self.grade))
+        grading_logger.debug("SWREACTXBlock save_grade() grade=%s", self.grade)
 
         # Don't increment attempts on save grade.  We want to increment them when the student starts
         # a question, not when they finish.  Otherwise people can start the question as many times
         # as they want as long as they don't finish it, then reload the page.
         # self.count_attempts += 1
-        # make sure we've recorded this attempt, but it should have been done in start_attempt():
-        try:
-            if self.q_index != -1:
-                self.variants_attempted = set.bit_set_one(
-                    self.variants_attempted, self.q_index
-                )
-                if DEBUG:
-                    logger.info(
-                        "SWREACTXBlock save_grade() record variants_attempted for variant {v}".format(
-                            v=self.q_index
-                        )
-                    )
-                self.previous_variant = self.q_index
-                if DEBUG:
-                    logger.info(
-                        "SWREACTXBlock save_grade() record previous_variant for variant {v}".format(
-                            v=self.previous_variant
-                        )
-                    )
-            else:
-                if DEBUG:
-                    logger.error(
-                        "SWREACTXBlock save_grade record variants_attempted for variant -1"
-                    )
-        except (NameError, AttributeError) as e:
-            if DEBUG:
-                logger.warning(
-                    "SWREACTXBlock save_grade() self.q_index was not defined: {e}".format(
-                        e=e
-                    )
-                )
+        # make sure we've recorded this attempt, but it should have been done when its first results were written:
+        self.drop_legacy_question()
+        if self.variant_index != -1:
+            self.variants_attempted = self.bit_set_one(self.variants_attempted, self.variant_index)
+            grading_logger.debug(
+                "SWREACTXBlock save_grade() record variants_attempted for variant %s",
+                self.variant_index,
+            )
+            self.previous_variant = self.variant_index
+            grading_logger.debug(
+                "SWREACTXBlock save_grade() record previous_variant for variant %s",
+                self.previous_variant,
+            )
+        else:
+            grading_logger.error("SWREACTXBlock save_grade record variants_attempted for variant -1")
 
         self.save()  # Time to persist our state!!!
 
         self.publish_grade()  # Now publish our grade results to persist them into the grading database
 
-        # if DEBUG: logger.info("SWREACTXBlock save_grade() final self={a}".format(a=self))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() final self.count_attempts={a}".format(
-                    a=self.count_attempts
-                )
-            )
-        # if DEBUG: logger.info("SWREACTXBlock save_grade() final self.solution={a}".format(a=self.solution))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() final self.grade={a}".format(a=self.grade)
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() final self.weight={a}".format(a=self.weight)
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() final self.variants_attempted={v}".format(
-                    v=self.variants_attempted
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_grade() final self.previous_variant={v}".format(
-                    v=self.previous_variant
-                )
-            )
+        # grading_logger.debug("SWREACTXBlock save_grade() final self=%s", truncate(self))
+        grading_logger.debug("SWREACTXBlock save_grade() final self.count_attempts=%s", self.count_attempts)
+        # grading_logger.debug("SWREACTXBlock save_grade() final self.solution=%s", truncate(self.solution))
+        grading_logger.debug("SWREACTXBlock save_grade() final self.grade=%s", self.grade)
+        grading_logger.debug("SWREACTXBlock save_grade() final self.weight=%s", self.weight)
+        grading_logger.debug("SWREACTXBlock save_grade() final self.variants_attempted=%s", self.variants_attempted)
+        grading_logger.debug("SWREACTXBlock save_grade() final self.previous_variant=%s", self.previous_variant)
+        return breakdown
 
     @XBlock.json_handler
     def start_attempt(self, data, suffix=""):
         """START A NEW ATTEMPT."""
-        if DEBUG:
-            logger.info("SWREACTXBlock start_attempt() entered")
-        if DEBUG:
-            logger.info("SWREACTXBlock start_attempt() data={d}".format(d=data))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock start_attempt() self.count_attempts={c} max_attempts={m}".format(
-                    c=self.count_attempts, m=self.max_attempts
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock start_attempt() self.variants_attempted={v}".format(
-                    v=self.variants_attempted
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock start_attempt() self.previous_variant={v}".format(
-                    v=self.previous_variant
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock start_attempt() passed q_index={q}".format(
-                    q=data["q_index"]
-                )
-            )
-        self.count_attempts += 1
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock start_attempt() updated self.count_attempts={c}".format(
-                    c=self.count_attempts
-                )
-            )
-        variant = data["q_index"]
-        if DEBUG:
-            logger.info("variant is {v}".format(v=variant))
-        if self.bit_is_set(self.variants_attempted, variant):
-            if DEBUG:
-                logger.info("variant {v} has already been attempted!".format(v=variant))
-        else:
-            if DEBUG:
-                logger.info(
-                    "adding variant {v} to self.variants_attempted={s}".format(
-                        v=variant, s=self.variants_attempted
-                    )
-                )
-            self.variants_attempted = self.bit_set_one(self.variants_attempted, variant)
-            if DEBUG:
-                logger.info(
-                    "checking bit_is_set {v}={b}".format(
-                        v=variant,
-                        b=self.bit_is_set(self.variants_attempted, variant),
-                    )
-                )
-            self.previous_variant = variant
-            if DEBUG:
-                logger.info("setting previous_variant to {v}".format(v=variant))
+        variant_logger.debug("SWREACTXBlock start_attempt() entered")
+        variant_logger.debug("SWREACTXBlock start_attempt() data=%s", truncate(data))
+        variant_logger.debug(
+            "SWREACTXBlock start_attempt() self.count_attempts=%s max_attempts=%s",
+            self.count_attempts,
+            self.max_attempts,
+        )
+        variant_logger.debug("SWREACTXBlock start_attempt() self.variants_attempted=%s", self.variants_attempted)
+        variant_logger.debug("SWREACTXBlock start_attempt() self.previous_variant=%s", self.previous_variant)
+        variant_logger.debug("SWREACTXBlock start_attempt() passed q_index=%s", data["q_index"])
+        self.record_attempt(data["q_index"])
 
         return_data = {
             "count_attempts": self.count_attempts,
         }
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock start_attempt() done return_data={return_data}".format(
-                    return_data=return_data
-                )
-            )
+        variant_logger.debug("SWREACTXBlock start_attempt() done return_data=%s", truncate(return_data))
         json_data = json.dumps(return_data)
         return json_data
 
+    def record_attempt(self, variant):
+        """Count a new attempt on variant, record it in variants_attempted and make it the current variant."""
+        self.count_attempts += 1
+        variant_logger.debug("SWREACTXBlock record_attempt() updated self.count_attempts=%s", self.count_attempts)
+        variant_logger.debug("variant is %s", variant)
+        if self.bit_count_ones(self.variants_attempted) >= self.available_variants_count():
+            variant_logger.debug("all variants have been attempted, clearing self.variants_attempted")
+            self.variants_attempted = 0
+        if self.bit_is_set(self.variants_attempted, variant):
+            variant_logger.debug("variant %s has already been attempted!", variant)
+        else:
+            variant_logger.debug("adding variant %s to self.variants_attempted=%s", variant, self.variants_attempted)
+            self.variants_attempted = self.bit_set_one(self.variants_attempted, variant)
+            variant_logger.debug(
+                "checking bit_is_set %s=%s",
+                variant,
+                self.bit_is_set(self.variants_attempted, variant),
+            )
+            self.previous_variant = variant
+            variant_logger.debug("setting previous_variant to %s", variant)
+        self.set_variant(variant)
+
+    def draw_variant(self, assignment=VARIANT_ASSIGNMENT):
+        """Return the index of a variant drawn for the student's next attempt, with the assignment mode's generator.
+
+        The variant is drawn uniformly from the candidates in a single draw, see variants.py.
+        """
+        # The variant we start with is the student's current one, or failing that the one they last attempted, so we
+        # don't reuse the variant that is displayed in the student's last attempt data.
+        prev_index = self.variant_index if self.variant_index != -1 else self.previous_variant
+        variant_logger.debug("SWREACTXBlock draw_variant() started replacing prev_index=%s", prev_index)
+
+        # A generator of our own for the draw: we never reseed the random module's shared one. See variants.py.
+        rng = variants.assignment_rng(self.scope_ids.user_id, self.scope_ids.usage_id, self.count_attempts, assignment)
+        q_index = variants.pick_variant(self.variants_attempted, self.available_variants_count(), prev_index, rng)
+
+        variant_logger.debug("draw_variant() Selected variant %s", q_index)
+        return q_index
+
     # RESET: PICK A NEW VARIANT
     @XBlock.json_handler
     def retry(self, data, suffix=""):
         """Reset and pick a new variant."""
-        if DEBUG:
-            logger.info("SWREACTXBlock retry() entered")
-        if DEBUG:
-            logger.info("SWREACTXBlock retry() data={d}".format(d=data))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock retry() self.count_attempts={c} max_attempts={m}".format(
-                    c=self.count_attempts, m=self.max_attempts
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock retry() self.variants_attempted={v}".format(
-                    v=self.variants_attempted
-                )
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock retry() pre-pick_question q_index={v}".format(
-                    v=self.question["q_index"]
-                )
-            )
-        self.question = self.pick_variant()
+        variant_logger.debug("SWREACTXBlock retry() entered")
+        variant_logger.debug("SWREACTXBlock retry() data=%s", truncate(data))
+        variant_logger.debug(
+            "SWREACTXBlock retry() self.count_attempts=%s max_attempts=%s",
+            self.count_attempts,
+            self.max_attempts,
+        )
+        variant_logger.debug("SWREACTXBlock retry() self.variants_attempted=%s", self.variants_attempted)
+        variant_logger.debug("SWREACTXBlock retry() pre-pick_question variant_index=%s", self.variant_index)
+        question = self.pick_variant()
+        self.set_variant(question["q_index"])
 
         return_data = {
-            "question": self.question,
+            "question": question,
         }
 
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock retry() post-pick returning self.question={q} return_data={r}".format(
-                    q=self.question, r=return_data
-                )
-            )
+        variant_logger.debug(
+            "SWREACTXBlock retry() post-pick returning question=%s return_data=%s",
+            truncate(question),
+            truncate(return_data),
+        )
         json_data = json.dumps(return_data)
         return json_data
 
@@ -2003,8 +871,7 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
     @staticmethod
     def workbench_scenarios():
         """A canned scenario for display in the workbench."""
-        if DEBUG:
-            logger.info("SWREACTXBlock workbench_scenarios() entered")
+        view_logger.debug("SWREACTXBlock workbench_scenarios() entered")
         return [
             (
                 "SWREACTXBlock",
@@ -2024,8 +891,7 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
 
     def studio_view(self, context=None):
         """The STUDIO view of the SWREACTXBlock, shown to instructors when authoring courses."""
-        if DEBUG:
-            logger.info("SWREACTXBlock studio_view() entered.")
+        view_logger.debug("SWREACTXBlock studio_view() entered.")
         html = self.resource_string("static/html/swreactxstudio.html")
         frag = Fragment(html.format(self=self))
         frag.add_css(self.resource_string("static/css/swreactxstudio.css"))
@@ -2036,8 +902,7 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
 
     def author_view(self, context=None):
         """The AUTHOR view of the SWREACTXBlock, shown to instructors when previewing courses."""
-        if DEBUG:
-            logger.info("SWREACTXBlock author_view() entered")
+        view_logger.debug("SWREACTXBlock author_view() entered")
         html = self.resource_string("static/html/swreactxauthor.html")
         frag = Fragment(html.format(self=self))
         frag.add_css(self.resource_string("static/css/swreactxauthor.css"))
@@ -2046,18 +911,12 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         )
         frag.add_javascript(self.resource_string("static/js/src/swreactxauthor.js"))
 
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock SWREACTXAuthor author_view v={a}".format(a=self.q_definition)
-            )
+        view_logger.debug("SWREACTXBlock SWREACTXAuthor author_view v=%s", self.q_definition)
 
         # tell author_view how many variants are defined
-        variants = 1
+        variants = self.available_variants_count()
 
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock SWREACTXAuthor author_view variants={a}".format(a=variants)
-            )
+        view_logger.debug("SWREACTXBlock SWREACTXAuthor author_view variants=%s", variants)
 
         frag.initialize_js("SWREACTXAuthor", variants)
         return frag
@@ -2065,10 +924,8 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
     # SAVE QUESTION
     @XBlock.json_handler
     def save_question(self, data, suffix=""):
-        if DEBUG:
-            logger.info("SWREACTXBlock save_question() entered")
-        if DEBUG:
-            logger.info("SWREACTXBlock save_question() data={d}".format(d=data))
+        view_logger.debug("SWREACTXBlock save_question() entered")
+        view_logger.debug("SWREACTXBlock save_question() data=%s", truncate(data))
         self.q_max_attempts = int(data["q_max_attempts"])
         self.q_weight = float(data["q_weight"])
         if data["q_option_showme"].lower() == "true":
@@ -2101,6 +958,12 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         self.q_swreact_rank = data["swreact_rank"]
         self.q_swreact_invalid_schemas = data["swreact_invalid_schemas"]
         self.q_swreact_problem_hints = data["swreact_problem_hints"]
+        if "variants" in data:
+            # Store the variant list compactly, or reject the save if it doesn't parse. See question.py.
+            try:
+                self.q_variants = dump_variants(parse_variants(data["variants"]))
+            except ValueError as e:
+                raise JsonHandlerError(400, "Invalid variants: {}".format(e)) from e
 
         self.display_name = "Step-by-Step React"
 
@@ -2109,72 +972,148 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         return {"result": "success"}
 
     # SWREACT FINAL RESULTS: Save the final results of the SWREACT React app as a stringified structure.
-    @XBlock.json_handler
+    @json_body_handler
     def save_swreact_final_results(self, data, suffix=""):
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_swreact_final_results() data={d}".format(d=data)
-            )
-        self.swpwr_results = json.dumps(data, separators=(",", ":"))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_swreact_final_results() self.swreact_results={r}".format(
-                    r=self.swreact_results
-                )
-            )
+        grading_logger.debug("SWREACTXBlock save_swreact_final_results() data=%s", truncate(data))
+        seq, data = self._split_submission(data)
+        # A partial result may legitimately overtake the final one, so we only reject repeats of a final result.
+        if self.is_answered and is_stale(seq, self.last_seq):
+            return self._reject_stale(seq, self.last_seq)
+        if seq is not None:
+            self.last_seq = max(self.last_seq, seq)
+        self._start_variant()
+        self._store_results(json.dumps(data, separators=(",", ":")))
+        grading_logger.debug(
+            "SWREACTXBlock save_swreact_final_results() stored %d chars, compression ratio so far %.3f",
+            len(self.swreact_results),
+            results_codec_stats.ratio,
+        )
         self.is_answered = True  # We are now done
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_swpwr_final_results() self.is_answered={r}".format(
-                    r=self.is_answered
-                )
-            )
-        self.save_grade(data)  # Includes publishing our results to persist them
-        if DEBUG:
-            logger.info("SWREACTXBlock save_swpwr_final_results() back from save_grade")
+        partial_results_coalescer.discard(self._partial_results_key())  # Final results supersede held partials
+        grading_logger.debug("SWREACTXBlock save_swpwr_final_results() self.is_answered=%s", self.is_answered)
+        breakdown = self.save_grade(data)  # Includes publishing our results to persist them
+        grading_logger.debug("SWREACTXBlock save_swpwr_final_results() back from save_grade")
         self.emit_completion(1.0)   # Report that we are complete
-        if DEBUG:
-            logger.info("SWREACTXBlock save_swpwr_final_results() back from emit_completion(1.0)")
-        return {"result": "success"}
+        grading_logger.debug("SWREACTXBlock save_swpwr_final_results() back from emit_completion(1.0)")
+        # The student javascript shows the learner this breakdown rather than scoring the attempt itself.
+        return {"result": "success", "score": breakdown_dict(breakdown)}
 
     # SWREACT PARTIAL RESULTS: Save the interim results of the SWREACT React app as a stringified structure.
-    @XBlock.json_handler
+    @json_body_handler
     def save_swreact_partial_results(self, data, suffix=""):
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock save_swreact_partial_results() data={d}".format(d=data)
-            )
+        grading_logger.debug("SWREACTXBlock save_swreact_partial_results() data=%s", truncate(data))
+        seq, data = self._split_submission(data)
         # There seems to be a bug in swpwr 1.9.216+ where there is an immediate callback to save_swpwr_partial_results
         # right after a call to save_swpwr_final_results, so we ignore any partial calls once we've seen a final call
         if self.is_answered == True:
-            if DEBUG:
-                logger.info("SWREACTXBlock save_swpwr_partial_results() ignoring partial results for completed problem")
+            grading_logger.debug(
+                "SWREACTXBlock save_swpwr_partial_results() ignoring partial results for completed problem",
+            )
             return {"result": "success"}
         else:
-            self.swpwr_results = json.dumps(data, separators=(",", ":"))
-            self.is_answered = False  # We are not done yet
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock save_swpwr_partial_results() self.swpwr_results={r}".format(
-                        r=self.swpwr_results
-                    )
+            key = self._partial_results_key()
+            if seq is not None:
+                last_seq = self._last_seq(partial_results_coalescer.peek(key))
+                if is_stale(seq, last_seq):
+                    return self._reject_stale(seq, last_seq)
+            results = json.dumps(data, separators=(",", ":"))
+            entry = partial_results_coalescer.offer(key, results, seq=seq)
+            return self._save_partial_results(entry, data)
+
+    def _split_submission(self, data):
+        """Return (seq, results) for a posted results submission, see sequence.py."""
+        try:
+            return split_submission(data)
+        except ValueError as e:
+            raise JsonHandlerError(400, str(e)) from e
+
+    def _last_seq(self, pending):
+        """Return the highest accepted sequence number, counting the coalescer's held entry pending (or None)."""
+        if pending is not None and pending.get("seq") is not None:
+            return max(self.last_seq, pending["seq"])
+        return self.last_seq
+
+    def _reject_stale(self, seq, last_seq):
+        """Return the response for a submission numbered seq that is not newer than last_seq."""
+        suppressed_events.add("stale submission")
+        grading_logger.info(
+            "SWREACTXBlock ignoring stale submission seq %s, last accepted seq %s (%d stale submissions ignored)",
+            seq,
+            last_seq,
+            suppressed_events["stale submission"],
+        )
+        return {"result": "stale", "seq": last_seq}
+
+    def _save_partial_results(self, entry, data):
+        """Write a partial results entry from the coalescer, or just log that it is being held if entry is None."""
+        if entry is None:
+            if partial_results_sampler():
+                grading_logger.info(
+                    "SWREACTXBlock save_swreact_partial_results() coalesced a step, "
+                    "%d writes avoided in this process (1 in %d logged)",
+                    partial_results_coalescer.writes_avoided,
+                    partial_results_sampler.every,
                 )
-            self.save_grade(data)  # Includes publishing our results to persist them
-            if DEBUG:
-                logger.info("SWREACTXBlock save_swpwr_partial_results() back from save_grade")
-            self.emit_completion(0.0)   # Report that we are NOT complete
-            if DEBUG:
-                logger.info("SWREACTXBlock save_swpwr_partial_results() back from emit_completion(0.0)")
             return {"result": "success"}
+        self._write_partial_results(entry)
+        self.is_answered = False  # We are not done yet
+        self.save_grade(data)  # Includes publishing our results to persist them
+        grading_logger.debug("SWREACTXBlock save_swpwr_partial_results() back from save_grade")
+        self.emit_completion(0.0)   # Report that we are NOT complete
+        grading_logger.debug("SWREACTXBlock save_swpwr_partial_results() back from emit_completion(0.0)")
+        if partial_results_sampler():
+            grading_logger.info(
+                "SWREACTXBlock save_swreact_partial_results() saved a step, compression ratio so far %.3f "
+                "(1 in %d logged)",
+                results_codec_stats.ratio,
+                partial_results_sampler.every,
+            )
+        return {"result": "success"}
+
+    def _write_partial_results(self, entry):
+        """Write a coalescer entry's results string, which replaces the stored results."""
+        if entry.get("results") is not None:
+            self._start_variant()
+            self._store_results(entry["results"])
+        if entry.get("seq") is not None:
+            self.last_seq = max(self.last_seq, entry["seq"])
+
+    def current_results(self):
+        """Return the stored '[session, log]' results string, decompressed."""
+        return decode_results(self.swreact_results)
+
+    def _store_results(self, results):
+        """Store a full '[session, log]' results string, compressed if it is large enough (see codec.py)."""
+        self.swreact_results = encode_results(results)
+
+    def _start_variant(self):
+        """Record the attempt on the current variant when its first results are written, if no handler has already.
+
+        Clients that don't call start_attempt() or retry() leave the variant unsaved until then, see current_variant().
+        """
+        if self.variant_index == -1 and not self.question:
+            self.record_attempt(self.current_variant())
+
+    def _partial_results_key(self):
+        return pending_key(self.scope_ids.user_id, self.scope_ids.usage_id)
+
+    def flush_partial_results(self):
+        """Write the partial results the coalescer is holding for this learner, if any.
+
+        Returns True if there were held results to write.
+        """
+        entry = partial_results_coalescer.pop(self._partial_results_key())
+        if entry is None or self.is_answered:
+            return False
+        grading_logger.debug("SWREACTXBlock flush_partial_results() writing held results, steps=%d", entry["steps"])
+        self._write_partial_results(entry)
+        return True
 
     # Do necessary overrides from ScorableXBlockMixin
     def has_submitted_answer(self):
         """Returns True if the problem has been answered by the runtime user."""
-        if DEBUG:
-            logger.info("SWREACTXBlock has_submitted_answer() entered")
-            logger.info(
-                "SWREACTXBlock has_submitted_answer() {a}".format(a=self.is_answered)
-            )
+        grading_logger.debug("SWREACTXBlock has_submitted_answer() entered")
+        grading_logger.debug("SWREACTXBlock has_submitted_answer() %s", self.is_answered)
         return self.is_answered
 
     def get_score(self):
@@ -2185,11 +1124,9 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         Returns:
             Score(raw_earned=float, raw_possible=float)
         """
-        if DEBUG:
-            logger.info("SWREACTXBlock get_score() entered")
-            logger.info("SWREACTXBlock get_score() earned {e}".format(e=self.raw_earned))
-        if DEBUG:
-            logger.info("SWREACTXBlock get_score() max {m}".format(m=self.max_score()))
+        grading_logger.debug("SWREACTXBlock get_score() entered")
+        grading_logger.debug("SWREACTXBlock get_score() earned %s", self.raw_earned)
+        grading_logger.debug("SWREACTXBlock get_score() max %s", self.max_score())
         return Score(float(self.raw_earned), float(self.max_score()))
 
     def set_score(self, score):
@@ -2203,33 +1140,34 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
         Returns:
             None
         """
-        if DEBUG:
-            logger.info("SWREACTXBlock set_score() earned {e}".format(e=score.raw_earned))
+        grading_logger.debug("SWREACTXBlock set_score() earned %s", score.raw_earned)
         self.raw_earned = score.raw_earned
+        self.grade = score.raw_earned
 
     def calculate_score(self):
         """Calculate a new raw score based on the state of the problem.
 
-        This method should not modify the state of the XBlock.
+        This method should not modify the state of the XBlock. A completed attempt is rescored from its stored results
+        under the current grading options (see scoring.py).
         Returns:
             Score(raw_earned=float, raw_possible=float)
         """
-        if DEBUG:
-            logger.info("SWREACTXBlock calculate_score() grade {g}".format(g=self.grade))
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock calculate_score() max {m}".format(m=self.max_score)
-            )
+        grading_logger.debug("SWREACTXBlock calculate_score() grade %s", self.grade)
+        grading_logger.debug("SWREACTXBlock calculate_score() max %s", self.max_score)
+        if self.is_answered:
+            breakdown = score_results(self.current_results(), self.resolved_options())
+            if breakdown is not None:
+                grading_logger.debug("SWREACTXBlock calculate_score() breakdown=%s", breakdown)
+                return Score(breakdown.score, float(self.max_score()))
         return Score(float(self.grade), float(self.max_score()))
 
     def allows_rescore(self):
         """
         Boolean value: Can this problem be rescored?
-        Subtypes may wish to override this if they need conditional support for
-        rescoring.
+        Not from the instructor dashboard until the scoring of logs (see scoring.py) has been checked against logs from
+        the React app. scripts/rescore.py rescores stored attempts in bulk, with a dry run first.
         """
-        if DEBUG:
-            logger.info("SWREACTXBlock allows_rescore() False")
+        grading_logger.debug("SWREACTXBlock allows_rescore() False")
         return False
 
     def max_score(self):
@@ -2244,245 +1182,46 @@ class SWREACTXBlock(StudioEditableXBlockMixin, ScorableXBlockMixin, CompletableX
     def weighted_grade(self):
         """Returns the block's current saved grade multiplied by the block's weight- the number of points earned by the
         learner."""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock weighted_grade() earned {e}".format(e=self.raw_earned)
-            )
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock weighted_grade() weight {w}".format(w=self.q_weight)
-            )
+        grading_logger.debug("SWREACTXBlock weighted_grade() earned %s", self.raw_earned)
+        grading_logger.debug("SWREACTXBlock weighted_grade() weight %s", self.q_weight)
         return self.raw_earned * self.q_weight
 
     def bit_count_ones(self, var):
         """Returns the count of one bits in an integer variable Note that Python ints are full-fledged objects, unlike
         in C, so ints are plenty long for these operations."""
-        if DEBUG:
-            logger.info("SWREACTXBlock bit_count_ones var={v}".format(v=var))
-        count = 0
-        bits = var
-        for b in range(32):
-            lsb = (bits >> b) & 1
-            count = count + lsb
-        if DEBUG:
-            logger.info("SWREACTXBlock bit_count_ones result={c}".format(c=count))
+        count = variants.attempted_count(var)
+        variant_logger.debug("SWREACTXBlock bit_count_ones var=%s result=%s", var, count)
         return count
 
     def bit_set_one(self, var, bitnum):
         """Return var = var with bit 'bitnum' set Note that Python ints are full-fledged objects, unlike in C, so ints
         are plenty long for these operations."""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock bit_set_one var={v} bitnum={b}".format(v=var, b=bitnum)
-            )
-        var = var | (1 << bitnum)
-        if DEBUG:
-            logger.info("SWREACTXBlock bit_set_one result={v}".format(v=var))
+        variant_logger.debug("SWREACTXBlock bit_set_one var=%s bitnum=%s", var, bitnum)
+        var = variants.mark_attempted(var, bitnum)
+        variant_logger.debug("SWREACTXBlock bit_set_one result=%s", var)
         return var
 
     def bit_is_set(self, var, bitnum):
         """Return True if bit bitnum is set in var Note that Python ints are full-fledged objects, unlike in C, so ints
         are plenty long for these operations."""
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock bit_is_set var={v} bitnum={b}".format(v=var, b=bitnum)
-            )
-        result = var & (1 << bitnum)
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock bit_is_set result={v} b={b}".format(
-                    v=result, b=bool(result)
-                )
-            )
-        return bool(result)
+        result = variants.is_attempted(var, bitnum)
+        variant_logger.debug("SWREACTXBlock bit_is_set var=%s bitnum=%s result=%s", var, bitnum, result)
+        return result
 
-    def pick_variant(self):
+    def pick_variant(self, assignment=VARIANT_ASSIGNMENT):
         # pick_variant() selects one of the available question variants that we have not yet attempted.
         # If there is only one variant left, we have to return that one.
         # If there are 2+ variants left, do not return the same one we started with.
-        # If we've attempted all variants, we clear the list of attempted variants and pick again.
+        # If we've attempted all variants, we ignore the list of attempted variants and pick again.
         #  Returns the question structure for the one we will use this time.
+        # pick_variant() doesn't write any fields: the caller saves the variant, see retry() and record_attempt().
+        q_index = self.draw_variant(assignment)
 
-        try:
-            prev_index = self.q_index
-        except (NameError, AttributeError):
-            prev_index = -1
-
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock pick_variant() started replacing prev_index={p}".format(
-                    p=prev_index
-                )
-            )
+        question = self.question_for(q_index)
 
-        # If there's no self.q_index, then this is our first look at this question in this session, so
-        # use self.previous_variant if we can.  This won't restore all previous attempts, but makes sure we
-        # don't use the variant that is displayed in the student's last attempt data.
-        if prev_index == -1:
-            try:  # use try block in case attribute wasn't saved in previous student work
-                prev_index = self.previous_variant
-                if DEBUG:
-                    logger.info(
-                        "SWREACTXBlock pick_variant() using previous_variant for prev_index={p}".format(
-                            p=prev_index
-                        )
-                    )
-            except (NameError, AttributeError) as e:
-                if DEBUG:
-                    logger.info(
-                        "SWREACTXBlock pick_variant() self.previous_variant does not exist. Using -1: {e}".format(
-                            e=e
-                        )
-                    )
-                prev_index = -1
-
-        if self.bit_count_ones(self.variants_attempted) >= self.variants_count:
-            if DEBUG:
-                logger.warning(
-                    "SWREACTXBlock pick_variant() seen all variants attempted={a} count={c}, clearing variants_attempted".format(
-                        a=self.variants_attempted, c=self.variants_count
-                    )
-                )
-            self.variants_attempted = 0  # We have not yet attempted any variants
-
-        tries = 0  # Make sure we dont try forever to find a new variant
-        max_tries = 100
-
-        if self.variants_count <= 0:
-            if DEBUG:
-                logger.warning(
-                    "SWREACTXBlock pick_variant() bad variants_count={c}, setting to 1.".format(
-                        c=self.variants_count
-                    )
-                )
-            self.variants_count = 1
-
-        while tries < max_tries:
-            tries = tries + 1
-            q_randint = random.randint(
-                0, ((self.variants_count * 100) - 1)
-            )  # 0..999 for 10 variants, 0..99 for 1 variant, etc.
-            if DEBUG:
-                logger.info(
-                    "SWREACTXBlock pick_variant() try {t}: q_randint={r}".format(
-                        t=tries, r=q_randint
-                    )
-                )
-
-            if q_randint >= 0 and q_randint < 100:
-                q_index = 0
-            elif q_randint >= 100 and q_randint < 200:
-                q_index = 1
-            elif q_randint >= 200 and q_randint < 300:
-                q_index = 2
-            elif q_randint >= 300 and q_randint < 400:
-                q_index = 3
-            elif q_randint >= 400 and q_randint < 500:
-                q_index = 4
-            elif q_randint >= 500 and q_randint < 600:
-                q_index = 5
-            elif q_randint >= 600 and q_randint < 700:
-                q_index = 6
-            elif q_randint >= 700 and q_randint < 800:
-                q_index = 7
-            elif q_randint >= 800 and q_randint < 900:
-                q_index = 8
-            else:
-                q_index = 9
-
-            # If there are 2+ variants left and we have more tries left, do not return the same variant we started with.
-            if (
-                q_index == prev_index
-                and tries < max_tries
-                and self.bit_count_ones(self.variants_attempted)
-                < self.variants_count - 1
-            ):
-                if DEBUG:
-                    logger.info(
-                        "SWREACTXBlock pick_variant() try {t}: with bit_count_ones(variants_attempted)={v} < variants_count={c}-1 we won't use the same variant {q} as prev variant".format(
-                            t=tries,
-                            v=self.bit_count_ones(self.variants_attempted),
-                            c=self.variants_count,
-                            q=q_index,
-                        )
-                    )
-                break
-
-            if not self.bit_is_set(self.variants_attempted, q_index):
-                if DEBUG:
-                    logger.info(
-                        "SWREACTXBlock pick_variant() try {t}: found unattempted variant {q}".format(
-                            t=tries, q=q_index
-                        )
-                    )
-                break
-            if DEBUG:
-                logger.info(
-                    "pick_variant() try {t}: variant {q} has already been attempted".format(
-                        t=tries, q=q_index
-                    )
-                )
-            if self.bit_count_ones(self.variants_attempted) >= self.variants_count:
-                if DEBUG:
-                    logger.info(
-                        "pick_variant() try {t}: we have attempted all {c} variants. clearning self.variants_attempted.".format(
-                            t=tries, c=self.bit_count_ones(self.variants_attempted)
-                        )
-                    )
-                q_index = 0  # Default
-                self.variants_attempted = 0
-                break
-
-        if tries >= max_tries:
-            if DEBUG:
-                logger.error(
-                    "pick_variant() could not find an unattempted variant of {l} in {m} tries! clearing self.variants_attempted.".format(
-                        l=self.q_label, m=max_tries
-                    )
-                )
-            q_index = 0  # Default
-            self.variants_attempted = 0
-
-        if DEBUG:
-            logger.info("pick_variant() Selected variant {v}".format(v=q_index))
-
-        # Note: we won't set self.variants_attempted for this variant until they
-        # actually begin work on it (see start_attempt() below)
-
-        question = {
-            "q_id": self.q_id,
-            "q_user": self.xb_user_username,
-            "q_index": 0,
-            "q_label": self.q_label,
-            "q_stimulus": self.q_stimulus,
-            "q_definition": self.q_definition,
-            "q_type": self.q_type,
-            "q_display_math": self.q_display_math,
-            "q_hint1": self.q_hint1,
-            "q_hint2": self.q_hint2,
-            "q_hint3": self.q_hint3,
-            "q_swreact_problem": self.q_swreact_problem,
-            "q_swreact_rank": self.q_swreact_rank,
-            "q_swreact_invalid_schemas": self.q_swreact_invalid_schemas,
-            "q_swreact_problem_hints": self.q_swreact_problem_hints,
-            "q_weight": self.my_weight,
-            "q_max_attempts": self.my_max_attempts,
-            "q_option_hint": self.my_option_hint,
-            "q_option_showme": self.my_option_showme,
-            "q_grade_showme_ded": self.my_grade_showme_ded,
-            "q_grade_hints_count": self.my_grade_hints_count,
-            "q_grade_hints_ded": self.my_grade_hints_ded,
-            "q_grade_errors_count": self.my_grade_errors_count,
-            "q_grade_errors_ded": self.my_grade_errors_ded,
-            "q_grade_min_steps_count": self.my_grade_min_steps_count,
-            "q_grade_min_steps_ded": self.my_grade_min_steps_ded,
-            "q_grade_app_key": self.my_grade_app_key,
-        }
-
-        if DEBUG:
-            logger.info(
-                "SWREACTXBlock pick_variant() returned question q_index={i} question={q}".format(
-                    i=question["q_index"], q=question
-                )
-            )
+        variant_logger.debug(
+            "SWREACTXBlock pick_variant() returned question q_index=%s question=%s",
+            question["q_index"],
+            truncate(question),
+        )
         return question
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Picking question variants from the bitmap of variants a learner has attempted.
+
+variants_attempted is an int used as a bitmap: bit i is set once the learner has started an attempt on variant i. The
+variants a learner can be given next are the unset bits below the variant count, or all variants once every one has
+been attempted. pick_variant() draws uniformly from that set in one draw: it counts the candidates with int.bit_count()
+and finds the k-th candidate with select(), a binary search over the bitmap that takes log2(count) masked bit counts.
+So picking costs the same whether a block has 1 variant or thousands, and whichever variants have been attempted.
+
+With SWREACT_VARIANT_ASSIGNMENT=hashed, the draw comes from a random.Random seeded with a hash of (user id, block usage
+id, attempt number) rather than from the random module's shared generator (see assignment_rng()). Each call gets its
+own generator, so threads don't share its state, and the same learner, block, attempt number and attempted bitmap
+always get the same variant: a learner sees the same variant on every page load without us storing it, and an
+instructor can recompute which variant a learner was given (see assigned_variant()). The block draws a variant that
+isn't saved yet this way in either mode, so the variant a learner is shown doesn't change until it is saved.
+"""
+import hashlib
+import random
+
+from .const import VALID_VARIANT_ASSIGNMENTS, VARIANT_ASSIGNMENT, VARIANT_ASSIGNMENT_HASHED
+
+if VARIANT_ASSIGNMENT not in VALID_VARIANT_ASSIGNMENTS:
+    raise ValueError(
+        f"Invalid value received for SWREACT_VARIANT_ASSIGNMENT: {VARIANT_ASSIGNMENT}. "
+        f"Expected one of {VALID_VARIANT_ASSIGNMENTS}."
+    )
+
+
+def all_variants(count):
+    """Return the bitmap with the bits of variants 0..count-1 set."""
+    return (1 << count) - 1 if count > 0 else 0
+
+
+def attempted_count(attempted):
+    """Return the number of variants set in the attempted bitmap."""
+    return attempted.bit_count()
+
+
+def is_attempted(attempted, q_index):
+    """Return True if variant q_index is set in the attempted bitmap."""
+    return bool(attempted >> q_index & 1)
+
+
+def mark_attempted(attempted, q_index):
+    """Return the attempted bitmap with variant q_index set."""
+    return attempted | (1 << q_index)
+
+
+def rank(bitmap, i):
+    """Return the number of bits set in bitmap below bit i."""
+    return (bitmap & ((1 << i) - 1)).bit_count()
+
+
+def select(bitmap, k):
+    """Return the index of the k-th (from 0) set bit of bitmap. Raises ValueError if bitmap has k or fewer bits set."""
+    if not 0 <= k < bitmap.bit_count():
+        raise ValueError("bitmap has no set bit number {}".format(k))
+    low, width = 0, bitmap.bit_length()
+    # Invariant: the bit we want is in [low, low + width), and k counts the set bits from low.
+    while width > 1:
+        half = width // 2
+        below = (bitmap >> low & ((1 << half) - 1)).bit_count()
+        if k < below:
+            width = half
+        else:
+            k -= below
+            low += half
+            width -= half
+    return low
+
+
+def candidates(attempted, count, previous=-1):
+    """Return the bitmap of the variants a learner may be given next.
+
+    That is the variants not yet attempted, or all of them once every one has been attempted, leaving out the previous
+    variant unless it is the only candidate.
+    """
+    everything = all_variants(count)
+    remaining = everything & ~attempted or everything
+    if 0 <= previous < count and remaining & ~(1 << previous):
+        remaining &= ~(1 << previous)
+    return remaining
+
+
+def pick_variant(attempted, count, previous=-1, rng=random):
+    """Return a variant index drawn uniformly from candidates(attempted, count, previous), using rng.
+
+    Returns 0 for a block with no variants.
+    """
+    remaining = candidates(attempted, count, previous)
+    if not remaining:
+        return 0
+    return select(remaining, rng.randrange(remaining.bit_count()))
+
+
+def assignment_seed(user_id, usage_id, attempt):
+    """Return the seed for the variant draw of a learner's attempt number attempt on the block usage_id."""
+    key = "{}\n{}\n{}".format(user_id, usage_id, attempt).encode("utf8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=16).digest(), "big")
+
+
+def assignment_rng(user_id, usage_id, attempt, assignment=VARIANT_ASSIGNMENT):
+    """Return the random number generator to draw a learner's variant with, for the assignment mode."""
+    if assignment == VARIANT_ASSIGNMENT_HASHED:
+        return random.Random(assignment_seed(user_id, usage_id, attempt))
+    return random
+
+
+def assigned_variant(user_id, usage_id, attempt, attempted, count, previous=-1):
+    """Return the variant the hashed assignment gives a learner, from the state they had when it was drawn."""
+    rng = assignment_rng(user_id, usage_id, attempt, VARIANT_ASSIGNMENT_HASHED)
+    return pick_variant(attempted, count, previous, rng)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures: a SWREACTXBlock in an XBlock TestRuntime, and the results fixtures in tests/fixtures.
+"""
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from webob import Request
+from xblock.fields import ScopeIds
+from xblock.runtime import DictKeyValueStore, KvsFieldData
+from xblock.test.tools import TestRuntime
+
+import swreactxblock.swreactxblock as swreactxblock_module
+from swreactxblock.swreactxblock import SWREACTXBlock
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    """Return the contents of tests/fixtures/name as a string."""
+    with open(os.path.join(FIXTURES, name), encoding="utf8") as f:
+        return f.read()
+
+
+class FakeUserService:
+    """Stands in for the LMS user service."""
+
+    def get_current_user(self):
+        return SimpleNamespace(opt_attrs={"edx-platform.username": "learner42"}, full_name="Ada Learner")
+
+
+@pytest.fixture
+def block(monkeypatch):
+    """Return a SWREACTXBlock with default fields, in a course with no stepwise_* advanced settings."""
+    monkeypatch.setattr(swreactxblock_module, "get_course_by_id", lambda course_id: SimpleNamespace())
+    runtime = TestRuntime(services={"field-data": KvsFieldData(DictKeyValueStore()), "user": FakeUserService()})
+    runtime.course_id = "course-v1:Org+Course+Run"
+    runtime.handler_url = lambda block, handler, *args, **kwargs: "/handler/" + handler
+    runtime.published = []
+    runtime.publish = lambda block, event_type, event: runtime.published.append((event_type, event))
+    return SWREACTXBlock(runtime, scope_ids=ScopeIds("learner42", "swreactxblock", "definition", "usage"))
+
+
+def post(block, handler, data):
+    """Return the JSON response of block's json_body_handler handler to a post of data."""
+    body = json.dumps(data).encode("utf8")
+    request = Request.blank("/handler/" + handler, method="POST", body=body, content_type="application/json")
+    response = getattr(block, handler)(request)
+    assert response.status_code == 200, response.body
+    return response.json
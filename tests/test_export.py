@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for exporting learner state from a SQLite courseware_studentmodule table (swreactxblock/export.py and
+scripts/export_state.py).
+"""
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+from conftest import load_fixture
+
+from swreactxblock.codec import encode_results
+from swreactxblock.export import export_columns, export_records, field_defaults, write_csv, write_parquet
+from swreactxblock.swreactxblock import SWREACTXBlock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from export_state import sqlite_rows  # noqa: E402 pylint: disable=C0413
+
+COURSE_ID = "course-v1:Org+Course+Run"
+BLOCK_KEY = "block-v1:Org+Course+Run+type@swreactxblock+block@abc"
+
+ACTION_LOG = load_fixture("results_action_log.json")
+
+# (id, student_id, module_state_key, state, module_type, course_id)
+ROWS = [
+    (
+        1,
+        10,
+        BLOCK_KEY,
+        json.dumps(
+            {
+                "grade": 1.0,
+                "raw_earned": 1.0,
+                "count_attempts": 1,
+                "is_answered": True,
+                "variants_attempted": 2,
+                "variant_index": 1,
+                "last_seq": 4,
+                "swreact_results": encode_results(ACTION_LOG, compress=True),
+            }
+        ),
+        "swreactxblock",
+        COURSE_ID,
+    ),
+    # Written by an earlier version: the variant is only in the copy of the question, with the legacy my_* fields.
+    (
+        2,
+        11,
+        BLOCK_KEY,
+        json.dumps(
+            {
+                "count_attempts": 1,
+                "is_answered": False,
+                "variants_attempted": 1 << 70,
+                "question": {"q_index": 2, "q_stimulus": "Solve 3x+5=20"},
+                "my_weight": 1.0,
+            }
+        ),
+        "swreactxblock",
+        COURSE_ID,
+    ),
+    (3, 12, BLOCK_KEY, "{not json", "swreactxblock", COURSE_ID),
+    (4, 10, "block-v1:Org+Course+Run+type@problem+block@p1", "{}", "problem", COURSE_ID),
+    (5, 10, "block-v1:Org+Other+Run+type@swreactxblock+block@x", "{}", "swreactxblock", "course-v1:Org+Other+Run"),
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "lms.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE courseware_studentmodule (id INTEGER PRIMARY KEY, student_id INTEGER, module_state_key TEXT, "
+        "state TEXT, module_type TEXT, course_id TEXT)"
+    )
+    connection.executemany("INSERT INTO courseware_studentmodule VALUES (?, ?, ?, ?, ?, ?)", ROWS)
+    connection.commit()
+    connection.close()
+    return path
+
+
+def records(database, results=False, counts=False):
+    return list(export_records(sqlite_rows(database, COURSE_ID), field_defaults(SWREACTXBlock), results, counts))
+
+
+def test_sqlite_rows(database):
+    assert [row[0] for row in sqlite_rows(database)] == [1, 2, 3, 5]
+    assert [row[0] for row in sqlite_rows(database, COURSE_ID)] == [1, 2, 3]
+
+
+def test_export_records(database):
+    current, legacy = records(database, results=True, counts=True)
+    assert current["variant_index"] == 1
+    assert current["results"] == ACTION_LOG
+    assert current["log_length"] == 10
+    assert (current["steps"], current["hints"], current["errors"], current["showme"]) == (3, 3, 2, 1)
+    # The legacy row keeps its variant, and gets the field defaults for what it doesn't store.
+    assert legacy["variant_index"] == 2
+    assert legacy["variants_attempted"] == str(1 << 70)
+    assert (legacy["grade"], legacy["last_seq"]) == (SWREACTXBlock.grade.default, SWREACTXBlock.last_seq.default)
+    assert (legacy["results"], legacy["log_length"], legacy["steps"]) == ("", None, None)
+
+
+def test_write_csv(database, tmp_path):
+    path = tmp_path / "state.csv"
+    with open(path, "w", newline="", encoding="utf8") as f:
+        assert write_csv(records(database), f, export_columns(), batch_size=1) == 2
+    with open(path, newline="", encoding="utf8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == list(export_columns())
+    assert [(row["id"], row["variant_index"], row["variants_attempted"]) for row in rows] == [
+        ("1", "1", "2"),
+        ("2", "2", str(1 << 70)),
+    ]
+
+
+def test_write_parquet(database, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "state.parquet")
+    columns = export_columns(results=True, counts=True)
+    assert write_parquet(records(database, results=True, counts=True), path, columns, batch_size=1) == 2
+    table = pq.read_table(path)
+    assert table.column_names == list(columns)
+    assert table.column("variant_index").to_pylist() == [1, 2]
+    assert table.column("variants_attempted").to_pylist() == ["2", str(1 << 70)]
+    assert table.column("steps").to_pylist() == [3, None]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for resolving the grading options (swreactxblock/options.py) through the course settings cache.
+"""
+from types import SimpleNamespace
+
+import swreactxblock.swreactxblock as swreactxblock_module
+from swreactxblock.signals import invalidate_course
+from swreactxblock.swreactxblock import SWREACTXBlock
+
+
+def resolved(block):
+    """Return the options a new request for block resolves, after saving its fields."""
+    block.save()
+    return SWREACTXBlock(block.runtime, scope_ids=block.scope_ids).resolved_options()
+
+
+def test_question_setting_wins(block):
+    block.q_grade_hints_ded = 0.5
+    assert resolved(block)["grade_hints_ded"] == 0.5
+
+
+def test_course_setting_applies_when_the_question_is_unset(block, monkeypatch):
+    course_id = block.runtime.course_id
+    invalidate_course(course_id)
+    block.q_grade_hints_ded = -1
+    monkeypatch.setattr(
+        swreactxblock_module, "get_course_by_id", lambda _course_id: SimpleNamespace(stepwise_grade_hints_ded=0.75)
+    )
+    assert resolved(block)["grade_hints_ded"] == 0.75
+
+
+def test_republishing_the_course_changes_the_options(block, monkeypatch):
+    course_id = block.runtime.course_id
+    invalidate_course(course_id)
+    block.q_grade_hints_ded = -1
+    course = SimpleNamespace(stepwise_grade_hints_ded=0.75)
+    monkeypatch.setattr(swreactxblock_module, "get_course_by_id", lambda _course_id: course)
+    assert resolved(block)["grade_hints_ded"] == 0.75
+    course = SimpleNamespace(stepwise_grade_hints_ded=0.25)
+    # Still cached until the course is republished.
+    assert resolved(block)["grade_hints_ded"] == 0.75
+    invalidate_course(course_id)
+    assert resolved(block)["grade_hints_ded"] == 0.25
+    invalidate_course(course_id)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for reading plain and gzip-compressed results posts (swreactxblock/request_body.py).
+"""
+import gzip
+import json
+
+import pytest
+from webob import Request
+from xblock.exceptions import JsonHandlerError
+
+from swreactxblock.const import MAX_REQUEST_BODY_SIZE
+from swreactxblock.request_body import RequestBodyError, json_body_handler, read_body
+
+RESULTS = {"seq": 3, "results": [{"status": "in-progress"}, [{"step": "3x=15"}, {"step": "x=5"}]]}
+
+
+class EchoBlock:
+    """Stands in for the block: the handler returns the data it was given."""
+
+    @json_body_handler
+    def echo(self, data, suffix=""):
+        if data == "reject":
+            raise JsonHandlerError(409, "rejected")
+        return {"data": data}
+
+
+def post(body, encoding=None, method="POST"):
+    """Return the response of EchoBlock.echo to a request with body and Content-Encoding encoding."""
+    headers = {"Content-Type": "application/json"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    request = Request.blank("/handler/echo", method=method, body=body, headers=headers)
+    return EchoBlock().echo(request)
+
+
+def json_bytes(data):
+    return json.dumps(data).encode("utf8")
+
+
+def test_plain_json():
+    response = post(json_bytes(RESULTS))
+    assert response.status_code == 200
+    assert response.json == {"data": RESULTS}
+
+
+@pytest.mark.parametrize("encoding", ["gzip", " GZip ", "identity"])
+def test_content_encodings(encoding):
+    body = json_bytes(RESULTS)
+    if "gzip" in encoding.lower():
+        body = gzip.compress(body)
+    response = post(body, encoding)
+    assert response.status_code == 200
+    assert response.json == {"data": RESULTS}
+
+
+def test_unknown_content_encoding():
+    response = post(json_bytes(RESULTS), "br")
+    assert response.status_code == 415
+
+
+def test_oversize_plain_body():
+    response = post(b" " * MAX_REQUEST_BODY_SIZE + b"{}")
+    assert response.status_code == 413
+
+
+def test_decompression_bomb():
+    # About 70 KB sent, which would expand to 64 MiB.
+    bomb = gzip.compress(b" " * (64 * 1024 * 1024))
+    assert len(bomb) < MAX_REQUEST_BODY_SIZE
+    response = post(bomb, "gzip")
+    assert response.status_code == 413
+
+
+def test_body_exactly_at_the_limit():
+    request = Request.blank("/", method="POST", body=gzip.compress(b"x" * 100), headers={"Content-Encoding": "gzip"})
+    assert read_body(request, max_size=100) == b"x" * 100
+    request = Request.blank("/", method="POST", body=gzip.compress(b"x" * 101), headers={"Content-Encoding": "gzip"})
+    with pytest.raises(RequestBodyError) as error:
+        read_body(request, max_size=100)
+    assert error.value.status == 413
+
+
+def test_truncated_gzip_body():
+    body = gzip.compress(json_bytes(RESULTS))
+    response = post(body[: len(body) // 2], "gzip")
+    assert response.status_code == 400
+    assert "Truncated" in response.json["error"]
+
+
+def test_trailing_data_after_gzip_body():
+    response = post(gzip.compress(json_bytes(RESULTS)) + b"junk", "gzip")
+    assert response.status_code == 400
+    assert "after the gzip" in response.json["error"]
+
+
+def test_corrupt_gzip_body():
+    response = post(b"not gzip at all", "gzip")
+    assert response.status_code == 400
+
+
+def test_invalid_json():
+    response = post(b"{not json")
+    assert response.status_code == 400
+
+
+def test_method_must_be_post():
+    response = post(b"", method="GET")
+    assert response.status_code == 405
+
+
+def test_handler_errors_become_responses():
+    response = post(json_bytes("reject"))
+    assert response.status_code == 409
+    assert response.json == {"error": "rejected"}
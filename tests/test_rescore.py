@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for bulk rescoring of stored attempts (swreactxblock/rescore.py and scripts/rescore.py).
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from conftest import load_fixture
+
+from swreactxblock.const import SCORING_MODE_COMPLETION, SCORING_MODE_LOG
+from swreactxblock.options import default_options
+from swreactxblock.rescore import rescore_rows
+from swreactxblock.swreactxblock import SWREACTXBlock
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "rescore.py")
+
+ACTION_LOG = load_fixture("results_action_log.json")
+STEP_STATUS_LOG = load_fixture("results_step_status_log.json")
+
+
+def state(results, raw_earned=1.0, is_answered=True):
+    return {"is_answered": is_answered, "raw_earned": raw_earned, "swreact_results": results}
+
+
+ROWS = [
+    ("action", state(ACTION_LOG)),
+    ("step-status", state(STEP_STATUS_LOG)),
+    ("in-progress", state(ACTION_LOG, raw_earned=0.0, is_answered=False)),
+    ("unreadable", state("[{}")),
+]
+
+
+def test_blocks_dont_allow_rescoring(block):
+    assert block.allows_rescore() is False
+
+
+def test_default_options_match_an_unconfigured_block(block):
+    assert default_options(SWREACTXBlock) == block.resolved_options()
+    assert default_options(SWREACTXBlock)["grade_min_steps_ded"] == 0.25
+
+
+def test_completion_mode_changes_nothing():
+    report = rescore_rows(ROWS, default_options(SWREACTXBlock), mode=SCORING_MODE_COMPLETION)
+    assert (report.rows, report.answered, report.unreadable) == (4, 3, 1)
+    assert report.changed == []
+
+
+def test_log_mode_applies_the_block_defaults():
+    written = []
+    report = rescore_rows(
+        ROWS, default_options(SWREACTXBlock), lambda key, score: written.append((key, score)), mode=SCORING_MODE_LOG
+    )
+    # The "show me" (0.25) and the third hint (1.0) take the action log to 0; the step/status log gets full credit.
+    assert report.changed == [("action", 1.0, 0.0)]
+    assert written == [("action", 0.0)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_chunking_doesnt_change_the_report(chunk_size):
+    report = rescore_rows(ROWS, default_options(SWREACTXBlock), chunk_size=chunk_size, mode=SCORING_MODE_LOG)
+    assert report.changed == [("action", 1.0, 0.0)]
+
+
+def test_jsonl_dry_run(tmp_path):
+    path = tmp_path / "states.jsonl"
+    path.write_text("".join(json.dumps({"key": key, "state": json.dumps(row)}) + "\n" for key, row in ROWS))
+    options = tmp_path / "options.json"
+    options.write_text(json.dumps({"grade_hints_count": 3}))
+    env = dict(os.environ, SWREACT_SCORING_MODE=SCORING_MODE_LOG)
+    output = subprocess.run(
+        [sys.executable, SCRIPT, "--jsonl", str(path), "--options", str(options)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert "action 1.0000 -> 0.7500" in output
+    assert "dry run: 4 rows, 3 answered, 1 unreadable, 1 changed" in output
+
+
+def test_help_explains_the_scoring_mode():
+    output = subprocess.run([sys.executable, SCRIPT, "--help"], capture_output=True, text=True, check=True).stdout
+    assert "SWREACT_SCORING_MODE=log" in " ".join(output.split())
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for fetching a previous attempt with the get_resume_data handler (swreactxblock/resume.py).
+"""
+import json
+
+from conftest import load_fixture, post
+from webob import Request
+
+RESULTS = json.loads(load_fixture("results_action_log.json"))
+SESSION, LOG = RESULTS
+
+
+def get(block, query="", etag=None):
+    """Return the response of block's get_resume_data handler to a GET with query string query."""
+    headers = {"If-None-Match": f'"{etag}"'} if etag else {}
+    request = Request.blank("/handler/get_resume_data?" + query, headers=headers)
+    return block.get_resume_data(request)
+
+
+def test_whole_attempt(block):
+    post(block, "save_swreact_partial_results", RESULTS)
+    response = get(block)
+    assert response.status_code == 200
+    assert response.json == {"resumable": True, "session": SESSION, "log": LOG, "offset": 0, "total": len(LOG)}
+
+
+def test_range(block):
+    post(block, "save_swreact_partial_results", RESULTS)
+    page = get(block, "offset=2&limit=3").json
+    assert (page["log"], page["offset"], page["total"]) == (LOG[2:5], 2, len(LOG))
+    assert get(block, "offset=8").json["log"] == LOG[8:]
+    assert get(block, "offset=100").json["log"] == []
+
+
+def test_session_only(block):
+    post(block, "save_swreact_partial_results", RESULTS)
+    page = get(block, "limit=0").json
+    assert (page["session"], page["log"], page["total"]) == (SESSION, [], len(LOG))
+
+
+def test_bad_range(block):
+    for query in ("offset=abc", "limit=1.5"):
+        response = get(block, query)
+        assert response.status_code == 400
+        assert "error" in response.json
+
+
+def test_etag(block):
+    post(block, "save_swreact_partial_results", RESULTS)
+    first = get(block)
+    etag = first.etag
+    assert etag and first.cache_control.private
+    assert get(block, etag=etag).status_code == 304
+    # The range doesn't change the ETag: it identifies the stored attempt.
+    assert get(block, "offset=2&limit=3", etag=etag).status_code == 304
+    post(block, "save_swreact_partial_results", [SESSION, LOG + [{"action": "step", "step": 3}]])
+    changed = get(block, etag=etag)
+    assert changed.status_code == 200
+    assert changed.etag != etag
+    assert changed.json["total"] == len(LOG) + 1
+
+
+def test_no_results(block):
+    response = get(block)
+    assert response.status_code == 200
+    assert response.json == {"resumable": False, "session": {}, "log": [], "offset": 0, "total": 0}
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for scoring completed attempts from their logs (swreactxblock/scoring.py).
+"""
+import glob
+import json
+import os
+
+import pytest
+from conftest import FIXTURES, load_fixture, post
+
+from swreactxblock import rescore
+from swreactxblock.const import SCORING_MODE, SCORING_MODE_COMPLETION, SCORING_MODE_LOG
+from swreactxblock.scoring import (
+    MAX_SCORE,
+    EventCounts,
+    count_events,
+    has_events,
+    load_log,
+    score_counts,
+    score_results,
+)
+
+OPTIONS = {
+    "grade_showme_ded": 0.25,
+    "grade_hints_count": 2,
+    "grade_hints_ded": 0.25,
+    "grade_errors_count": 2,
+    "grade_errors_ded": 0.5,
+    "grade_min_steps_count": 3,
+    "grade_min_steps_ded": 0.25,
+}
+
+# These two are written by hand, not captured from the React app.
+# A log of "action" entries: three steps, a wrong check and an error message, three hints and a "show me".
+ACTION_LOG = load_fixture("results_action_log.json")
+# A log of {"step": ..., "status": "ok"} entries, none of which we recognise.
+STEP_STATUS_LOG = load_fixture("results_step_status_log.json")
+
+# Results of completed attempts captured from the React app, as posted to save_swreact_final_results.
+CAPTURED = sorted(os.path.basename(path) for path in glob.glob(os.path.join(FIXTURES, "captured", "*.json")))
+
+
+@pytest.mark.parametrize("name", CAPTURED)
+def test_captured_logs_have_recognised_events(name):
+    assert has_events(count_events(load_log(load_fixture(os.path.join("captured", name)))))
+
+
+@pytest.mark.skipif(SCORING_MODE != SCORING_MODE_LOG, reason="SWREACT_SCORING_MODE isn't log")
+def test_log_mode_needs_a_captured_log():
+    assert CAPTURED, "add a log captured from the React app under tests/fixtures/captured/ before using log mode"
+
+
+def test_count_events():
+    assert count_events(load_log(ACTION_LOG)) == EventCounts(steps=3, hints=3, errors=2, showme=1)
+
+
+def test_unrecognised_entries_are_not_counted():
+    assert count_events(load_log(STEP_STATUS_LOG)) == EventCounts(0, 0, 0, 0)
+
+
+def test_log_mode_deductions():
+    breakdown = score_results(ACTION_LOG, OPTIONS, SCORING_MODE_LOG)
+    assert breakdown.deductions == {"showme": 0.25, "hints": 0.25}
+    assert breakdown.score == 0.5
+
+
+@pytest.mark.parametrize("results", [STEP_STATUS_LOG, '[{"status": "complete"}, []]'])
+def test_log_mode_full_credit_without_recognised_events(results):
+    breakdown = score_results(results, OPTIONS, SCORING_MODE_LOG)
+    assert breakdown.score == MAX_SCORE
+    assert breakdown.deductions == {}
+
+
+@pytest.mark.parametrize("results", [ACTION_LOG, STEP_STATUS_LOG])
+def test_completion_mode_full_credit(results):
+    breakdown = score_results(results, OPTIONS, SCORING_MODE_COMPLETION)
+    assert breakdown.score == MAX_SCORE
+    assert breakdown.deductions == {}
+    assert breakdown[:4] == count_events(json.loads(results)[1])
+
+
+@pytest.mark.parametrize(
+    "results",
+    [ACTION_LOG, STEP_STATUS_LOG, '[{},[]]', ' [ {"a": [1, 2]} ,\n[ {"action": "hint"} , "x", 3 ] ] '],
+)
+def test_load_log(results):
+    assert load_log(results) == json.loads(results)[1]
+
+
+@pytest.mark.parametrize("results", ["", "{}", "[{}]", '[{}, {"action": "hint"}]', '[{}, [{"action": "hint"}'])
+def test_unreadable_results(results):
+    assert score_results(results, OPTIONS, SCORING_MODE_LOG) is None
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_score_chunk_matches_score_counts(monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(rescore, "np", None)
+    rows = [EventCounts(0, 0, 0, 0), EventCounts(1, 0, 0, 0), EventCounts(3, 3, 2, 1), EventCounts(0, 9, 9, 9)]
+    expected = [score_counts(counts, OPTIONS).score for counts in rows]
+    assert rescore.score_chunk(list(zip(*rows)), OPTIONS, SCORING_MODE_LOG) == pytest.approx(expected)
+
+
+@pytest.mark.skipif(SCORING_MODE != SCORING_MODE_COMPLETION, reason="SWREACT_SCORING_MODE isn't completion")
+@pytest.mark.parametrize("fixture", ["results_action_log.json", "results_step_status_log.json"])
+def test_final_results_get_full_credit_by_default(block, fixture):
+    response = post(block, "save_swreact_final_results", json.loads(load_fixture(fixture)))
+    assert response["score"]["score"] == MAX_SCORE
+    assert block.grade == MAX_SCORE
+    assert ("grade", {"value": MAX_SCORE, "max_value": MAX_SCORE}) in block.runtime.published
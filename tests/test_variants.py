@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for assigning question variants to a learner (swreactxblock/variants.py and the block's variant handling).
+"""
+import json
+import logging
+
+import pytest
+from conftest import load_fixture, post
+from webob import Request
+
+from swreactxblock import variants
+from swreactxblock.payload import build_payload
+from swreactxblock.swreactxblock import partial_results_coalescer
+
+RESULTS = json.loads(load_fixture("results_action_log.json"))
+VARIANTS = json.dumps([{"stimulus": "Solve 2x+1=9"}, {"stimulus": "Solve 5x-5=20"}, {"stimulus": "Solve x/2=4"}])
+
+
+@pytest.fixture
+def variant_block(block):
+    block.q_stimulus = "Solve 3x+5=20"
+    block.q_variants = VARIANTS
+    return block
+
+
+def get_data(block):
+    """Return the question get_data gives the learner."""
+    request = Request.blank("/handler/get_data", method="POST", body=b"{}", content_type="application/json")
+    return json.loads(block.get_data(request).json)["question"]
+
+
+def viewed_variant(block):
+    """Return the variantIndex student_view would give the React app."""
+    return build_payload(block, question=block.current_question())["problem"]["variantIndex"]
+
+
+def test_unsaved_variant_is_stable(variant_block):
+    shown = {viewed_variant(variant_block) for _ in range(20)} | {get_data(variant_block)["q_index"] for _ in range(20)}
+    assert len(shown) == 1
+    assert variant_block.variant_index == -1
+
+
+def test_unsaved_variant_is_the_hashed_draw(variant_block):
+    scope_ids = variant_block.scope_ids
+    assert viewed_variant(variant_block) == variants.assigned_variant(scope_ids.user_id, scope_ids.usage_id, 0, 0, 4)
+
+
+def test_final_results_save_the_variant(variant_block, caplog):
+    shown = viewed_variant(variant_block)
+    with caplog.at_level(logging.WARNING):
+        post(variant_block, "save_swreact_final_results", RESULTS)
+    assert variant_block.variant_index == shown
+    assert variants.is_attempted(variant_block.variants_attempted, shown)
+    assert (variant_block.previous_variant, variant_block.count_attempts) == (shown, 1)
+    assert get_data(variant_block)["q_index"] == shown
+    assert not [record for record in caplog.records if "q_index" in record.getMessage()]
+
+
+@pytest.mark.parametrize("steps", [0, 3])
+def test_written_partial_results_save_the_variant(variant_block, monkeypatch, steps):
+    monkeypatch.setattr(partial_results_coalescer, "steps", steps)
+    shown = get_data(variant_block)["q_index"]
+    for seq in range(1, 4):
+        post(variant_block, "save_swreact_partial_results", {"seq": seq, "results": RESULTS})
+        if seq < steps:
+            # Held by the coalescer: nothing is written, and the variant is still the hashed draw.
+            assert variant_block.variant_index == -1
+            assert viewed_variant(variant_block) == shown
+    assert variant_block.variant_index == shown
+    assert variants.is_attempted(variant_block.variants_attempted, shown)
+    assert variant_block.count_attempts == 1
+
+
+def test_start_attempt_is_not_counted_twice(variant_block):
+    request = Request.blank("/handler/start_attempt", method="POST", body=b'{"q_index": 2}')
+    variant_block.start_attempt(request)
+    post(variant_block, "save_swreact_final_results", RESULTS)
+    assert (variant_block.variant_index, variant_block.count_attempts) == (2, 1)
+
+
+def test_results_without_a_saved_variant(variant_block):
+    variant_block.swreact_results = json.dumps(RESULTS)
+    shown = viewed_variant(variant_block)
+    assert variant_block.variant_index == shown
+    assert get_data(variant_block)["q_index"] == shown
+
+
+def test_legacy_question_copy(variant_block):
+    variant_block.question = {"q_index": 3, "q_stimulus": "Solve x/2=4"}
+    assert viewed_variant(variant_block) == 3
+    post(variant_block, "save_swreact_final_results", RESULTS)
+    assert (variant_block.variant_index, variant_block.question) == (3, {})
+    assert variants.is_attempted(variant_block.variants_attempted, 3)
+    assert variant_block.count_attempts == 0